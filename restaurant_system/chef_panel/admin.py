@@ -3,8 +3,13 @@ from django.contrib import messages
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django import forms
-from .models import Category, Product, Customer, Order, OrderItem, OrderStatusHistory, BotSettings
+from django.db import models, transaction
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import Category, Product, Customer, Order, OrderItem, OrderStatusHistory, BotSettings, NotificationOutbox, BroadcastJob, SalesRollup, DeliveryZone
 from .utils import send_telegram_message
+from .broadcast import create_job
+from . import rollup, stats
 import logging
 #asas
 logger = logging.getLogger(__name__)
@@ -60,12 +65,118 @@ class OrderAdmin(admin.ModelAdmin):
         }),
     )
 
+    # Admin panel services.py ni chetlab o'tadi: savdo yig'indilari shu yerda yangilanadi
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = Order.objects.filter(pk=obj.pk).values('status', 'total_amount').first() if change else None
+            super().save_model(request, obj, form, change)
+            if old is None:
+                rollup.record_created(obj)
+            else:
+                rollup.record_status_change(obj, old['status'], obj.status, old['total_amount'])
+            if old is None or old['status'] != obj.status:
+                # Tarix qatori order_feed cursorini siljitadi: oshxona ekranlari o'zgarishni oladi
+                OrderStatusHistory.objects.create(
+                    order=obj,
+                    old_status=old['status'] if old else '',
+                    new_status=obj.status,
+                    changed_by=request.user,
+                    notes="Admin panel orqali o'zgartirildi",
+                )
+            transaction.on_commit(stats.invalidate_dashboard)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            rollup.record_deleted(obj)
+            super().delete_model(request, obj)
+            transaction.on_commit(stats.invalidate_dashboard)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for order in queryset:
+                rollup.record_deleted(order)
+            super().delete_queryset(request, queryset)
+            transaction.on_commit(stats.invalidate_dashboard)
+
 @admin.register(OrderStatusHistory)
 class OrderStatusHistoryAdmin(admin.ModelAdmin):
     list_display = ['order', 'old_status', 'new_status', 'changed_by', 'changed_at']
     list_filter = ['old_status', 'new_status', 'changed_at']
     readonly_fields = ['changed_at']
 
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order', 'chat_id', 'kind', 'mode', 'status', 'attempts', 'available_at', 'sent_at']
+    list_filter = ['status', 'kind', 'mode']
+    search_fields = ['order__order_number', 'last_error']
+    readonly_fields = ['created_at', 'sent_at', 'claimed_at', 'claim_token']
+    actions = ['retry_failed']
+
+    def retry_failed(self, request, queryset):
+        """Xato bilan tugagan xabarlarni qayta navbatga qo'yish"""
+        count = queryset.filter(status='failed').update(status='pending', attempts=0, available_at=timezone.now())
+        self.message_user(request, f"{count} ta xabar qayta navbatga qo'yildi", messages.SUCCESS)
+    retry_failed.short_description = "Qayta yuborish"
+
+@admin.register(SalesRollup)
+class SalesRollupAdmin(admin.ModelAdmin):
+    list_display = ['bucket', 'period', 'status', 'order_count', 'revenue']
+    list_filter = ['period', 'status']
+    date_hierarchy = 'bucket'
+
+    def has_add_permission(self, request):
+        # Yig'indilar buyurtmalardan hisoblanadi (manage.py rebuild_sales_rollup)
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(BroadcastJob)
+class BroadcastJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'progress', 'sent_count', 'failed_count', 'total_recipients', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['status', 'cursor', 'total_recipients', 'sent_count', 'failed_count', 'last_error',
+                       'created_by', 'created_at', 'started_at', 'finished_at']
+    actions = ['pause_jobs', 'resume_jobs', 'cancel_jobs']
+
+    def has_add_permission(self, request):
+        # E'lonlar Bot Sozlamalari dagi "send_broadcast" amali orqali yaratiladi
+        return False
+
+    def progress(self, obj):
+        url = reverse('chef_panel:broadcast_progress', args=[obj.id])
+        return format_html('<a href="{}">{}%</a>', url, obj.progress_percent)
+    progress.short_description = "Jarayon"
+
+    def pause_jobs(self, request, queryset):
+        count = queryset.filter(status__in=['pending', 'running']).update(status='paused')
+        self.message_user(request, f"⏸ {count} ta e'lon to'xtatildi", messages.SUCCESS)
+    pause_jobs.short_description = "⏸ To'xtatish"
+
+    def resume_jobs(self, request, queryset):
+        count = queryset.filter(status='paused').update(status='pending')
+        self.message_user(request, f"▶️ {count} ta e'lon davom ettiriladi", messages.SUCCESS)
+    resume_jobs.short_description = "▶️ Davom ettirish"
+
+    def cancel_jobs(self, request, queryset):
+        count = queryset.filter(status__in=['pending', 'running', 'paused']).update(status='cancelled')
+        self.message_user(request, f"❌ {count} ta e'lon bekor qilindi", messages.SUCCESS)
+    cancel_jobs.short_description = "❌ Bekor qilish"
+
+@admin.register(DeliveryZone)
+class DeliveryZoneAdmin(admin.ModelAdmin):
+    list_display = ['name', 'is_active', 'priority', 'base_cost', 'per_km_cost', 'vertex_count', 'updated_at']
+    list_filter = ['is_active']
+    list_editable = ['is_active', 'priority', 'base_cost', 'per_km_cost']
+    search_fields = ['name']
+    formfield_overrides = {
+        models.JSONField: {'widget': forms.Textarea(attrs={'rows': 8, 'cols': 80})},
+    }
+
+    def vertex_count(self, obj):
+        return len(obj.polygon) if isinstance(obj.polygon, list) else 0
+    vertex_count.short_description = "Cho'qqilar"
+
 class BotSettingsForm(forms.ModelForm):
     class Meta:
         model = BotSettings
@@ -147,20 +258,17 @@ class BotSettingsAdmin(admin.ModelAdmin):
     readonly_fields = ['last_broadcast_sent_at']
     
     def has_add_permission(self, request):
-        # Allow adding only if no instance exists
-        return not BotSettings.objects.exists()
+        # Hech qachon qo'lda qo'shilmaydi: yagona yozuv (pk=1) BotSettings.load() da yaratiladi
+        return False
 
     def has_delete_permission(self, request, obj=None):
         # Prevent deletion
         return False
 
     def get_queryset(self, request):
-        # Always show the single instance or create it if it doesn't exist
-        qs = super().get_queryset(request)
-        if not qs.exists():
-            # Create default settings if none exist
-            BotSettings.objects.create()
-        return qs
+        # Always show the single instance or create it if it doesn't exist (kesh orqali, har sahifada so'rovsiz)
+        BotSettings.get_settings()
+        return super().get_queryset(request)
 
     actions = ['send_broadcast', 'test_bot_connection']
 
@@ -176,29 +284,15 @@ class BotSettingsAdmin(admin.ModelAdmin):
             self.message_user(request, "E'lon matni bo'sh. Iltimos, matnni kiriting.", level=messages.ERROR)
             return
 
-        customers = Customer.objects.all()
-        sent_count = 0
-        failed_count = 0
-
-        for customer in customers:
-            try:
-                response = send_telegram_message(chat_id=customer.telegram_id, text=message_text)
-                if response and response.get('ok'):
-                    sent_count += 1
-                else:
-                    failed_count += 1
-                    logger.warning(f"E'lon yuborishda xato: {customer.telegram_id} - {response.get('description', 'Noma\'lum xato')}")
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"E'lon yuborishda kutilmagan xato: {customer.telegram_id} - {e}", exc_info=True)
-
-        settings_obj.last_broadcast_sent_at = timezone.now()
-        settings_obj.save()
-
-        if failed_count == 0:
-            self.message_user(request, f"✅ E'lon {sent_count} ta mijozga muvaffaqiyatli yuborildi!", level=messages.SUCCESS)
-        else:
-            self.message_user(request, f"⚠️ E'lon {sent_count} ta mijozga yuborildi. {failed_count} ta xato yuz berdi.", level=messages.WARNING)
+        # Yuborish fon rejimidagi workerda bajariladi, admin so'rovi kutmaydi
+        job = create_job(message_text, created_by=request.user)
+        progress_url = reverse('chef_panel:broadcast_progress', args=[job.id])
+        self.message_user(
+            request,
+            format_html("📢 E'lon #{} navbatga qo'yildi ({} ta mijoz). <a href=\"{}\">Jarayonni kuzatish</a>",
+                        job.id, job.total_recipients, progress_url),
+            level=messages.SUCCESS
+        )
     
     send_broadcast.short_description = "📢 Barcha mijozlarga e'lon yuborish"
 
@@ -246,7 +340,7 @@ class BotSettingsAdmin(admin.ModelAdmin):
         
         # Get current settings
         try:
-            settings_obj = BotSettings.objects.first()
+            settings_obj = BotSettings.get_settings()
             if settings_obj:
                 extra_context['current_settings'] = {
                     'service_hours': f"{settings_obj.service_start_time.strftime('%H:%M')} - {settings_obj.service_end_time.strftime('%H:%M')}",
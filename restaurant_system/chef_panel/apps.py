@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ChefPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chef_panel'
-    verbose_name = 'Chef Panel'
\ No newline at end of file
+    verbose_name = 'Chef Panel'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import logging
+import pickle
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from telegram.ext import BasePersistence, PersistenceInput
+
+from .models import BotUserData
+
+logger = logging.getLogger(__name__)
+
+
+def _load(user_id):
+    return BotUserData.objects.filter(user_id=user_id).values_list('data', flat=True).first()
+
+
+def _save(rows):
+    now = timezone.now()
+    BotUserData.objects.bulk_create(
+        [BotUserData(user_id=user_id, data=data, updated_at=now) for user_id, data in rows.items()],
+        update_conflicts=True,
+        unique_fields=['user_id'],
+        update_fields=['data', 'updated_at'],
+        batch_size=500,
+    )
+
+
+def _delete(user_id):
+    BotUserData.objects.filter(user_id=user_id).delete()
+
+
+class DjangoPersistence(BasePersistence):
+    """context.user_data ni Django bazasida saqlash.
+
+    Ishga tushganda hech narsa yuklanmaydi: foydalanuvchi ma'lumoti uning birinchi
+    update'ida (refresh_user_data) o'qiladi. PTB o'zgargan foydalanuvchilarni har
+    update_interval da beradi; o'zgarmaganlari tashlab yuboriladi, qolganlari bitta
+    bulk upsert bilan yoziladi.
+
+    bot_data saqlanmaydi: unda faqat post_init da qayta yaratiladigan obyektlar
+    (sozlamalar, dispatcher, worker) bor.
+    """
+
+    def __init__(self, update_interval=None):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval or settings.BOT_PERSISTENCE_INTERVAL,
+        )
+        self._loaded = set()
+        self._digests = {}  # user_id -> bazadagi nusxaning xeshi
+        self._pending = {}
+        self._flush_task = None
+
+    async def get_user_data(self):
+        return {}
+
+    async def refresh_user_data(self, user_id, user_data):
+        if user_id in self._loaded:
+            return
+        data = await sync_to_async(_load)(user_id)
+        if user_id in self._loaded:
+            return
+        self._loaded.add(user_id)
+        if data is None:
+            return
+        data = bytes(data)
+        self._digests[user_id] = hashlib.sha1(data).digest()
+        try:
+            stored = pickle.loads(data)
+        except Exception as e:
+            logger.error(f"Foydalanuvchi {user_id} holatini o'qib bo'lmadi: {e}")
+            return
+        for key, value in stored.items():
+            user_data.setdefault(key, value)
+
+    async def update_user_data(self, user_id, data):
+        try:
+            blob = pickle.dumps(data)
+        except Exception as e:
+            logger.error(f"Foydalanuvchi {user_id} holatini saqlab bo'lmadi: {e}")
+            return
+        digest = hashlib.sha1(blob).digest()
+        if self._digests.get(user_id) == digest:
+            return
+        self._digests[user_id] = digest
+        self._pending[user_id] = blob
+        # Shu davrdagi barcha update_user_data chaqiruvlari (asyncio.gather) bitta yozuvga yig'iladi
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._write_pending())
+
+    async def drop_user_data(self, user_id):
+        self._pending.pop(user_id, None)
+        self._digests.pop(user_id, None)
+        await sync_to_async(_delete)(user_id)
+
+    async def _write_pending(self):
+        await asyncio.sleep(0)
+        while self._pending:
+            rows, self._pending = self._pending, {}
+            try:
+                await sync_to_async(_save)(rows)
+            except Exception as e:
+                logger.error(f"Bot holatini bazaga yozishda xato ({len(rows)} ta foydalanuvchi): {e}", exc_info=True)
+                # Keyingi yozishda (yoki flush da) qayta uriniladi; yangiroq nusxa bo'lsa o'sha qoladi
+                self._pending = {**rows, **self._pending}
+                return
+
+    async def flush(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._write_pending()
+
+    # Foydalanilmaydigan ma'lumot turlari
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {}
+
+    async def update_conversation(self, name, key, new_state):
+        pass
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import BotSettings
+
+logger = logging.getLogger(__name__)
+
+_settings = None
+_version = None
+_local_version = 0
+_checked_at = None
+_lock = threading.Lock()
+
+
+def invalidate():
+    """BotSettings saqlanganda signal orqali chaqiriladi"""
+    global _local_version
+    _local_version += 1
+
+
+def _probe():
+    # Boshqa jarayondagi (admin panel) o'zgarishlarni aniqlash: faqat versiya o'qiladi
+    return BotSettings.objects.order_by('pk').values_list('pk', 'version').first()
+
+
+def _is_fresh():
+    return (
+        _checked_at is not None
+        and _version[:1] == (_local_version,)
+        and time.monotonic() - _checked_at < settings.BOT_SETTINGS_PROBE_INTERVAL
+    )
+
+
+def get_settings():
+    """Sozlamalar nusxasi (faqat o'qish uchun). Versiya o'zgargandagina qayta yuklanadi.
+
+    Baza ishlamasa oxirgi yuklangan nusxa, u ham bo'lmasa standart qiymatlar qaytariladi.
+    """
+    global _settings, _version, _checked_at
+    if _is_fresh():
+        return _settings
+    with _lock:
+        if _is_fresh():
+            return _settings
+        try:
+            version = (_local_version, _probe())
+            if version[1] is None:
+                BotSettings.load()
+                version = (_local_version, _probe())
+            if version != _version:
+                _settings = BotSettings.objects.get(pk=version[1][0])
+                _version = version
+        except Exception as e:
+            logger.error(f"BotSettings yuklashda xato: {e}", exc_info=True)
+            if _settings is None:
+                return BotSettings()
+            # Keyingi urinish BOT_SETTINGS_PROBE_INTERVAL dan keyin
+            _version = (_local_version,) + _version[1:]
+        _checked_at = time.monotonic()
+        return _settings
+
+
+async def aget_settings():
+    if _is_fresh():
+        return _settings
+    return await sync_to_async(get_settings)()
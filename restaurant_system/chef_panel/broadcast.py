@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BotSettings, BroadcastJob, Customer
+from .ratelimit import TokenBucket, chat_limiter, global_bucket
+from .utils import _message_request, acall
+
+logger = logging.getLogger(__name__)
+
+
+def create_job(text, created_by=None):
+    return BroadcastJob.objects.create(
+        text=text,
+        created_by=created_by,
+        total_recipients=Customer.objects.count(),
+    )
+
+
+def _claim_next_job():
+    """Navbatdagi yoki worker tashlab ketgan (heartbeat eskirgan) vazifani band qilish"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.BROADCAST_STALE_AFTER)
+    available = Q(status='pending') | Q(status='running', updated_at__lt=stale)
+    for job in BroadcastJob.objects.filter(available).order_by('created_at'):
+        claimed = BroadcastJob.objects.filter(available, pk=job.pk).update(
+            status='running', started_at=job.started_at or now, updated_at=now
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _next_recipients(cursor, limit):
+    return list(
+        Customer.objects.filter(id__gt=cursor).order_by('id').values_list('id', 'telegram_id')[:limit]
+    )
+
+
+def _advance(job_id, cursor, sent, failed, last_error):
+    """Chunk natijasini saqlash; updated_at worker tirikligini bildiradi (heartbeat)"""
+    fields = {
+        'cursor': cursor,
+        'sent_count': F('sent_count') + sent,
+        'failed_count': F('failed_count') + failed,
+        'updated_at': timezone.now(),
+    }
+    if last_error:
+        fields['last_error'] = last_error
+    BroadcastJob.objects.filter(pk=job_id).update(**fields)
+    return BroadcastJob.objects.values_list('status', flat=True).get(pk=job_id)
+
+
+def _release(job_id):
+    BroadcastJob.objects.filter(pk=job_id, status='running').update(status='pending', updated_at=timezone.now())
+
+
+def _finish(job_id):
+    now = timezone.now()
+    BroadcastJob.objects.filter(pk=job_id, status='running').update(status='done', finished_at=now, updated_at=now)
+    BotSettings.objects.update(last_broadcast_sent_at=now, version=F('version') + 1)
+
+
+class BroadcastWorker:
+    """E'lon vazifalarini bajaruvchi worker.
+
+    Mijozlar id tartibida chunklab olinadi, chunk ichida xabarlar parallel
+    yuboriladi. Har chunkdan keyin cursor saqlanadi va vazifa holati
+    tekshiriladi, shuning uchun to'xtatish/davom ettirish chunk chegarasida ishlaydi.
+    """
+
+    def __init__(self, concurrency=None, chunk_size=None, rate=None, poll_interval=None):
+        self.concurrency = concurrency or settings.BROADCAST_CONCURRENCY
+        self.chunk_size = chunk_size or settings.BROADCAST_CHUNK_SIZE
+        self.poll_interval = poll_interval or settings.BROADCAST_POLL_INTERVAL
+        # E'lonlar umumiy limitning bir qismini oladi, buyurtma xabarlari kutib qolmasligi uchun
+        self.bucket = TokenBucket(rate or settings.BROADCAST_RATE)
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run_forever(self):
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_next()
+            except Exception as e:
+                logger.error(f"E'lon workerida xato: {e}", exc_info=True)
+                processed = False
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_next(self):
+        job = await sync_to_async(_claim_next_job)()
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def run_job(self, job):
+        logger.info(f"E'lon #{job.id} yuborilmoqda (cursor={job.cursor})")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cursor = job.cursor
+
+        async def send(chat_id):
+            async with semaphore:
+                return await self._send(chat_id, job.text)
+
+        while not self._stopping.is_set():
+            recipients = await sync_to_async(_next_recipients)(cursor, self.chunk_size)
+            if not recipients:
+                await sync_to_async(_finish)(job.id)
+                logger.info(f"E'lon #{job.id} tugallandi")
+                return 'done'
+
+            results = await asyncio.gather(*(send(chat_id) for _, chat_id in recipients))
+            sent = sum(1 for ok, _ in results if ok)
+            errors = [error for ok, error in results if not ok]
+            cursor = recipients[-1][0]
+            status = await sync_to_async(_advance)(job.id, cursor, sent, len(errors), errors[-1] if errors else '')
+            if status != 'running':
+                logger.info(f"E'lon #{job.id} to'xtatildi: {status}")
+                return status
+        # Worker to'xtatilmoqda: vazifa keyingi ishga tushishda cursordan davom etadi
+        await sync_to_async(_release)(job.id)
+        return 'pending'
+
+    async def _send(self, chat_id, text):
+        method, payload = _message_request(chat_id, text)
+        error = ''
+        for attempt in range(settings.BROADCAST_MAX_ATTEMPTS):
+            await chat_limiter().acquire(chat_id)
+            await self.bucket.acquire()
+            await global_bucket().acquire()
+            response = await acall(method, payload)
+            if response is None:
+                error = "Tarmoq xatosi"
+                await asyncio.sleep(2 ** attempt)
+                continue
+            if response.get('ok'):
+                return True, ''
+            error = response.get('description', "Noma'lum xato")
+            if response.get('error_code') == 429:
+                global_bucket().pause(response.get('parameters', {}).get('retry_after', 1))
+                continue
+            # 400/403: chat topilmadi yoki bot bloklangan - qayta urinishdan foyda yo'q
+            logger.warning(f"E'lon yuborishda xato: {chat_id} - {error}")
+            return False, error
+        return False, error
@@ -0,0 +1,129 @@
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Category, Product
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    id: int
+    name: str
+    narx: Decimal
+    desc: str
+    image_path: str | None  # lokal fayl (Telegram /media URL ni ocholmaydi)
+    image_hash: str
+    file_id: str  # Telegram file_id (rasm hali yuklanmagan bo'lsa bo'sh)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Menyuning o'zgarmas nusxasi (snapshot). Handlerlar faqat o'qiydi."""
+    version: tuple
+    products: MappingProxyType  # nom -> CatalogProduct
+    categories: MappingProxyType  # kategoriya nomi -> mahsulot nomlari (tartiblangan tuple)
+    product_category: MappingProxyType  # mahsulot nomi -> kategoriya nomi (teskari indeks)
+
+
+EMPTY_CATALOG = Catalog(
+    version=(),
+    products=MappingProxyType({}),
+    categories=MappingProxyType({}),
+    product_category=MappingProxyType({}),
+)
+
+_catalog = EMPTY_CATALOG
+_local_version = 0
+_checked_at = None
+_lock = threading.Lock()
+
+
+def invalidate():
+    """Product/Category o'zgarganda signal orqali chaqiriladi"""
+    global _local_version
+    _local_version += 1
+
+
+def _probe():
+    # Boshqa jarayonlardagi (masalan, panel) o'zgarishlarni aniqlash uchun arzon so'rov
+    products = Product.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    categories = Category.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    return (products['last'], products['count'], categories['last'], categories['count'])
+
+
+def _image_path(product):
+    # Telegram uchun kichraytirilgan nusxa tayyor bo'lsa o'sha, aks holda asl rasm
+    if not product.image:
+        return None
+    return product.image.storage.path(product.variant_name('telegram') or product.image.name)
+
+
+def _load(version):
+    products = {}
+    by_category = {}
+    for product in Product.objects.filter(is_available=True):
+        products[product.name] = CatalogProduct(
+            id=product.id,
+            name=product.name,
+            narx=product.price,  # Keep as Decimal
+            desc=product.description,
+            image_path=_image_path(product),
+            image_hash=product.image_hash,
+            file_id=product.telegram_file_id,
+        )
+        by_category.setdefault(product.category_id, []).append(product.name)
+
+    categories = {}
+    product_category = {}
+    for category in Category.objects.filter(is_active=True):
+        names = tuple(by_category.get(category.id, ()))
+        categories[category.name] = names
+        for name in names:
+            product_category.setdefault(name, category.name)
+
+    return Catalog(
+        version=version,
+        products=MappingProxyType(products),
+        categories=MappingProxyType(categories),
+        product_category=MappingProxyType(product_category),
+    )
+
+
+def _is_fresh():
+    return (
+        _checked_at is not None
+        and _catalog.version[:1] == (_local_version,)
+        and time.monotonic() - _checked_at < settings.CATALOG_PROBE_INTERVAL
+    )
+
+
+def current_catalog():
+    """Oxirgi yuklangan snapshot (DB ga murojaat qilmaydi)"""
+    return _catalog
+
+
+def get_catalog():
+    """Snapshotni qaytaradi, versiya o'zgargan bo'lsagina qayta yuklaydi"""
+    global _catalog, _checked_at
+    if _is_fresh():
+        return _catalog
+    with _lock:
+        if _is_fresh():
+            return _catalog
+        version = (_local_version,) + _probe()
+        if version != _catalog.version:
+            _catalog = _load(version)  # atomik almashtirish
+        _checked_at = time.monotonic()
+        return _catalog
+
+
+async def aget_catalog():
+    if _is_fresh():
+        return _catalog
+    return await sync_to_async(get_catalog)()
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import DeliveryZone
+
+# Indeks katagi (gradus): ~1.1 km x 0.85 km
+BUCKET_SIZE = 0.01
+# Bundan ko'p katakka tegadigan hudud (masalan, clean() dan o'tmay bazaga yozilgan) indekslanmaydi,
+# har so'rovda to'g'ridan-to'g'ri tekshiriladi: xotira katak soniga qarab o'smaydi
+MAX_ZONE_BUCKETS = 50_000
+
+
+@dataclass(frozen=True)
+class Zone:
+    id: int
+    name: str
+    base_cost: Decimal
+    per_km_cost: Decimal
+    points: tuple  # ((lat, lon), ...)
+    bbox: tuple  # (min_lat, min_lon, max_lat, max_lon)
+    rank: int = 0  # tartib (priority, id) bo'yicha o'rni
+
+    def contains(self, lat, lon):
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            return False
+        # Ray casting: nuqtadan chiqqan nur chegarani toq marta kesib o'tsa - ichida
+        inside = False
+        points = self.points
+        j = len(points) - 1
+        for i in range(len(points)):
+            lat_i, lon_i = points[i]
+            lat_j, lon_j = points[j]
+            if (lat_i > lat) != (lat_j > lat) and lon < (lon_j - lon_i) * (lat - lat_i) / (lat_j - lat_i) + lon_i:
+                inside = not inside
+            j = i
+        return inside
+
+
+def _bucket(lat, lon):
+    return math.floor(lat / BUCKET_SIZE), math.floor(lon / BUCKET_SIZE)
+
+
+@dataclass(frozen=True)
+class ZoneIndex:
+    """Hududlarning o'zgarmas indeksi: katak -> shu katakka tegadigan hududlar (tartib bo'yicha).
+    wide - katakka ajratilmagan juda katta hududlar."""
+    version: tuple
+    zones: tuple
+    buckets: dict
+    wide: tuple = ()
+
+    def __bool__(self):
+        return bool(self.zones)
+
+    def find(self, lat, lon):
+        candidates = self.buckets.get(_bucket(lat, lon), ())
+        if self.wide:
+            candidates = sorted(candidates + self.wide, key=lambda zone: zone.rank)
+        for zone in candidates:
+            if zone.contains(lat, lon):
+                return zone
+        return None
+
+
+EMPTY_INDEX = ZoneIndex(version=(), zones=(), buckets={})
+
+_index = EMPTY_INDEX
+_local_version = 0
+_checked_at = None
+_lock = threading.Lock()
+
+
+def invalidate():
+    """DeliveryZone o'zgarganda signal orqali chaqiriladi"""
+    global _local_version
+    _local_version += 1
+
+
+def _probe():
+    # Boshqa jarayondagi (admin panel) o'zgarishlarni aniqlash uchun arzon so'rov
+    zones = DeliveryZone.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    return (zones['last'], zones['count'])
+
+
+def _compile(version):
+    zones = []
+    wide = []
+    buckets = {}
+    for rank, row in enumerate(DeliveryZone.objects.filter(is_active=True).order_by('priority', 'id')):
+        points = tuple((float(lat), float(lon)) for lat, lon in row.polygon)
+        lats = [lat for lat, _ in points]
+        lons = [lon for _, lon in points]
+        zone = Zone(
+            id=row.id,
+            name=row.name,
+            base_cost=row.base_cost,
+            per_km_cost=row.per_km_cost,
+            points=points,
+            bbox=(min(lats), min(lons), max(lats), max(lons)),
+            rank=rank,
+        )
+        zones.append(zone)
+        # Hudud chegaralovchi to'rtburchagi tegadigan barcha kataklarga yoziladi (tartib saqlanadi)
+        (south, west), (north, east) = _bucket(zone.bbox[0], zone.bbox[1]), _bucket(zone.bbox[2], zone.bbox[3])
+        if (north - south + 1) * (east - west + 1) > MAX_ZONE_BUCKETS:
+            wide.append(zone)
+            continue
+        for lat_key in range(south, north + 1):
+            for lon_key in range(west, east + 1):
+                buckets.setdefault((lat_key, lon_key), []).append(zone)
+    return ZoneIndex(
+        version=version,
+        zones=tuple(zones),
+        buckets={key: tuple(value) for key, value in buckets.items()},
+        wide=tuple(wide),
+    )
+
+
+def _is_fresh():
+    return (
+        _checked_at is not None
+        and _index.version[:1] == (_local_version,)
+        and time.monotonic() - _checked_at < settings.DELIVERY_ZONES_PROBE_INTERVAL
+    )
+
+
+def get_index():
+    """Indeksni qaytaradi, hududlar o'zgargan bo'lsagina qayta tuzadi"""
+    global _index, _checked_at
+    if _is_fresh():
+        return _index
+    with _lock:
+        if _is_fresh():
+            return _index
+        version = (_local_version,) + _probe()
+        if version != _index.version:
+            _index = _compile(version)  # atomik almashtirish
+        _checked_at = time.monotonic()
+        return _index
+
+
+async def aget_index():
+    if _is_fresh():
+        return _index
+    return await sync_to_async(get_index)()
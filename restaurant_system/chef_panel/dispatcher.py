@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NotificationOutbox, Order
+from .ratelimit import chat_limiter, global_bucket
+from .utils import _location_request, _message_request, acall
+
+logger = logging.getLogger(__name__)
+
+SENT, RETRY, FAILED = 'sent', 'retry', 'failed'
+
+
+def _claim_batch(batch_size):
+    """Yuborishga tayyor yozuvlarni band qilish (har bir chat uchun tartib saqlanadi)"""
+    now = timezone.now()
+
+    # Ishdan chiqqan worker band qilib qolgan yozuvlarni navbatga qaytarish
+    NotificationOutbox.objects.filter(
+        status='sending', claimed_at__lt=now - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+    ).update(status='pending', claim_token='')
+
+    # Yuborilayotgan yoki qayta urinishni kutayotgan xabari bor chatlar navbatdagi xabarlarni ushlab turadi
+    blocked = set(NotificationOutbox.objects.filter(status='sending').values_list('chat_id', flat=True))
+    ids = []
+    pending = NotificationOutbox.objects.filter(status='pending').values_list('id', 'chat_id', 'available_at')
+    for entry_id, chat_id, available_at in pending[:batch_size * 4]:
+        if chat_id in blocked:
+            continue
+        if available_at > now:
+            blocked.add(chat_id)
+            continue
+        ids.append(entry_id)
+        if len(ids) >= batch_size:
+            break
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    NotificationOutbox.objects.filter(pk__in=ids, status='pending').update(
+        status='sending', claim_token=token, claimed_at=now
+    )
+    return list(NotificationOutbox.objects.filter(claim_token=token, status='sending').select_related('order'))
+
+
+@transaction.atomic
+def _record_results(results):
+    now = timezone.now()
+    if results['sent']:
+        NotificationOutbox.objects.filter(pk__in=results['sent']).update(
+            status='sent', sent_at=now, claim_token='', last_error=''
+        )
+    for order_id, field, message_id in results['message_ids']:
+        Order.objects.filter(pk=order_id).update(**{field: message_id})
+    for entry_id, attempts, delay, error in results['retry']:
+        NotificationOutbox.objects.filter(pk=entry_id).update(
+            status='pending', attempts=attempts, available_at=now + timedelta(seconds=delay),
+            last_error=error, claim_token=''
+        )
+    for entry_id, attempts, error in results['failed']:
+        NotificationOutbox.objects.filter(pk=entry_id).update(
+            status='failed', attempts=attempts, last_error=error, claim_token=''
+        )
+    if results['released']:
+        NotificationOutbox.objects.filter(pk__in=results['released']).update(status='pending', claim_token='')
+
+
+class OutboxDispatcher:
+    """NotificationOutbox navbatini fon rejimida Telegramga yuboruvchi worker.
+
+    Chatlar parallel, bitta chat ichidagi xabarlar esa navbat tartibida yuboriladi.
+    Xatolarda eksponensial kutish bilan qayta uriniladi, 429 javobidagi
+    retry_after ga rioya qilinadi.
+    """
+
+    def __init__(self, batch_size=None, poll_interval=None):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    def wake(self):
+        """Yangi yozuv qo'shilganda kutmasdan navbatni tekshirish"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    async def run_forever(self):
+        self._stopping = False
+        while not self._stopping:
+            try:
+                processed = await self.dispatch_batch()
+            except Exception as e:
+                logger.error(f"Outbox dispatcher xatosi: {e}", exc_info=True)
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def drain(self):
+        """Navbatdagi barcha tayyor xabarlarni yuborish (management command va sinov uchun)"""
+        total = 0
+        while processed := await self.dispatch_batch():
+            total += processed
+        return total
+
+    async def dispatch_batch(self):
+        entries = await sync_to_async(_claim_batch)(self.batch_size)
+        if not entries:
+            return 0
+
+        by_chat = {}
+        for entry in entries:
+            by_chat.setdefault(entry.chat_id, []).append(entry)
+
+        results = {'sent': [], 'message_ids': [], 'retry': [], 'failed': [], 'released': []}
+        await asyncio.gather(*(self._process_chat(chat_entries, results) for chat_entries in by_chat.values()))
+        await sync_to_async(_record_results)(results)
+        return len(entries)
+
+    async def _process_chat(self, entries, results):
+        message_ids = {}
+        for index, entry in enumerate(entries):
+            outcome = await self._send(entry, message_ids, results)
+            if outcome == RETRY:
+                # Keyingi xabarlar tartibni buzmasligi uchun navbatga qaytariladi
+                results['released'].extend(e.id for e in entries[index + 1:])
+                return
+
+    def _message_id(self, entry, message_ids):
+        key = (entry.order_id, entry.message_field)
+        if key in message_ids:
+            return message_ids[key]
+        if entry.order is not None and entry.message_field:
+            return getattr(entry.order, entry.message_field)
+        return None
+
+    async def _send(self, entry, message_ids, results):
+        if entry.kind == 'location':
+            method, payload = _location_request(entry.chat_id, entry.payload['latitude'], entry.payload['longitude'])
+        else:
+            message_id = self._message_id(entry, message_ids) if entry.mode != 'send' else None
+            if entry.mode == 'edit' and not message_id:
+                # Tahrirlanadigan xabar yo'q - yuboriladigan narsa ham yo'q
+                results['sent'].append(entry.id)
+                return SENT
+            method, payload = _message_request(entry.chat_id, entry.text, entry.reply_markup, message_id)
+
+        await chat_limiter().acquire(entry.chat_id)
+        await global_bucket().acquire()
+        response = await acall(method, payload)
+        attempts = entry.attempts + 1
+
+        if response and response.get('ok'):
+            if method == 'sendMessage' and entry.message_field and entry.order_id:
+                new_id = response['result']['message_id']
+                message_ids[(entry.order_id, entry.message_field)] = new_id
+                results['message_ids'].append((entry.order_id, entry.message_field, new_id))
+            results['sent'].append(entry.id)
+            return SENT
+
+        if response is None:
+            return self._retry(entry, attempts, "Tarmoq xatosi", results)
+
+        error_code = response.get('error_code')
+        description = response.get('description', '')
+        if error_code == 429:
+            retry_after = response.get('parameters', {}).get('retry_after', 1)
+            # Flood limit butun bot uchun: barcha yuborishlarni to'xtatib turamiz
+            global_bucket().pause(retry_after)
+            results['retry'].append((entry.id, entry.attempts, retry_after, description))
+            return RETRY
+        if 'message is not modified' in description:
+            results['sent'].append(entry.id)
+            return SENT
+        if error_code and 400 <= error_code < 500:
+            results['failed'].append((entry.id, attempts, description))
+            return FAILED
+        return self._retry(entry, attempts, description, results)
+
+    def _retry(self, entry, attempts, error, results):
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            results['failed'].append((entry.id, attempts, error))
+            return FAILED
+        delay = min(settings.OUTBOX_RETRY_BASE * 2 ** entry.attempts, settings.OUTBOX_RETRY_MAX)
+        results['retry'].append((entry.id, attempts, delay, error))
+        return RETRY
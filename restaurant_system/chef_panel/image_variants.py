@@ -0,0 +1,114 @@
+import io
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+# nom -> (eng katta tomoni px, format, sifat)
+VARIANTS = {
+    'telegram': (1280, 'JPEG', 85),  # Telegram rasmlarni baribir 1280 px gacha siqadi
+    'thumb': (480, 'JPEG', 80),  # panel kartochkasi
+    'webp': (480, 'WEBP', 80),  # panel, WebP ni qo'llab-quvvatlaydigan brauzerlar uchun
+}
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+VARIANT_DIR = 'products/variants'
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def variant_path(image_hash, name):
+    # Fayl nomi rasm xeshidan: bir xil rasm qayta yuklansa nusxalar qayta yaratilmaydi
+    _, fmt, _ = VARIANTS[name]
+    return f"{VARIANT_DIR}/{image_hash[:32]}-{name}.{EXTENSIONS[fmt]}"
+
+
+def is_stale(product):
+    return bool(product.image_hash) and (product.image_variants or {}).get('hash') != product.image_hash
+
+
+def _render(source, size, fmt, quality):
+    image = source.copy()
+    image.thumbnail((size, size), Image.LANCZOS)  # faqat kichraytiradi
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buffer, fmt, quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, fmt, quality=quality, method=6)
+    return buffer.getvalue()
+
+
+def build(product):
+    """Nusxalarni yaratish. Shu orada rasm almashtirilgan bo'lsa natija yozilmaydi."""
+    image_hash = product.image_hash
+    storage = product.image.storage
+    try:
+        with product.image.open('rb') as file:
+            source = ImageOps.exif_transpose(Image.open(file))
+            source = source.convert('RGB')
+    except OSError as e:
+        logger.error(f"Mahsulot {product.id} rasmini ochib bo'lmadi: {e}")
+        return 0
+
+    variants = {'hash': image_hash}
+    for name, (size, fmt, quality) in VARIANTS.items():
+        path = variant_path(image_hash, name)
+        if not storage.exists(path):
+            path = storage.save(path, ContentFile(_render(source, size, fmt, quality)))
+        variants[name] = path
+
+    # updated_at: bot katalogi qayta yuklanadi. Asl rasmning file_id si tashlanadi,
+    # Telegramga endi kichik nusxa yuboriladi (yoki warm_product_photos yuklaydi)
+    return Product.objects.filter(pk=product.pk, image_hash=image_hash).update(
+        image_variants=variants, telegram_file_id='', updated_at=timezone.now()
+    )
+
+
+def process(product_id):
+    product = Product.objects.filter(pk=product_id).first()
+    if product is None or not is_stale(product):
+        return 0
+    return build(product)
+
+
+def build_pending():
+    """Nusxasi yo'q yoki eskirgan barcha mahsulotlar (manage.py build_image_variants)"""
+    built = 0
+    for product in Product.objects.exclude(image_hash='').order_by('id'):
+        if is_stale(product):
+            built += build(product)
+    return built
+
+
+def _run():
+    while True:
+        product_id = _queue.get()
+        try:
+            process(product_id)
+        except Exception as e:
+            logger.error(f"Mahsulot {product_id} rasm nusxalarini yaratishda xato: {e}", exc_info=True)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def schedule(product_id):
+    """Nusxalarni fon oqimida yaratish. So'rov (upload) yaratish tugashini kutmaydi."""
+    global _worker
+    if not settings.PRODUCT_IMAGE_WORKER:
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='product-image-variants', daemon=True)
+            _worker.start()
+    _queue.put(product_id)
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+from urllib.parse import parse_qs
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+
+from chef_panel.telegram_stub import StubTelegramServer
+
+BENCH_TOKEN = '123456:BENCH'
+BENCH_SECRET = 'bench-secret-token'
+
+
+def _fake_update(update_id):
+    chat_id = 10 ** 6 + update_id % 50
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+            'text': '/start',
+        },
+    }
+
+
+def _parse_params(body, headers):
+    if not body:
+        return {}
+    if headers.get('Content-Type', '').startswith('application/json'):
+        return json.loads(body)
+    return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class _UpdatesStub(StubTelegramServer):
+    """getUpdates (long polling), getMe va setWebhook ni qo'llab-quvvatlaydigan stub.
+
+    `network_latency` - Telegram bilan bir tomonlama tarmoq kechikishi.
+    """
+
+    def __init__(self, *args, network_latency=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.network_latency = network_latency
+        self._updates = []
+        self._cond = threading.Condition()
+
+    def push(self, update):
+        with self._cond:
+            self._updates.append(update)
+            self._cond.notify_all()
+
+    def handle(self, method, body, headers):
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {'id': 123456, 'is_bot': True, 'first_name': 'Bench',
+                                                'username': 'bench_bot'}}
+        if method in ('setWebhook', 'deleteWebhook'):
+            return 200, {'ok': True, 'result': True}
+        if method != 'getUpdates':
+            return super().handle(method, body, headers)
+
+        params = _parse_params(body, headers)
+        offset = int(params.get('offset') or 0)
+        deadline = time.monotonic() + float(params.get('timeout') or 0)
+        time.sleep(self.network_latency)  # so'rov Telegramga yetib borishi
+        with self._cond:
+            self._updates = [u for u in self._updates if u['update_id'] >= offset]
+            while not self._updates and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+            batch = self._updates[:100]
+        time.sleep(self.network_latency)  # javob qaytib kelishi
+        return 200, {'ok': True, 'result': batch}
+
+
+class Command(BaseCommand):
+    help = "Bot updatelarini qabul qilish: polling va webhook rejimlarini soxta update generatori bilan solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--updates', type=int, default=500)
+        parser.add_argument('--rate', type=float, default=200.0, help="Generator tezligi (update/soniya)")
+        parser.add_argument('--latency-ms', type=float, default=40.0,
+                            help="Telegram bilan bir tomonlama tarmoq kechikishi (ms)")
+        parser.add_argument('--handler-ms', type=float, default=2.0, help="Handler ichidagi ish vaqti (ms)")
+        parser.add_argument('--concurrent-updates', type=int, default=1)
+        parser.add_argument('--modes', nargs='+', choices=['polling', 'webhook'], default=['polling', 'webhook'])
+
+    def handle(self, *args, **options):
+        rows = []
+        for mode in options['modes']:
+            stub = _UpdatesStub(network_latency=options['latency_ms'] / 1000)
+            with stub:
+                elapsed, latencies = asyncio.run(self._run_mode(mode, stub, options))
+            rows.append((mode, len(latencies) / elapsed, latencies))
+
+        self.stdout.write(f"{'rejim':<10} {'update/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for mode, rate, latencies in rows:
+            p95 = statistics.quantiles(latencies, n=100)[94]
+            self.stdout.write(
+                f"{mode:<10} {rate:10.1f} {statistics.median(latencies) * 1000:8.1f} "
+                f"{p95 * 1000:8.1f} {max(latencies) * 1000:8.1f}"
+            )
+
+    async def _run_mode(self, mode, stub, options):
+        count = options['updates']
+        created = {}
+        latencies = []
+        done = asyncio.Event()
+
+        async def on_update(update, context):
+            if options['handler_ms']:
+                await asyncio.sleep(options['handler_ms'] / 1000)
+            # Update Telegramda paydo bo'lgan paytdan handler tugagunigacha
+            latencies.append(time.perf_counter() - created[update.update_id])
+            if len(latencies) >= count:
+                done.set()
+
+        application = (
+            ApplicationBuilder()
+            .token(BENCH_TOKEN)
+            .base_url(stub.base_url)
+            .concurrent_updates(options['concurrent_updates'])
+            .build()
+        )
+        application.add_handler(TypeHandler(Update, on_update))
+
+        async with application:
+            if mode == 'polling':
+                await application.updater.start_polling(poll_interval=0, timeout=10)
+            else:
+                port = _free_port()
+                webhook_url = f"http://127.0.0.1:{port}/bench"
+                await application.updater.start_webhook(
+                    listen='127.0.0.1', port=port, url_path='bench',
+                    webhook_url=webhook_url, secret_token=BENCH_SECRET,
+                )
+            await application.start()
+
+            started = time.perf_counter()
+            if mode == 'polling':
+                await self._generate_polling(stub, created, count, options['rate'])
+            else:
+                # Generator alohida thread va event loopda: Telegram tashqi tizim, bot loopini band qilmasligi kerak
+                await asyncio.to_thread(asyncio.run, self._generate_webhook(webhook_url, created, count, options))
+            await asyncio.wait_for(done.wait(), timeout=120)
+            elapsed = time.perf_counter() - started
+
+            await application.updater.stop()
+            await application.stop()
+        return elapsed, latencies
+
+    async def _generate_polling(self, stub, created, count, rate):
+        started = time.perf_counter()
+        for update_id in range(1, count + 1):
+            await asyncio.sleep(max(0.0, started + update_id / rate - time.perf_counter()))
+            created[update_id] = time.perf_counter()
+            stub.push(_fake_update(update_id))
+
+    async def _generate_webhook(self, url, created, count, options):
+        one_way = options['latency_ms'] / 1000
+        # Telegram bitta webhookka max_connections (standart 40) tagacha parallel so'rov yuboradi
+        semaphore = asyncio.Semaphore(40)
+
+        async with httpx.AsyncClient(limits=httpx.Limits(max_connections=40)) as client:
+            response = await client.post(url, json=_fake_update(0), headers={
+                'X-Telegram-Bot-Api-Secret-Token': 'wrong-secret'})
+            if response.status_code != 403:
+                raise CommandError(f"Noto'g'ri secret token qabul qilindi (HTTP {response.status_code})")
+
+            async def deliver(update_id):
+                created[update_id] = time.perf_counter()
+                await asyncio.sleep(one_way)
+                async with semaphore:
+                    response = await client.post(url, json=_fake_update(update_id), headers={
+                        'X-Telegram-Bot-Api-Secret-Token': BENCH_SECRET})
+                if response.status_code != 200:
+                    raise CommandError(f"Webhook javobi: HTTP {response.status_code}")
+
+            started = time.perf_counter()
+            tasks = []
+            for update_id in range(1, count + 1):
+                await asyncio.sleep(max(0.0, started + update_id / options['rate'] - time.perf_counter()))
+                tasks.append(asyncio.create_task(deliver(update_id)))
+            await asyncio.gather(*tasks)
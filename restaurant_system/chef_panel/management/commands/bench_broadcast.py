@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from chef_panel import utils
+from chef_panel.broadcast import BroadcastWorker
+from chef_panel.models import BroadcastJob, Customer
+from chef_panel.telegram_stub import StubTelegramServer
+
+BENCH_CHAT_ID = 9 * 10 ** 12
+
+
+class _RecordingStub(StubTelegramServer):
+    """Har bir chatga nechta xabar kelganini hisoblaydi, ba'zi chatlar uchun 403 qaytaradi"""
+
+    def __init__(self, *args, blocked_every=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocked_every = blocked_every
+        self.chats = Counter()
+
+    def handle(self, method, body, headers):
+        chat_id = json.loads(body)['chat_id']
+        self.chats[chat_id] += 1
+        if self.blocked_every and (chat_id - BENCH_CHAT_ID) % self.blocked_every == 0:
+            return 403, {'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'}
+        return super().handle(method, body, headers)
+
+
+class Command(BaseCommand):
+    help = "E'lon yuborish tezligini lokal stub API ga qarshi o'lchash (eski ketma-ket usul va yangi worker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=200)
+        parser.add_argument('--latency-ms', type=float, default=100.0, help="Stub API javob kechikishi (ms)")
+        parser.add_argument('--rate', type=float, default=30.0, help="Umumiy limit (xabar/soniya)")
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--blocked-every', type=int, default=10,
+                            help="Har N-chi mijoz botni bloklagan (403)")
+        parser.add_argument('--skip-legacy', action='store_true')
+
+    def handle(self, *args, **options):
+        count = options['recipients']
+        text = "📢 Bugun barcha osh turlariga 10% chegirma!"
+
+        customers = Customer.objects.bulk_create([
+            Customer(telegram_id=BENCH_CHAT_ID + i, full_name=f'Bench {i}', phone_number='+998000000000')
+            for i in range(count)
+        ])
+        # Cursor bench mijozlaridan oldinga qo'yiladi, haqiqiy mijozlarga (stubga bo'lsa ham) yuborilmaydi
+        job = BroadcastJob.objects.create(text=text, status='running', total_recipients=count,
+                                          cursor=customers[0].id - 1)
+        try:
+            stub = _RecordingStub(latency=options['latency_ms'] / 1000, blocked_every=options['blocked_every'])
+            overrides = {
+                'TELEGRAM_API_BASE_URL': stub.base_url,
+                'TELEGRAM_GLOBAL_RATE': options['rate'],
+            }
+            with stub, override_settings(**overrides):
+                legacy_rate = None
+                if not options['skip_legacy']:
+                    legacy_rate = self._run_legacy(customers, text)
+                    stub.chats.clear()
+                    utils.close_client()
+
+                worker = BroadcastWorker(concurrency=options['concurrency'], rate=options['rate'])
+                started = time.perf_counter()
+                status = asyncio.run(self._run_worker(worker, job))
+                elapsed = time.perf_counter() - started
+
+            job.refresh_from_db()
+            duplicates = sum(1 for n in stub.chats.values() if n > 1)
+            rate = count / elapsed
+            if legacy_rate:
+                self.stdout.write(f"{'ketma-ket (eski)':<24} {legacy_rate:8.1f} msg/s")
+            self.stdout.write(f"{'worker':<24} {rate:8.1f} msg/s  (limit {options['rate']:.0f}/s)")
+            self.stdout.write(
+                f"holat={status} yuborildi={job.sent_count} xato={job.failed_count} takroriy={duplicates}"
+            )
+            if job.sent_count + job.failed_count != count or duplicates:
+                raise CommandError("Har bir mijozga aynan bitta xabar yuborilmadi")
+            # Token bucket boshida capacity (= rate) ta xabarni birdaniga chiqarishi mumkin
+            if count > options['rate'] * (elapsed + 1) * 1.05:
+                raise CommandError("Limitdan oshib ketildi")
+            self.stdout.write(self.style.SUCCESS("OK"))
+        finally:
+            job.delete()
+            Customer.objects.filter(telegram_id__gte=BENCH_CHAT_ID, telegram_id__lt=BENCH_CHAT_ID + count).delete()
+
+    def _run_legacy(self, customers, text):
+        # Eski admin amali: har bir mijozga ketma-ket, bloklovchi so'rov
+        started = time.perf_counter()
+        for customer in customers:
+            utils.send_telegram_message(chat_id=customer.telegram_id, text=text)
+        return len(customers) / (time.perf_counter() - started)
+
+    async def _run_worker(self, worker, job):
+        try:
+            return await worker.run_job(job)
+        finally:
+            await utils.aclose_client()
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from chef_panel.models import Category, Product
+from chef_panel.services import create_order
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Buyurtma yaratishdagi SQL so'rovlar soni savat hajmiga bog'liq emasligini tekshirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 20, 100])
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        results = []
+        try:
+            # Hamma narsa tranzaksiya ichida bajariladi va oxirida bekor qilinadi
+            with transaction.atomic():
+                category = Category.objects.create(name='__bench__')
+                Product.objects.bulk_create([
+                    Product(category=category, name=f'__bench_{i}__', price=1000 + i)
+                    for i in range(max(sizes))
+                ])
+                for size in sizes:
+                    items = [(f'__bench_{i}__', 2) for i in range(size)]
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        create_order(10 ** 12 + size, 'Bench', '+998000000000', items, delivery_cost=5000)
+                        elapsed = time.perf_counter() - started
+                    results.append((size, len(captured), elapsed))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        for size, queries, elapsed in results:
+            self.stdout.write(f"savat={size:<5} so'rovlar={queries:<4} vaqt={elapsed * 1000:.1f} ms")
+
+        if len({queries for _, queries, _ in results}) != 1:
+            raise CommandError("So'rovlar soni savat hajmiga qarab o'zgarmoqda")
+        self.stdout.write(self.style.SUCCESS("OK: so'rovlar soni savat hajmiga bog'liq emas"))
@@ -0,0 +1,197 @@
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chef_panel.models import Customer, Order, OrderStatusHistory
+from chef_panel.order_feed import ACTIVE_STATUSES
+
+BENCH_ALIAS = 'bench_indexes'
+INDEXED_MODELS = [Order, OrderStatusHistory]
+
+
+def _insert(connection, model, rows):
+    fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(connection.ops.quote_name(f.column) for f in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, ([row.get(f.attname) for f in fields] for row in rows))
+
+
+def _ts(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+class Command(BaseCommand):
+    help = ("Buyurtma indekslari: vaqtinchalik SQLite bazaga buyurtmalarni yozib, "
+            "asosiy so'rovlarning rejasi va tezligini indekslarsiz va indekslar bilan solishtirish")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--customers', type=int, default=50_000)
+        parser.add_argument('--active', type=int, default=200, help="Faol (yangi/tasdiqlangan/...) buyurtmalar soni")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--keep', action='store_true', help="Bench bazasini o'chirmaslik")
+
+    def handle(self, *args, **options):
+        workdir = tempfile.mkdtemp(prefix='bench_indexes_')
+        config = dict(connections['default'].settings_dict)
+        config.update(ENGINE='django.db.backends.sqlite3', NAME=os.path.join(workdir, 'bench.sqlite3'))
+        connections.settings[BENCH_ALIAS] = config
+        connection = connections[BENCH_ALIAS]
+        try:
+            self._create_schema(connection)
+            started = time.perf_counter()
+            sample = self._seed(connection, options)
+            self.stdout.write(f"Ma'lumot yozildi: {time.perf_counter() - started:.1f} s ({config['NAME']})")
+
+            self._set_indexes(connection, enabled=False)
+            before = self._measure(connection, sample, options['repeat'])
+            started = time.perf_counter()
+            self._set_indexes(connection, enabled=True)
+            self.stdout.write(f"Indekslar yaratildi: {time.perf_counter() - started:.1f} s")
+            after = self._measure(connection, sample, options['repeat'])
+
+            self._report(before, after)
+        finally:
+            connection.close()
+            del connections[BENCH_ALIAS]
+            del connections.settings[BENCH_ALIAS]
+            if options['keep']:
+                self.stdout.write(f"Bench bazasi saqlandi: {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def _create_schema(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode = OFF')
+            cursor.execute('PRAGMA synchronous = OFF')
+        with connection.schema_editor() as editor:
+            for model in [Customer, Order, OrderStatusHistory]:
+                editor.create_model(model)
+
+    def _seed(self, connection, options):
+        rng = random.Random(42)
+        count = options['orders']
+        customers = options['customers']
+        now = timezone.now()
+        start = now - timedelta(days=365)
+        step = (now - start) / count
+
+        def customer_rows():
+            for i in range(customers):
+                yield {'telegram_id': 10 ** 9 + i, 'full_name': f'Mijoz {i}',
+                       'phone_number': '+998900000000', 'created_at': _ts(start)}
+
+        def status_for(i):
+            # Faol buyurtmalar faqat eng oxirgilari, qolganlari allaqachon yopilgan
+            if i >= count - options['active']:
+                return rng.choice(ACTIVE_STATUSES + ['tayor', 'yolda'])
+            return 'bekor_qilingan' if rng.random() < 0.08 else 'yetkazildi'
+
+        statuses = []
+
+        def order_rows():
+            for i in range(count):
+                status = status_for(i)
+                statuses.append(status)
+                yield {
+                    'customer_id': rng.randint(1, customers),
+                    'order_number': str(1000 + i),
+                    'status': status,
+                    'payment_method': 'naqd',
+                    'address': 'Bench',
+                    'products_total': 50000,
+                    'delivery_cost': 10000,
+                    'total_amount': 60000,
+                    'created_at': _ts(start + step * i),
+                }
+
+        def history_rows():
+            for i, status in enumerate(statuses):
+                created = start + step * i
+                yield {'order_id': i + 1, 'old_status': '', 'new_status': 'yangi', 'changed_at': _ts(created),
+                       'notes': ''}
+                if status != 'yangi':
+                    yield {'order_id': i + 1, 'old_status': 'yangi', 'new_status': status,
+                           'changed_at': _ts(created + timedelta(minutes=30)), 'notes': ''}
+
+        with connection.cursor() as cursor:
+            # auth_user jadvali yaratilmaydi (changed_by hammasi NULL), FK tekshiruvi kerak emas
+            cursor.execute('PRAGMA foreign_keys = OFF')
+        with transaction.atomic(using=BENCH_ALIAS):
+            _insert(connection, Customer, customer_rows())
+            _insert(connection, Order, order_rows())
+            _insert(connection, OrderStatusHistory, history_rows())
+
+        return {
+            'customer_id': rng.randint(1, customers),
+            'order_id': rng.randint(1, count),
+            'today': now.replace(hour=0, minute=0, second=0, microsecond=0),
+        }
+
+    def _set_indexes(self, connection, enabled):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    if enabled:
+                        editor.add_index(model, index)
+                    else:
+                        editor.remove_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _queries(self, sample):
+        orders = Order.objects.using(BENCH_ALIAS)
+        history = OrderStatusHistory.objects.using(BENCH_ALIAS)
+        return [
+            ("dashboard: yangi soni", lambda: orders.filter(status='yangi').count()),
+            ("dashboard: bugungi", lambda: orders.filter(created_at__gte=sample['today']).count()),
+            ("new_orders", lambda: list(orders.filter(status__in=ACTIVE_STATUSES).order_by('-created_at')[:50])),
+            ("order_list: holat", lambda: list(orders.filter(status='bekor_qilingan').order_by('-created_at')[:20])),
+            ("order_list: hammasi", lambda: list(orders.order_by('-created_at')[:20])),
+            ("mijoz buyurtmalari", lambda: list(
+                orders.filter(customer_id=sample['customer_id']).order_by('-created_at')[:10])),
+            ("holat tarixi", lambda: list(history.filter(order_id=sample['order_id']).order_by('changed_at'))),
+        ]
+
+    def _measure(self, connection, sample, repeat):
+        results = {}
+        for name, run in self._queries(sample):
+            with CaptureQueriesContext(connection) as ctx:
+                run()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + ctx.captured_queries[-1]['sql'])
+                plan = [row[-1] for row in cursor.fetchall()]
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            results[name] = (statistics.median(timings) * 1000, plan)
+        return results
+
+    def _report(self, before, after):
+        self.stdout.write('')
+        self.stdout.write(f"{'so`rov':<24} {'oldin ms':>10} {'keyin ms':>10} {'tezlashish':>11}")
+        for name, (before_ms, _) in before.items():
+            after_ms = after[name][0]
+            self.stdout.write(
+                f"{name:<24} {before_ms:10.2f} {after_ms:10.2f} {before_ms / max(after_ms, 1e-6):10.1f}x"
+            )
+        for name, (_, plan) in before.items():
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write("  oldin: " + ' | '.join(plan))
+            self.stdout.write("  keyin: " + ' | '.join(after[name][1]))
@@ -0,0 +1,135 @@
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from chef_panel import order_feed, stats
+from chef_panel.models import Category, Customer, Order, OrderItem, Product
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Sahifa uchun ruxsat etilgan eng ko'p so'rovlar soni (buyurtmalar soniga bog'liq bo'lmasligi kerak)
+QUERY_BUDGET = {
+    'new_orders': 4,
+    'order_list': 2,
+    'order_list?status=yangi': 2,
+    'order_detail': 3,
+    'dashboard': 4,
+}
+
+
+class Command(BaseCommand):
+    help = ("Panel sahifalarini (new_orders, order_list, order_detail, dashboard) turli hajmdagi "
+            "buyurtmalar bilan render qilib, SQL so'rovlar soni o'zgarmasligini tekshirish")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5, 30, 100],
+                            help="Faol buyurtmalar soni")
+        parser.add_argument('--history', type=int, default=2000, help="Yopilgan (eski) buyurtmalar soni")
+        parser.add_argument('--items', type=int, default=4, help="Buyurtmadagi o'rtacha mahsulotlar soni")
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        results = []
+        try:
+            # Hamma narsa tranzaksiya ichida bajariladi va oxirida bekor qilinadi
+            with transaction.atomic():
+                products, customers = self._seed_catalog()
+                self._add_orders(rng, products, customers, options['history'], options['items'], closed=True)
+                active = 0
+                for size in sorted(options['sizes']):
+                    self._add_orders(rng, products, customers, size - active, options['items'], closed=False)
+                    active = size
+                    results.append((size, self._measure(), self._naive_new_orders()))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        pages = list(QUERY_BUDGET)
+        self.stdout.write(f"{'faol':>5}  " + '  '.join(f"{page:>24}" for page in pages) + f"  {'eski new_orders':>16}")
+        for size, measured, naive in results:
+            cells = '  '.join(f"{measured[page][0]:>3} so'rov {measured[page][1]:7.1f} ms" for page in pages)
+            self.stdout.write(f"{size:>5}  {cells}  {naive:>9} so'rov")
+
+        errors = []
+        for page in pages:
+            counts = {measured[page][0] for _, measured, _ in results}
+            if len(counts) != 1:
+                errors.append(f"{page}: so'rovlar soni buyurtmalar soniga qarab o'zgarmoqda {sorted(counts)}")
+            elif max(counts) > QUERY_BUDGET[page]:
+                errors.append(f"{page}: {max(counts)} so'rov, ruxsat etilgani {QUERY_BUDGET[page]}")
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS("OK: sahifalar O(1) so'rov bilan render qilinadi"))
+
+    def _seed_catalog(self):
+        category = Category.objects.create(name='__bench__')
+        products = Product.objects.bulk_create([
+            Product(category=category, name=f'__bench_{i}__', price=15000 + 1000 * i) for i in range(20)
+        ])
+        customers = Customer.objects.bulk_create([
+            Customer(telegram_id=8 * 10 ** 12 + i, full_name=f'Bench mijoz {i}', phone_number='+998901234567')
+            for i in range(200)
+        ])
+        return products, customers
+
+    def _add_orders(self, rng, products, customers, count, items, closed):
+        offset = Order.objects.filter(order_number__startswith='__b').count()
+        orders = Order.objects.bulk_create([
+            Order(
+                customer=rng.choice(customers),
+                order_number=f'__b{offset + i}',
+                status=rng.choice(['yetkazildi', 'bekor_qilingan'] if closed else order_feed.ACTIVE_STATUSES),
+                address='Bench manzil',
+                products_total=50000,
+                delivery_cost=10000,
+                total_amount=60000,
+            )
+            for i in range(count)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=2, price=product.price, total=2 * product.price)
+            for order in orders
+            for product in rng.sample(products, rng.randint(max(1, items - 2), items + 2))
+        ])
+
+    def _measure(self):
+        client = Client()
+        order = Order.objects.filter(order_number__startswith='__b', status='yangi').first()
+        urls = {
+            'new_orders': reverse('chef_panel:new_orders'),
+            'order_list': reverse('chef_panel:order_list'),
+            'order_list?status=yangi': reverse('chef_panel:order_list') + '?status=yangi',
+            'order_detail': reverse('chef_panel:order_detail', args=[order.id]),
+            'dashboard': reverse('chef_panel:dashboard'),
+        }
+        measured = {}
+        for page, url in urls.items():
+            # Keshlar tozalanadi: har safar eng yomon holat (sovuq render) o'lchanadi
+            cache.delete(stats.DASHBOARD_CACHE_KEY)
+            order_feed.notify()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f"{url}: HTTP {response.status_code}")
+            measured[page] = (len(captured), elapsed * 1000)
+        return measured
+
+    def _naive_new_orders(self):
+        # Taqqoslash uchun: prefetchsiz queryset bilan bir xil kartochkalar
+        orders = Order.objects.filter(status__in=order_feed.ACTIVE_STATUSES).order_by('-created_at')
+        with CaptureQueriesContext(connection) as captured:
+            for order in orders:
+                render_to_string('chef_panel/partials/order_card.html', {'order': order})
+        return len(captured)
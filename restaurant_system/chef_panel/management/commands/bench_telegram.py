@@ -0,0 +1,72 @@
+import asyncio
+import json
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from chef_panel import utils
+from chef_panel.telegram_stub import StubTelegramServer
+
+
+def _legacy_send(chat_id, text):
+    # Eski usul: har bir xabar uchun alohida ulanish, timeout yo'q
+    url = f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
+    response = requests.post(url, json={'chat_id': chat_id, 'text': text, 'parse_mode': 'Markdown',
+                                        'reply_markup': json.dumps({'inline_keyboard': []})})
+    response.raise_for_status()
+    return response.json()
+
+
+class Command(BaseCommand):
+    help = "Telegram transportini lokal stub API ga qarshi o'lchash (xabar/soniya)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=300)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--latency-ms', type=float, default=20.0,
+                            help="Stub API javob kechikishi (ms)")
+        parser.add_argument('--handshake-ms', type=float, default=60.0,
+                            help="Yangi ulanish (TCP+TLS) narxi (ms)")
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        concurrency = options['concurrency']
+        text = "🍽 *Yangi buyurtma #1*\n• 2 dona Osh - 60,000 so'm"
+
+        stub = StubTelegramServer(latency=options['latency_ms'] / 1000,
+                                  connect_latency=options['handshake_ms'] / 1000)
+        with stub:
+            with override_settings(TELEGRAM_API_BASE_URL=stub.base_url):
+                results = [
+                    ('requests.post (eski)', self._run_sync(lambda i: _legacy_send(i, text), count)),
+                    ('pooled sync', self._run_sync(lambda i: utils.send_telegram_message(i, text), count)),
+                    (f'pooled async x{concurrency}', asyncio.run(self._run_async(text, count, concurrency))),
+                ]
+                utils.close_client()
+
+        baseline = results[0][1]
+        for name, rate in results:
+            self.stdout.write(f"{name:<24} {rate:10.1f} msg/s  ({rate / baseline:.1f}x)")
+        self.stdout.write(f"Stub: {stub.requests} so'rov, {stub.connections} ta ulanish")
+
+    def _run_sync(self, send, count):
+        started = time.perf_counter()
+        for i in range(count):
+            send(i)
+        return count / (time.perf_counter() - started)
+
+    async def _run_async(self, text, count, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(i):
+            async with semaphore:
+                await utils.asend_telegram_message(i, text)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(count)))
+        elapsed = time.perf_counter() - started
+        await utils.aclose_client()
+        return count / elapsed
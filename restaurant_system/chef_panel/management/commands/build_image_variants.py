@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from chef_panel import image_variants
+
+
+class Command(BaseCommand):
+    help = "Nusxasi yo'q yoki eskirgan mahsulot rasmlari uchun Telegram, panel va WebP nusxalarini yaratish"
+
+    def handle(self, *args, **options):
+        built = image_variants.build_pending()
+        self.stdout.write(self.style.SUCCESS(f"{built} ta mahsulot rasmi qayta ishlandi"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from chef_panel import search
+
+
+class Command(BaseCommand):
+    help = "Buyurtmalar qidiruv indeksini (SQLite FTS5) qayta yaratish"
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            self.stdout.write("Bu bazada qidiruv indeksi ishlatilmaydi")
+            return
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} ta buyurtma indekslandi"))
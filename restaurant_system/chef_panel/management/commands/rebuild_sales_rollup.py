@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chef_panel import rollup
+
+
+class Command(BaseCommand):
+    help = "Savdo yig'indilarini (SalesRollup) buyurtmalar jadvalidan qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Faqat oxirgi N kunni qayta hisoblash (standart: hammasi)")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            since = timezone.now() - timedelta(days=options['days'])
+        count = rollup.rebuild(since)
+        self.stdout.write(self.style.SUCCESS(f"{count} ta yig'indi qatori yozildi"))
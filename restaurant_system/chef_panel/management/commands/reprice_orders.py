@@ -0,0 +1,42 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chef_panel import delivery_zones, pricing
+from chef_panel.bot_settings import get_settings
+from chef_panel.models import Order
+
+
+class Command(BaseCommand):
+    help = ("Lokatsiyali buyurtmalarning yetkazib berish narxini joriy tarif (BotSettings yoki hududlar) bo'yicha "
+            "qayta hisoblash (faqat hisobot, buyurtmalar o'zgartirilmaydi)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Faqat oxirgi N kun (standart: hammasi)")
+
+    def handle(self, *args, **options):
+        orders = Order.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        if options['days']:
+            orders = orders.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        rows = list(orders.values_list('latitude', 'longitude', 'delivery_cost'))
+        if not rows:
+            self.stdout.write("Lokatsiyali buyurtmalar yo'q")
+            return
+
+        latitudes, longitudes, old_costs = zip(*rows)
+        started = time.perf_counter()
+        _, costs = pricing.quote_many(latitudes, longitudes, get_settings(), delivery_zones.get_index())
+        elapsed = time.perf_counter() - started
+
+        changed = [(old, new) for old, new in zip(old_costs, costs) if new is not None and new != old]
+        outside = sum(1 for cost in costs if cost is None)
+        old_total = sum(old for old, _ in changed)
+        new_total = sum(new for _, new in changed)
+        self.stdout.write(
+            f"{len(rows)} ta buyurtma {elapsed * 1000:.1f} ms da narxlandi "
+            f"({'numpy' if pricing.np is not None else 'python'})"
+        )
+        self.stdout.write(f"Narxi o'zgaradigan: {len(changed)} ({old_total:,} -> {new_total:,} so'm)")
+        self.stdout.write(f"Joriy xizmat hududidan tashqarida: {outside}")
@@ -0,0 +1,31 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from chef_panel.broadcast import BroadcastWorker
+from chef_panel.utils import aclose_client
+
+
+class Command(BaseCommand):
+    help = "E'lon (broadcast) vazifalarini bajaruvchi workerni ishga tushirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Navbatdagi vazifalarni bajarib chiqib ketish")
+        parser.add_argument('--concurrency', type=int, default=None)
+
+    def handle(self, *args, **options):
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        worker = BroadcastWorker(concurrency=options['concurrency'])
+        try:
+            if options['once']:
+                count = 0
+                while await worker.run_next():
+                    count += 1
+                self.stdout.write(self.style.SUCCESS(f"{count} ta vazifa bajarildi"))
+            else:
+                self.stdout.write("E'lon workeri ishga tushdi (to'xtatish: Ctrl+C)")
+                await worker.run_forever()
+        finally:
+            await aclose_client()
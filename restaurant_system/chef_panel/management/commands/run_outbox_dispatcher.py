@@ -0,0 +1,29 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from chef_panel.dispatcher import OutboxDispatcher
+from chef_panel.utils import aclose_client
+
+
+class Command(BaseCommand):
+    help = "Telegram xabarlari navbatini (outbox) yuboruvchi dispatcherni ishga tushirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Tayyor xabarlarni yuborib chiqib ketish")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        dispatcher = OutboxDispatcher(batch_size=options['batch_size'])
+        try:
+            if options['once']:
+                count = await dispatcher.drain()
+                self.stdout.write(self.style.SUCCESS(f"{count} ta yozuv qayta ishlandi"))
+            else:
+                self.stdout.write("Outbox dispatcher ishga tushdi (to'xtatish: Ctrl+C)")
+                await dispatcher.run_forever()
+        finally:
+            await aclose_client()
@@ -0,0 +1,58 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chef_panel.models import Product
+from chef_panel.product_photos import file_id_from_result, remember
+from chef_panel.utils import call
+
+
+class Command(BaseCommand):
+    help = ("Mahsulot rasmlarini Telegramga oldindan yuklab, file_id larini saqlash "
+            "(bot mijozlarga rasmni qayta yuklamasdan file_id bilan yuboradi)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chat-id', type=int, default=settings.ADMIN_CHAT_ID,
+                            help="Rasmlar yuboriladigan chat (yuborilgandan keyin o'chiriladi)")
+        parser.add_argument('--force', action='store_true', help="file_id bor mahsulotlarni ham qayta yuklash")
+
+    def handle(self, *args, **options):
+        chat_id = options['chat_id']
+        uploaded = skipped = failed = 0
+        for product in Product.objects.exclude(image='').exclude(image__isnull=True).order_by('id'):
+            if not product.image_hash:
+                product.image_hash = product.compute_image_hash()
+                Product.objects.filter(pk=product.pk).update(image_hash=product.image_hash)
+            if not product.image_hash:
+                self.stderr.write(f"{product.name}: rasm fayli topilmadi")
+                failed += 1
+                continue
+            if product.telegram_file_id and not options['force']:
+                skipped += 1
+                continue
+
+            # Bot yuboradigan fayl: telegram nusxasi tayyor bo'lsa o'sha, aks holda asl rasm
+            name = product.variant_name('telegram') or product.image.name
+            storage = product.image.storage
+            with storage.open(name, 'rb') as image:
+                data = call('sendPhoto', {'chat_id': chat_id, 'disable_notification': 'true'},
+                            files={'photo': (os.path.basename(name), image.read())})
+            result = data.get('result') if data and data.get('ok') else None
+            file_id = file_id_from_result(result.get('photo')) if result else None
+            if not file_id:
+                self.stderr.write(f"{product.name}: yuklab bo'lmadi")
+                failed += 1
+                continue
+
+            remember(product.id, product.image_hash, storage.path(name), file_id, touch=True)
+            call('deleteMessage', {'chat_id': chat_id, 'message_id': result['message_id']})
+            uploaded += 1
+            self.stdout.write(f"{product.name}: yuklandi")
+            # Bitta chatga yuborish limiti
+            time.sleep(settings.TELEGRAM_PER_CHAT_INTERVAL)
+
+        self.stdout.write(f"Yuklandi: {uploaded}, o'tkazib yuborildi: {skipped}, xato: {failed}")
+        if failed:
+            raise CommandError(f"{failed} ta rasm yuklanmadi")
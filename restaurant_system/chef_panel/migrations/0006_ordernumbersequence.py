@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:51
+
+from django.db import migrations, models
+
+
+def seed_order_sequence(apps, schema_editor):
+    # Hisoblagichni mavjud eng katta buyurtma raqamidan boshlash
+    Order = apps.get_model('chef_panel', 'Order')
+    OrderNumberSequence = apps.get_model('chef_panel', 'OrderNumberSequence')
+    last_value = 0
+    for number in Order.objects.values_list('order_number', flat=True).iterator():
+        if number and number.isdigit():
+            last_value = max(last_value, int(number))
+    OrderNumberSequence.objects.update_or_create(name='order', defaults={'last_value': last_value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0005_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Raqamlar hisoblagichi',
+                'verbose_name_plural': 'Raqamlar hisoblagichlari',
+            },
+        ),
+        migrations.RunPython(seed_order_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0006_ordernumbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField(verbose_name='Chat ID')),
+                ('kind', models.CharField(choices=[('message', 'Xabar'), ('location', 'Lokatsiya')], default='message', max_length=20)),
+                ('mode', models.CharField(choices=[('send', 'Yangi xabar'), ('edit', 'Faqat tahrirlash'), ('upsert', 'Tahrirlash yoki yangi xabar')], default='send', max_length=20)),
+                ('message_field', models.CharField(blank=True, max_length=30)),
+                ('text', models.TextField(blank=True)),
+                ('reply_markup', models.JSONField(blank=True, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Kutilmoqda'), ('sending', 'Yuborilmoqda'), ('sent', 'Yuborildi'), ('failed', 'Xato')], default='pending', max_length=20, verbose_name='Holati')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Urinishlar')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Yuborish vaqti')),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='chef_panel.order')),
+            ],
+            options={
+                'verbose_name': 'Xabar navbati',
+                'verbose_name_plural': 'Xabarlar navbati',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='chef_panel__status_998f5e_idx')],
+            },
+        ),
+    ]
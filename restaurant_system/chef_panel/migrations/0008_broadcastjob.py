@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0007_notificationoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name="E'lon matni")),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('running', 'Yuborilmoqda'), ('paused', "To'xtatilgan"), ('done', 'Tugallangan'), ('cancelled', 'Bekor qilingan')], default='pending', max_length=20, verbose_name='Holati')),
+                ('cursor', models.BigIntegerField(default=0)),
+                ('total_recipients', models.PositiveIntegerField(default=0, verbose_name='Qabul qiluvchilar')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Yuborildi')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Xato')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "E'lon",
+                'verbose_name_plural': "E'lonlar",
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:09
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+
+def backfill_sales_rollup(apps, schema_editor):
+    # Mavjud buyurtmalardan yig'indilarni hisoblash (manage.py rebuild_sales_rollup bilan bir xil)
+    Order = apps.get_model('chef_panel', 'Order')
+    SalesRollup = apps.get_model('chef_panel', 'SalesRollup')
+    rollups = []
+    for period, trunc in [('day', TruncDay), ('hour', TruncHour)]:
+        grouped = (
+            Order.objects.annotate(bucket=trunc('created_at')).values('bucket', 'status')
+            .annotate(order_count=Count('id'), revenue=Sum('total_amount')).order_by()
+        )
+        rollups.extend(SalesRollup(period=period, **row) for row in grouped)
+    SalesRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0009_order_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Kun'), ('hour', 'Soat')], max_length=10, verbose_name='Davr')),
+                ('bucket', models.DateTimeField(verbose_name='Boshlanishi')),
+                ('status', models.CharField(choices=[('yangi', 'Yangi'), ('tasdiqlangan', 'Tasdiqlangan'), ('tayor', 'Tayor'), ('yolda', "Yo'lda"), ('yetkazildi', 'Yetkazildi'), ('bekor_qilingan', 'Bekor qilingan')], max_length=20, verbose_name='Holati')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Buyurtmalar soni')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Summa')),
+            ],
+            options={
+                'verbose_name': "Savdo yig'indisi",
+                'verbose_name_plural': "Savdo yig'indilari",
+                'ordering': ['-bucket', 'period', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'status'), name='unique_sales_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_sales_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+import re
+
+from django.db import migrations
+
+SEARCH_TABLE = 'chef_panel_ordersearch'
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 faqat SQLite da; boshqa bazalarda chef_panel.search icontains ga qaytadi
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+        f'order_number, full_name, phone, tokenize="unicode61 remove_diacritics 2")'
+    )
+    Order = apps.get_model('chef_panel', 'Order')
+    rows = []
+    for order_id, order_number, full_name, phone in Order.objects.values_list(
+            'id', 'order_number', 'customer__full_name', 'customer__phone_number').iterator():
+        digits = re.sub(r'\D', '', phone or '')
+        phone_tokens = ' '.join(digits[i:] for i in range(max(1, len(digits) - 2)))
+        rows.append([order_id, order_number, full_name, phone_tokens])
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, order_number, full_name, phone) VALUES (%s, %s, %s, %s)', rows
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0010_salesrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:15
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_image_hash(apps, schema_editor):
+    # Mavjud rasmlar xeshi (Product.compute_image_hash bilan bir xil)
+    Product = apps.get_model('chef_panel', 'Product')
+    for product in Product.objects.exclude(image='').exclude(image__isnull=True):
+        digest = hashlib.sha256()
+        try:
+            for chunk in product.image.chunks():
+                digest.update(chunk)
+            product.image.close()
+        except OSError:
+            continue
+        Product.objects.filter(pk=product.pk).update(image_hash=digest.hexdigest())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0011_order_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='telegram_file_id',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_image_hash, migrations.RunPython.noop),
+    ]
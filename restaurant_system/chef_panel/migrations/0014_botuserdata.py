@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0013_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotUserData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True, verbose_name='Telegram ID')),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Bot foydalanuvchi holati',
+                'verbose_name_plural': 'Bot foydalanuvchi holatlari',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0014_botuserdata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='botsettings',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:24
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chef_panel', '0015_botsettings_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryZone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nomi')),
+                ('polygon', models.JSONField(help_text="Cho'qqilar ro'yxati: [[kenglik, uzunlik], [kenglik, uzunlik], ...] (kamida 3 ta)", verbose_name='Chegara')),
+                ('base_cost', models.DecimalField(decimal_places=2, default=5000, max_digits=10, validators=[django.core.validators.MinValueValidator(0)], verbose_name="Boshlang'ich narx (so'm)")),
+                ('per_km_cost', models.DecimalField(decimal_places=2, default=6000, help_text='Birinchi kilometrdan keyin (masofa oshxonadan hisoblanadi)', max_digits=10, validators=[django.core.validators.MinValueValidator(0)], verbose_name="Har km uchun qo'shimcha narx (so'm)")),
+                ('priority', models.PositiveIntegerField(default=0, verbose_name='Tartib')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Faol')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Yetkazib berish hududi',
+                'verbose_name_plural': 'Yetkazib berish hududlari',
+                'ordering': ['priority', 'id'],
+            },
+        ),
+    ]
@@ -1,14 +1,20 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 import datetime
+import hashlib
+import threading
 
 class Category(models.Model):
     """Mahsulot kategoriyalari"""
     name = models.CharField(max_length=100, verbose_name="Kategoriya nomi")
     description = models.TextField(blank=True, verbose_name="Tavsif")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, verbose_name="Faol")
 
     class Meta:
@@ -27,6 +33,11 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Narxi (so'm)")
     image = models.ImageField(upload_to='products/', blank=True, null=True, verbose_name="Rasm")
     is_available = models.BooleanField(default=True, verbose_name="Mavjud")
+    # Rasm sha256 xeshi va Telegram qaytargan file_id: rasm o'zgarmaguncha qayta yuklanmaydi
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    telegram_file_id = models.CharField(max_length=255, blank=True, editable=False)
+    # Fon workerida yaratilgan kichraytirilgan nusxalar: {'hash': image_hash, 'telegram': yo'l, 'thumb': ..., 'webp': ...}
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -38,6 +49,67 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} - {self.price:,} so'm"
 
+    def variant_name(self, name):
+        """Tayyor nusxaning storage dagi nomi (hali yaratilmagan yoki eskirgan bo'lsa None)"""
+        variants = self.image_variants or {}
+        if not self.image or variants.get('hash') != self.image_hash:
+            return None
+        return variants.get(name)
+
+    def variant_url(self, name):
+        variant = self.variant_name(name)
+        return self.image.storage.url(variant) if variant else None
+
+    @property
+    def thumbnail_url(self):
+        """Panel uchun kichik rasm, nusxa hali tayyor bo'lmasa asl rasm"""
+        if not self.image:
+            return None
+        return self.variant_url('thumb') or self.image.url
+
+    @property
+    def webp_url(self):
+        return self.variant_url('webp')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # DB dagi rasm nomi: save() da rasm almashtirilganini aniqlash uchun (deferred bo'lsa yuklanmaydi)
+        image = self.__dict__.get('image')
+        self._saved_image_name = getattr(image, 'name', image)
+
+    def compute_image_hash(self):
+        if not self.image:
+            return ''
+        digest = hashlib.sha256()
+        try:
+            for chunk in self.image.chunks():
+                digest.update(chunk)
+            self.image.seek(0)
+        except OSError:
+            # Fayl diskda yo'q: rasm Telegramga yuklanmaydi
+            return ''
+        return digest.hexdigest()
+
+    def save(self, *args, **kwargs):
+        # Yangi rasm yuklangan bo'lsa (yoki rasm olib tashlangan) eski file_id yaroqsiz
+        if 'image' in self.get_deferred_fields():
+            image_hash = self.image_hash
+        elif not self.image:
+            image_hash = ''
+        elif not self.image._committed or self.image.name != self._saved_image_name or not self.image_hash:
+            image_hash = self.compute_image_hash()
+        else:
+            image_hash = self.image_hash
+        if image_hash != self.image_hash:
+            self.image_hash = image_hash
+            self.telegram_file_id = ''
+            self.image_variants = {}
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'image_hash', 'telegram_file_id', 'image_variants'}
+        super().save(*args, **kwargs)
+        if 'image' not in self.get_deferred_fields():
+            self._saved_image_name = self.image.name
+
 class Customer(models.Model):
     """Mijozlar"""
     telegram_id = models.BigIntegerField(unique=True, verbose_name="Telegram ID")
@@ -52,6 +124,66 @@ class Customer(models.Model):
     def __str__(self):
         return f"{self.full_name} ({self.phone_number})"
 
+class OrderNumberSequence(models.Model):
+    """Buyurtma raqamlari hisoblagichi (orders jadvalini skanerlamasdan raqam berish)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Raqamlar hisoblagichi"
+        verbose_name_plural = "Raqamlar hisoblagichlari"
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, count=1, name='order'):
+        """`count` ta ketma-ket raqamni atomik band qilish. (birinchi, oxirgi) qaytaradi."""
+        with transaction.atomic():
+            # UPDATE qatorni tranzaksiya oxirigacha bloklaydi, parallel yozuvchilar navbat kutadi
+            if not cls.objects.filter(name=name).update(last_value=F('last_value') + count):
+                cls.objects.get_or_create(name=name)
+                cls.objects.filter(name=name).update(last_value=F('last_value') + count)
+            last = cls.objects.filter(name=name).values_list('last_value', flat=True).get()
+        return last - count + 1, last
+
+
+class OrderNumberAllocator:
+    """Raqamlarni bloklab band qilib, jarayon ichida tarqatish (ORDER_NUMBER_BLOCK_SIZE).
+
+    Blok faqat uni band qilgan tranzaksiya commit bo'lgandan keyin qayta ishlatiladi;
+    rollback bo'lsa blok tashlab yuboriladi va raqamlar takrorlanmaydi.
+    """
+
+    def __init__(self, name='order'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._next = 1
+        self._last = 0
+        self._block = None
+        self._confirmed = None
+
+    def _confirm(self, block):
+        self._confirmed = block
+
+    def allocate(self):
+        block_size = settings.ORDER_NUMBER_BLOCK_SIZE
+        with self._lock:
+            if block_size > 1 and self._next <= self._last and self._confirmed is self._block:
+                value = self._next
+                self._next += 1
+                return value
+            first, last = OrderNumberSequence.reserve(block_size, self.name)
+            block = object()
+            self._block = block
+            self._next, self._last = first + 1, last
+            transaction.on_commit(lambda: self._confirm(block))
+            return first
+
+
+order_numbers = OrderNumberAllocator()
+
+
 class Order(models.Model):
     """Buyurtmalar"""
     STATUS_CHOICES = [
@@ -96,22 +228,29 @@ class Order(models.Model):
     user_message_id = models.BigIntegerField(null=True, blank=True)
     courier_message_id = models.BigIntegerField(null=True, blank=True)
 
+    # Elementlar o'zgarganda (admin panel) signal orqali oshiriladi: order_messages keshi kaliti
+    items_version = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = "Buyurtma"
         verbose_name_plural = "Buyurtmalar"
         ordering = ['-created_at']
+        indexes = [
+            # Panel ro'yxatlari: holat bo'yicha filter, created_at bo'yicha saralash
+            models.Index(fields=['status', 'created_at']),
+            # Mijozning buyurtmalari (bot va API)
+            models.Index(fields=['customer', 'created_at']),
+            # Filtrsiz ro'yxat va standart ordering
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f"Buyurtma #{self.order_number} - {self.customer.full_name}"
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Buyurtma raqamini avtomatik generatsiya qilish
-            last_order = Order.objects.order_by('-id').first()
-            if last_order:
-                self.order_number = str(int(last_order.order_number) + 1)
-            else:
-                self.order_number = "1"
+            # Buyurtma raqamini hisoblagichdan olish (parallel yozuvchilarda ham takrorlanmaydi)
+            self.order_number = str(order_numbers.allocate())
         super().save(*args, **kwargs)
 
 class OrderItem(models.Model):
@@ -146,10 +285,63 @@ class OrderStatusHistory(models.Model):
         verbose_name = "Holat tarixi"
         verbose_name_plural = "Holat tarixi"
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['order', 'changed_at']),
+        ]
 
     def __str__(self):
         return f"{self.order.order_number}: {self.old_status} -> {self.new_status}"
 
+class NotificationOutbox(models.Model):
+    """Telegram xabarlari navbati (transactional outbox)"""
+    KIND_CHOICES = [
+        ('message', 'Xabar'),
+        ('location', 'Lokatsiya'),
+    ]
+
+    MODE_CHOICES = [
+        ('send', 'Yangi xabar'),
+        ('edit', 'Faqat tahrirlash'),
+        ('upsert', 'Tahrirlash yoki yangi xabar'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Kutilmoqda'),
+        ('sending', 'Yuborilmoqda'),
+        ('sent', 'Yuborildi'),
+        ('failed', 'Xato'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
+    chat_id = models.BigIntegerField(verbose_name="Chat ID")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='message')
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='send')
+    # Order dagi message_id maydoni (masalan, 'chef_message_id'): tahrirlash shu orqali, yangi xabar ID si shu yerga yoziladi
+    message_field = models.CharField(max_length=30, blank=True)
+    text = models.TextField(blank=True)
+    reply_markup = models.JSONField(null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Urinishlar")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="Yuborish vaqti")
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Xabar navbati"
+        verbose_name_plural = "Xabarlar navbati"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} -> {self.chat_id} ({self.get_status_display()})"
+
 class BotSettings(models.Model):
     """Telegram bot sozlamalari"""
     service_start_time = models.TimeField(
@@ -195,6 +387,8 @@ class BotSettings(models.Model):
         blank=True,
         verbose_name="Oxirgi e'lon yuborilgan vaqt"
     )
+    # Har saqlashda oshiriladi (signal): jarayonlardagi kesh faqat shu ustunni tekshiradi
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Bot Sozlamalari"
@@ -211,6 +405,12 @@ class BotSettings(models.Model):
 
     @classmethod
     def get_settings(cls):
+        """Yagona sozlamalar obyekti (jarayon keshidan, bazaga har safar murojaat qilinmaydi)"""
+        from .bot_settings import get_settings
+        return get_settings()
+
+    @classmethod
+    def load(cls):
         """Get or create the single settings instance"""
         settings, created = cls.objects.get_or_create(
             pk=1,
@@ -223,3 +423,144 @@ class BotSettings(models.Model):
             }
         )
         return settings
+
+class BroadcastJob(models.Model):
+    """Barcha mijozlarga e'lon yuborish vazifasi (fon rejimida, to'xtatib-davom ettirish mumkin)"""
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('running', 'Yuborilmoqda'),
+        ('paused', "To'xtatilgan"),
+        ('done', 'Tugallangan'),
+        ('cancelled', 'Bekor qilingan'),
+    ]
+
+    text = models.TextField(verbose_name="E'lon matni")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Holati")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Mijozlar id bo'yicha tartibda yuboriladi; cursor - oxirgi to'liq yuborilgan mijoz id si
+    cursor = models.BigIntegerField(default=0)
+    total_recipients = models.PositiveIntegerField(default=0, verbose_name="Qabul qiluvchilar")
+    sent_count = models.PositiveIntegerField(default=0, verbose_name="Yuborildi")
+    failed_count = models.PositiveIntegerField(default=0, verbose_name="Xato")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "E'lon"
+        verbose_name_plural = "E'lonlar"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"E'lon #{self.id} ({self.get_status_display()})"
+
+    @property
+    def processed_count(self):
+        return self.sent_count + self.failed_count
+
+    @property
+    def progress_percent(self):
+        if not self.total_recipients:
+            return 100 if self.status == 'done' else 0
+        return min(100, round(self.processed_count * 100 / self.total_recipients))
+
+class SalesRollup(models.Model):
+    """Savdo yig'indilari: kun/soat va holat bo'yicha buyurtmalar soni va summasi.
+
+    Buyurtma yaratilish vaqtiga (mahalliy vaqt) qarab bucketga tushadi va holati
+    o'zgarganda shu bucket ichida bir holatdan ikkinchisiga o'tkaziladi.
+    """
+    PERIOD_CHOICES = [
+        ('day', 'Kun'),
+        ('hour', 'Soat'),
+    ]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, verbose_name="Davr")
+    bucket = models.DateTimeField(verbose_name="Boshlanishi")
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Holati")
+    order_count = models.IntegerField(default=0, verbose_name="Buyurtmalar soni")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Summa")
+
+    class Meta:
+        verbose_name = "Savdo yig'indisi"
+        verbose_name_plural = "Savdo yig'indilari"
+        ordering = ['-bucket', 'period', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket', 'status'], name='unique_sales_rollup_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.bucket:%Y-%m-%d %H:%M} {self.status}: {self.order_count}"
+
+
+class BotUserData(models.Model):
+    """Bot foydalanuvchisining holati (context.user_data: savat, kontakt, buyurtma bosqichi).
+
+    Bot qayta ishga tushganda savat va kiritilgan ma'lumotlar yo'qolmasligi uchun saqlanadi.
+    """
+    user_id = models.BigIntegerField(unique=True, verbose_name="Telegram ID")
+    data = models.BinaryField()  # pickle (Decimal va boshqa Python turlari saqlanadi)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Bot foydalanuvchi holati"
+        verbose_name_plural = "Bot foydalanuvchi holatlari"
+
+    def __str__(self):
+        return f"{self.user_id}"
+
+
+class DeliveryZone(models.Model):
+    """Yetkazib berish hududi (ko'pburchak) va uning narxlari.
+
+    Faol hududlar bo'lsa yetkazib berish faqat shu hududlar ichida, bo'lmasa
+    BotSettings radiusi bo'yicha. Hududlar ustma-ust tushsa kichik tartib raqami ustun.
+    """
+    name = models.CharField(max_length=100, verbose_name="Nomi")
+    polygon = models.JSONField(
+        verbose_name="Chegara",
+        help_text="Cho'qqilar ro'yxati: [[kenglik, uzunlik], [kenglik, uzunlik], ...] (kamida 3 ta)"
+    )
+    base_cost = models.DecimalField(
+        max_digits=10, decimal_places=2, default=5000,
+        verbose_name="Boshlang'ich narx (so'm)",
+        validators=[MinValueValidator(0)]
+    )
+    per_km_cost = models.DecimalField(
+        max_digits=10, decimal_places=2, default=6000,
+        verbose_name="Har km uchun qo'shimcha narx (so'm)",
+        help_text="Birinchi kilometrdan keyin (masofa oshxonadan hisoblanadi)",
+        validators=[MinValueValidator(0)]
+    )
+    priority = models.PositiveIntegerField(default=0, verbose_name="Tartib")
+    is_active = models.BooleanField(default=True, verbose_name="Faol")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Hudud chegaralovchi to'rtburchagining eng katta tomoni (gradus): ~220 km
+    MAX_SPAN_DEGREES = 2
+
+    class Meta:
+        verbose_name = "Yetkazib berish hududi"
+        verbose_name_plural = "Yetkazib berish hududlari"
+        ordering = ['priority', 'id']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        points = self.polygon
+        if not isinstance(points, list) or len(points) < 3:
+            raise ValidationError({'polygon': "Kamida 3 ta cho'qqi kiriting"})
+        for point in points:
+            if (not isinstance(point, (list, tuple)) or len(point) != 2
+                    or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in point)):
+                raise ValidationError({'polygon': f"Noto'g'ri cho'qqi: {point!r} ([kenglik, uzunlik] bo'lishi kerak)"})
+            lat, lon = point
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValidationError({'polygon': f"Koordinatalar chegaradan tashqarida: {point!r}"})
+        lats = [lat for lat, _ in points]
+        lons = [lon for _, lon in points]
+        if max(max(lats) - min(lats), max(lons) - min(lons)) > self.MAX_SPAN_DEGREES:
+            raise ValidationError({'polygon': f"Hudud juda katta: kenglik va uzunlik bo'yicha {self.MAX_SPAN_DEGREES} gradusdan oshmasin"})
@@ -0,0 +1,50 @@
+from django.conf import settings
+
+from .models import NotificationOutbox
+from .order_messages import (
+    chef_keyboard, courier_keyboard, order_text, staff_text, status_headline, status_line, user_text,
+)
+
+
+def enqueue_status_notifications(order, new_status):
+    """Holat o'zgarganda foydalanuvchi, oshpaz va kuryer xabarlarini navbatga qo'yish.
+
+    Holat o'zgartirilgan tranzaksiya ichida chaqiriladi; yuborishni dispatcher bajaradi.
+    """
+    # Uchala xabar bitta matn nusxasidan (elementlar bir marta yuklanadi yoki eslab qolingan)
+    text = order_text(order)
+    headline = status_headline(order, new_status)
+    entries = []
+
+    # Foydalanuvchi xabari: message_id bo'lsa tahrirlanadi, bo'lmasa yangisi yuboriladi
+    if order.telegram_user_id:
+        entries.append(NotificationOutbox(
+            order=order, chat_id=order.telegram_user_id, mode='upsert', message_field='user_message_id',
+            text=user_text(order, text, status_line(order, new_status)),
+            reply_markup={'inline_keyboard': [[{'text': "⬅️ Бош меню", 'callback_data': "main_menu"}]]},
+        ))
+
+    # Oshpaz xabari faqat tahrirlanadi
+    entries.append(NotificationOutbox(
+        order=order, chat_id=settings.CHEF_CHAT_ID, mode='edit', message_field='chef_message_id',
+        text=staff_text(headline, text), reply_markup={'inline_keyboard': chef_keyboard(order, new_status)},
+    ))
+
+    # Kuryer: buyurtma tayor bo'lganda yangi xabar (+ lokatsiya), keyin esa tahrirlash
+    if new_status == 'tayor' and not order.courier_message_id:
+        courier_headline = f"🚚 **Етказиб бериш учун янги буюртма #{order.order_number}**"
+        mode = 'upsert'
+    else:
+        courier_headline = headline
+        mode = 'edit'
+    entries.append(NotificationOutbox(
+        order=order, chat_id=settings.ADMIN_CHAT_ID, mode=mode, message_field='courier_message_id',
+        text=staff_text(courier_headline, text), reply_markup={'inline_keyboard': courier_keyboard(order, new_status)},
+    ))
+    if mode == 'upsert' and order.latitude and order.longitude:
+        entries.append(NotificationOutbox(
+            order=order, chat_id=settings.ADMIN_CHAT_ID, kind='location',
+            payload={'latitude': order.latitude, 'longitude': order.longitude},
+        ))
+
+    return NotificationOutbox.objects.bulk_create(entries)
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+from django.template.loader import render_to_string
+
+from .models import Order, OrderStatusHistory
+
+# Yangi buyurtmalar ekranida ko'rinadigan holatlar
+ACTIVE_STATUSES = ['yangi', 'tasdiqlangan']
+
+# Buyurtma yaratilishi va har bir holat o'zgarishi OrderStatusHistory ga yoziladi,
+# shuning uchun uning oxirgi id si butun feed uchun cursor vazifasini bajaradi.
+_lock = threading.Lock()
+_changed = threading.Condition()
+_cursor = None
+_checked_at = 0.0
+
+
+def active_orders():
+    return (
+        Order.objects.filter(status__in=ACTIVE_STATUSES)
+        .select_related('customer')
+        .prefetch_related('items__product')
+        .order_by('-created_at')
+    )
+
+
+def notify():
+    """Shu jarayonda holat o'zgarganda (on_commit) kutayotgan oqimlarni darhol uyg'otish"""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
+    with _changed:
+        _changed.notify_all()
+
+
+def latest_cursor():
+    """Oxirgi cursor. Ulangan ekranlar soni qancha bo'lmasin, jarayon bo'yicha
+    ORDER_FEED_PROBE_INTERVAL da ko'pi bilan bitta so'rov bajariladi."""
+    global _cursor, _checked_at
+    with _lock:
+        if _cursor is None or time.monotonic() - _checked_at >= settings.ORDER_FEED_PROBE_INTERVAL:
+            _cursor = OrderStatusHistory.objects.aggregate(last=Max('id'))['last'] or 0
+            _checked_at = time.monotonic()
+        return _cursor
+
+
+def wait_for_change(cursor, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        latest = latest_cursor()
+        remaining = deadline - time.monotonic()
+        if latest > cursor or remaining <= 0:
+            return latest
+        with _changed:
+            _changed.wait(min(remaining, settings.ORDER_FEED_PROBE_INTERVAL))
+
+
+def changed_orders(cursor):
+    """cursor dan keyin o'zgargan buyurtmalar: (yangi_cursor, faol_buyurtmalar, olib_tashlangan_idlar)"""
+    rows = list(OrderStatusHistory.objects.filter(id__gt=cursor).values_list('id', 'order_id'))
+    if not rows:
+        return cursor, [], []
+    changed_ids = {order_id for _, order_id in rows}
+    orders = list(active_orders().filter(id__in=changed_ids))
+    removed = sorted(changed_ids - {order.id for order in orders})
+    return max(row_id for row_id, _ in rows), orders, removed
+
+
+def active_count():
+    return Order.objects.filter(status__in=ACTIVE_STATUSES).count()
+
+
+def order_data(order):
+    """Planshetlar uchun ixcham JSON ko'rinishi"""
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'status': order.status,
+        'status_display': order.get_status_display(),
+        'created_at': order.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'customer': {
+            'full_name': order.customer.full_name,
+            'phone_number': order.customer.phone_number,
+        },
+        'payment_method_display': order.get_payment_method_display(),
+        'address': order.address,
+        'total_amount': float(order.total_amount),
+        'items': [
+            {'product_name': item.product.name, 'quantity': item.quantity, 'total': float(item.total)}
+            for item in order.items.all()
+        ],
+    }
+
+
+def collect_changes(cursor):
+    """SSE uchun: (yangi_cursor, {'upsert': [...], 'remove': [...], 'count': n}) yoki o'zgarish bo'lmasa None"""
+    new_cursor, orders, removed = changed_orders(cursor)
+    if new_cursor == cursor:
+        return cursor, None
+    payload = {
+        'upsert': [
+            {'id': order.id, 'html': render_to_string('chef_panel/partials/order_card.html', {'order': order})}
+            for order in orders
+        ],
+        'remove': removed,
+        'count': active_count(),
+    }
+    return new_cursor, payload
+
+
+def stream(cursor):
+    """Server-sent events oqimi. Hech narsa o'zgarmasa faqat vaqti-vaqti bilan ping yuboriladi."""
+    yield "retry: 2000\n\n"
+    deadline = time.monotonic() + settings.ORDER_FEED_MAX_DURATION
+    while time.monotonic() < deadline:
+        # Oqim ORDER_FEED_MAX_DURATION dan oshmaydi (worker timeout dan oldin yopiladi)
+        timeout = min(settings.ORDER_FEED_HEARTBEAT, deadline - time.monotonic())
+        latest = wait_for_change(cursor, timeout)
+        if latest <= cursor:
+            yield ": ping\n\n"
+            continue
+        cursor, payload = collect_changes(cursor)
+        if payload is None:
+            cursor = latest
+        else:
+            yield f"id: {cursor}\nevent: orders\ndata: {json.dumps(payload)}\n\n"
+    # Oqim vaqti tugadi: brauzer Last-Event-ID bilan qayta ulanadi va thread bo'shaydi
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+from .models import OrderItem
+
+STATUS_EMOJI = {
+    "yangi": "🆕",
+    "tasdiqlangan": "✅",
+    "tayor": "🍽",
+    "yolda": "🚚",
+    "yetkazildi": "✅",
+    "bekor_qilingan": "❌"
+}
+
+# Bir jarayonda eslab qolinadigan buyurtmalar soni
+MEMO_SIZE = 512
+
+
+@dataclass(frozen=True)
+class OrderText:
+    """Buyurtmaning holatga bog'liq bo'lmagan qismlari (bir marta yuklanadi va render qilinadi)"""
+    body: str  # mijoz, telefon, to'lov usuli, manzil
+    location: str  # foydalanuvchi xabaridagi lokatsiya havolasi (bo'lmasa bo'sh)
+    items: str  # mahsulotlar va jami summa
+
+
+_memo = OrderedDict()
+_lock = Lock()
+
+
+def _version(order):
+    # Matnga ta'sir qiladigan maydonlar. Elementlar admin panelda tahrirlanishi mumkin:
+    # items_version bazada oshiriladi, shuning uchun boshqa jarayonlar (bot) ham yangi matnni oladi.
+    customer = order.customer
+    return (order.id, order.items_version, customer.full_name, customer.phone_number, order.payment_method,
+            order.address, order.latitude, order.longitude, order.total_amount)
+
+
+def _render(order, lines):
+    body = f"👨‍💼 Исм: {order.customer.full_name}\n"
+    body += f"📱 Телефон: {order.customer.phone_number}\n"
+    body += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
+    if order.address:
+        body += f"🏠 Манзил: {order.address}\n"
+    else:
+        body += "📍 Манзил: Фақат локация\n"
+
+    location = ''
+    if order.latitude and order.longitude:
+        location = f"📍 Локация: https://www.google.com/maps?q={order.latitude},{order.longitude}\n"
+
+    items = f"\n🍽 **Маҳсулотлар:**\n"
+    for quantity, product_name, total in lines:
+        items += f"• {quantity} дона {product_name} - {total:,} сўм\n"
+    items += f"\n💰 Жами: {order.total_amount:,} сўм"
+    return OrderText(body=body, location=location, items=items)
+
+
+def order_text(order, items=None):
+    """Buyurtma matni. Versiya o'zgarmaguncha elementlar qayta so'ralmaydi.
+
+    items berilsa (masalan, create_order natijasi) DB ga murojaat qilinmaydi.
+    """
+    key = _version(order)
+    with _lock:
+        text = _memo.get(key)
+        if text is not None:
+            _memo.move_to_end(key)
+            return text
+
+    if items is None:
+        lines = list(
+            OrderItem.objects.filter(order_id=order.id).order_by('id')
+            .values_list('quantity', 'product__name', 'total')
+        )
+    else:
+        lines = [(item.quantity, item.product.name, item.total) for item in items]
+    text = _render(order, lines)
+
+    with _lock:
+        _memo[key] = text
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return text
+
+
+def user_text(order, text, status_line):
+    result = f"✅ **Буюртмангиз қабул қилинди!**\n\n"
+    result += f"📋 Буюртма ID: **{order.order_number}**\n"
+    return result + text.body + text.location + text.items + status_line
+
+
+def staff_text(headline, text):
+    """Oshpaz va kuryer xabarlari"""
+    return f"{headline}\n\n" + text.body + text.items
+
+
+def new_order_texts(order, items=None):
+    """Yangi buyurtma: (oshpaz matni, foydalanuvchi matni)"""
+    text = order_text(order, items)
+    chef = staff_text(f"🍽 **Янги буюртма #{order.order_number}**", text)
+    return chef, user_text(order, text, "\n🆕 Статус: **Янги**")
+
+
+def status_headline(order, new_status):
+    emoji = STATUS_EMOJI.get(new_status, "📋")
+    return f"{emoji} **Буюртма #{order.order_number} ҳолати ўзгарди: {order.get_status_display()}**"
+
+
+def status_line(order, new_status):
+    emoji = STATUS_EMOJI.get(new_status, "📋")
+    return f"\n{emoji} Статус: **{order.get_status_display()}**"
+
+
+def chef_keyboard(order, new_status):
+    if new_status == 'yangi':
+        return [
+            [{'text': "✅ Тасдиқлаш", 'callback_data': f"chef_confirm:{order.id}"},
+             {'text': "❌ Бекор қилиш", 'callback_data': f"chef_cancel:{order.id}"}]
+        ]
+    elif new_status == 'tasdiqlangan':
+        return [
+            [{'text': "🍽 Тайёр", 'callback_data': f"chef_ready:{order.id}"}],
+            [{'text': "❌ Бекор қилиш", 'callback_data': f"chef_cancel:{order.id}"}]
+        ]
+    # If status is 'tayor', 'yolda', 'yetkazildi', 'bekor_qilingan', no more actions for chef
+    return []
+
+
+def courier_keyboard(order, new_status):
+    if new_status == 'tayor':
+        return [
+            [{'text': "🚚 Йўлда", 'callback_data': f"courier_on_way:{order.id}"}],
+            [{'text': "❌ Бекор қилиш", 'callback_data': f"courier_cancel:{order.id}"}]
+        ]
+    elif new_status == 'yolda':
+        return [
+            [{'text': "✅ Етказилди", 'callback_data': f"courier_delivered:{order.id}"}],
+            [{'text': "❌ Бекор қилиш", 'callback_data': f"courier_cancel:{order.id}"}]
+        ]
+    return []
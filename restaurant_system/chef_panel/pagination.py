@@ -0,0 +1,82 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    """(created_at, id) bo'yicha sahifa. Shablonda Paginator sahifasi kabi iteratsiya qilinadi."""
+    object_list: list
+    next_cursor: str | None
+    previous_cursor: str | None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(obj, direction):
+    # obj - model yoki values() qatori (lug'at)
+    created_at, pk = (obj['created_at'], obj['id']) if isinstance(obj, dict) else (obj.created_at, obj.id)
+    raw = json.dumps([created_at.isoformat(), pk, direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id, yo'nalish) yoki noto'g'ri/bo'sh cursor uchun None"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, pk, direction = json.loads(raw)
+        if direction not in ('next', 'prev'):
+            return None
+        return datetime.fromisoformat(created_at), int(pk), direction
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(queryset, cursor, per_page):
+    """Eng yangi buyurtmalardan boshlab sahifa. OFFSET va COUNT ishlatilmaydi:
+    istalgan sahifa birinchi sahifa bilan bir xil narxda (created_at indeksi bo'yicha qidiruv)."""
+    position = decode_cursor(cursor)
+    if position is None:
+        rows = list(queryset.order_by('-created_at', '-id')[:per_page + 1])
+        has_next, has_previous = len(rows) > per_page, False
+        rows = rows[:per_page]
+    else:
+        created_at, pk, direction = position
+        if direction == 'next':
+            # created_at__lte indeks oralig'ini beradi, OR faqat bir xil vaqtdagi qatorlarni ajratadi
+            rows = list(
+                queryset.filter(Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at)
+                .order_by('-created_at', '-id')[:per_page + 1]
+            )
+            has_next, has_previous = len(rows) > per_page, True
+            rows = rows[:per_page]
+        else:
+            rows = list(
+                queryset.filter(Q(created_at__gt=created_at) | Q(id__gt=pk), created_at__gte=created_at)
+                .order_by('created_at', 'id')[:per_page + 1]
+            )
+            has_next, has_previous = True, len(rows) > per_page
+            rows = rows[:per_page][::-1]
+
+    return KeysetPage(
+        object_list=rows,
+        next_cursor=encode_cursor(rows[-1], 'next') if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], 'prev') if rows and has_previous else None,
+    )
@@ -0,0 +1,179 @@
+import math
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:  # ixtiyoriy: faqat quote_many tezlashadi
+    np = None
+
+# Oshxona joylashuvi
+STORE_LAT = 40.665236
+STORE_LON = 72.563908
+
+EARTH_RADIUS_KM = 6371.0
+# Boshlang'ich narx shu masofagacha, keyin har boshlangan km uchun qo'shimcha
+BASE_DISTANCE_KM = 1.0
+# Narxlar jadvali katagi (gradus): ~110 m x 85 m
+CELL_SIZE = 0.001
+# Katak chegaradagi yaxlitlash xatolaridan himoya (km)
+CELL_MARGIN_KM = 0.001
+# Jadval hajmi chegarasi (tasodifiy uzoq lokatsiyalar xotirani to'ldirmasligi uchun)
+MAX_CELLS = 200_000
+
+_SPLIT = object()  # katak ichidan narx chegarasi o'tadi: aniq hisoblanadi
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Haversine formula orqali ikki nuqta orasidagi masofa (km)"""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (math.sin(d_lat / 2)) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * (math.sin(d_lon / 2)) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@dataclass(frozen=True)
+class Tariff:
+    base_cost: Decimal
+    per_km: Decimal
+    max_radius_km: float
+
+    @classmethod
+    def from_settings(cls, bot_settings):
+        return cls(
+            base_cost=Decimal(bot_settings.delivery_base_cost),
+            per_km=Decimal(bot_settings.delivery_cost_per_extra_km_block),
+            max_radius_km=float(bot_settings.delivery_max_radius_km),
+        )
+
+    def cost(self, distance):
+        """Masofa bo'yicha narx. Radiusdan uzoq bo'lsa None (yetkazib berilmaydi)."""
+        if distance > self.max_radius_km:
+            return None
+        return self.base_cost + self.per_km * self.blocks(distance)
+
+    @staticmethod
+    def blocks(distance):
+        return max(0, math.ceil(distance - BASE_DISTANCE_KM))
+
+
+@dataclass(frozen=True)
+class Quote:
+    distance_km: float  # katakdan olingan bo'lsa katak markazigacha (taxminiy)
+    cost: Decimal | None
+    zone: str = ''  # DeliveryZone nomi (hududlar bo'yicha narxlanganda)
+
+    @property
+    def possible(self):
+        return self.cost is not None
+
+
+@dataclass
+class PriceGrid:
+    """Oshxona atrofidagi kataklar bo'yicha narxlar jadvali.
+
+    Katak birinchi so'ralganda hisoblanadi va butun katak bitta narx oralig'iga
+    tushsa saqlanadi; keyingi so'rovlar dict dan olinadi. Chegaradagi kataklar
+    uchun har safar aniq masofa hisoblanadi.
+    """
+    tariff: Tariff
+    cells: dict = field(default_factory=dict)
+
+    def quote(self, lat, lon):
+        cell = (math.floor(lat / CELL_SIZE), math.floor(lon / CELL_SIZE))
+        cached = self.cells.get(cell)
+        if cached is None:
+            cached = self._compile(cell)
+        if cached is _SPLIT:
+            distance = distance_km(STORE_LAT, STORE_LON, lat, lon)
+            return Quote(distance, self.tariff.cost(distance))
+        return cached
+
+    def _compile(self, cell):
+        south, west = cell[0] * CELL_SIZE, cell[1] * CELL_SIZE
+        north, east = south + CELL_SIZE, west + CELL_SIZE
+        # Katakdagi eng yaqin nuqta va eng uzoq burchak
+        nearest = distance_km(STORE_LAT, STORE_LON, min(max(STORE_LAT, south), north), min(max(STORE_LON, west), east))
+        farthest = max(
+            distance_km(STORE_LAT, STORE_LON, lat, lon) for lat in (south, north) for lon in (west, east)
+        )
+        low = self.tariff.cost(max(0.0, nearest - CELL_MARGIN_KM))
+        high = self.tariff.cost(farthest + CELL_MARGIN_KM)
+        if low != high or low is None:
+            # Chegaradagi yoki radiusdan tashqaridagi katak: masofa har safar aniq hisoblanadi
+            cached = _SPLIT
+        else:
+            cached = Quote(distance_km(STORE_LAT, STORE_LON, south + CELL_SIZE / 2, west + CELL_SIZE / 2), low)
+        if len(self.cells) < MAX_CELLS:
+            self.cells[cell] = cached
+        return cached
+
+
+_grid = None
+_grid_source = None
+_lock = threading.Lock()
+
+
+def price_grid(bot_settings):
+    """Joriy sozlamalar uchun jadval. Tarif o'zgarsa yangi jadval tuziladi."""
+    global _grid, _grid_source
+    grid = _grid
+    # bot_settings keshi sozlamalar o'zgarmaguncha aynan shu obyektni qaytaradi
+    if grid is not None and _grid_source is bot_settings:
+        return grid
+    tariff = Tariff.from_settings(bot_settings)
+    with _lock:
+        if _grid is None or _grid.tariff != tariff:
+            _grid = PriceGrid(tariff)
+        _grid_source = bot_settings
+        return _grid
+
+
+def zone_cost(zone, distance):
+    return zone.base_cost + zone.per_km_cost * Tariff.blocks(distance)
+
+
+def quote(lat, lon, bot_settings, zones=None):
+    """Yetkazib berish narxi. Faol hududlar (delivery_zones indeksi) bo'lsa hudud narxi,
+    nuqta hech bir hududga tushmasa yetkazib berilmaydi; hududlar yo'q bo'lsa radius tarifi."""
+    if zones:
+        zone = zones.find(lat, lon)
+        distance = distance_km(STORE_LAT, STORE_LON, lat, lon)
+        if zone is None:
+            return Quote(distance, None)
+        return Quote(distance, zone_cost(zone, distance), zone.name)
+    return price_grid(bot_settings).quote(lat, lon)
+
+
+def quote_many(latitudes, longitudes, bot_settings, zones=None):
+    """Ko'p nuqtani bir vaqtda narxlash (masalan, eski buyurtmalarni qayta hisoblash).
+
+    Masofa aniq hisoblanadi (jadvalsiz). numpy o'rnatilgan bo'lsa vektorlashtiriladi.
+    Natija: (masofalar, narxlar) ro'yxatlari, narx None - xizmat hududidan tashqarida.
+    """
+    if zones:
+        distances = [distance_km(STORE_LAT, STORE_LON, lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        costs = []
+        for lat, lon, distance in zip(latitudes, longitudes, distances):
+            zone = zones.find(lat, lon)
+            costs.append(zone_cost(zone, distance) if zone else None)
+        return distances, costs
+
+    tariff = Tariff.from_settings(bot_settings)
+    if np is None:
+        distances = [distance_km(STORE_LAT, STORE_LON, lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        return distances, [tariff.cost(distance) for distance in distances]
+
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    store_lat, store_lon = math.radians(STORE_LAT), math.radians(STORE_LON)
+    a = np.sin((lat - store_lat) / 2) ** 2 + math.cos(store_lat) * np.cos(lat) * np.sin((lon - store_lon) / 2) ** 2
+    distances = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    blocks = np.maximum(0, np.ceil(distances - BASE_DISTANCE_KM)).astype(int)
+    inside = distances <= tariff.max_radius_km
+    costs = [
+        tariff.base_cost + tariff.per_km * int(block) if ok else None
+        for block, ok in zip(blocks.tolist(), inside.tolist())
+    ]
+    return distances.tolist(), costs
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import os
+import threading
+
+from django.utils import timezone
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+# Shu jarayonda olingan file_id lar (katalog snapshoti qayta yuklanguncha): yuklangan fayl -> file_id.
+# Kalit fayl yo'li: telegram nusxasi tayyor bo'lgach asl rasmning file_id si ishlatilmaydi.
+_file_ids = {}
+_lock = threading.Lock()
+
+
+def known_file_id(image_path):
+    if not image_path:
+        return None
+    with _lock:
+        return _file_ids.get(image_path)
+
+
+def _read(image_path):
+    if image_path and os.path.exists(image_path):
+        with open(image_path, 'rb') as image:
+            return image.read()
+    return None
+
+
+async def amedia_for(image_path, file_id=''):
+    """InputMediaPhoto uchun media: saqlangan file_id yoki (birinchi marta) rasm faylining o'zi.
+
+    Fayl event loopni to'xtatmasligi uchun alohida oqimda o'qiladi. Rasm topilmasa None.
+    """
+    file_id = file_id or known_file_id(image_path)
+    if file_id:
+        return file_id
+    return await asyncio.to_thread(_read, image_path)
+
+
+def file_id_from_result(photo):
+    """Telegram javobidagi PhotoSize ro'yxatidan eng katta o'lchamning file_id si"""
+    if not photo:
+        return None
+    largest = photo[-1]
+    return largest['file_id'] if isinstance(largest, dict) else largest.file_id
+
+
+def remember(product_id, image_hash, image_path, file_id, touch=False):
+    """file_id ni saqlash. Shu orada rasm almashtirilgan bo'lsa (xesh boshqa) hech narsa yozilmaydi.
+
+    touch=True bo'lsa updated_at ham yangilanadi va botlar katalogni qayta yuklaydi.
+    """
+    if not image_hash or not file_id:
+        return 0
+    with _lock:
+        _file_ids[image_path] = file_id
+    fields = {'telegram_file_id': file_id}
+    if touch:
+        fields['updated_at'] = timezone.now()
+    updated = Product.objects.filter(pk=product_id, image_hash=image_hash).update(**fields)
+    if updated:
+        logger.info(f"Mahsulot {product_id} rasmi uchun file_id saqlandi")
+    return updated
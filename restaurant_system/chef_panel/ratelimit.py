@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """Asinxron token bucket: soniyasiga `rate` ta, eng ko'pi bilan `capacity` ta ketma-ket.
+
+    Telegram 429 qaytarganda pause() butun bucketni retry_after ga to'xtatadi.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds):
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ChatLimiter:
+    """Bitta chatga xabarlar orasidagi minimal interval (Telegram: ~1 xabar/soniya)"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next = {}
+
+    async def acquire(self, chat_id):
+        now = time.monotonic()
+        if len(self._next) > 10000:
+            # Eskirgan yozuvlarni tozalash
+            self._next = {chat: at for chat, at in self._next.items() if at > now}
+        at = max(now, self._next.get(chat_id, 0.0))
+        self._next[chat_id] = at + self.interval
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+_global_bucket = None
+_chat_limiter = None
+
+
+def global_bucket():
+    """Jarayon bo'yicha umumiy limit: outbox dispatcher va e'lonlar birgalikda ishlatadi"""
+    global _global_bucket
+    if _global_bucket is None:
+        _global_bucket = TokenBucket(settings.TELEGRAM_GLOBAL_RATE)
+    return _global_bucket
+
+
+def chat_limiter():
+    global _chat_limiter
+    if _chat_limiter is None:
+        _chat_limiter = ChatLimiter(settings.TELEGRAM_PER_CHAT_INTERVAL)
+    return _chat_limiter
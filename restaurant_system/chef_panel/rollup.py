@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import Order, SalesRollup
+
+
+def _day_start(value):
+    return timezone.localtime(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _buckets(created_at):
+    hour = timezone.localtime(created_at).replace(minute=0, second=0, microsecond=0)
+    return [('day', hour.replace(hour=0)), ('hour', hour)]
+
+
+def _apply(changes):
+    """changes: [(period, bucket, status, count, revenue), ...]
+
+    So'rovlar soni doim bir xil: yetishmagan qatorlar bitta INSERT (ignore_conflicts)
+    bilan yaratiladi, keyin har bir qator F() bilan yangilanadi.
+    """
+    SalesRollup.objects.bulk_create(
+        [SalesRollup(period=period, bucket=bucket, status=status) for period, bucket, status, _, _ in changes],
+        ignore_conflicts=True,
+    )
+    for period, bucket, status, count, revenue in changes:
+        SalesRollup.objects.filter(period=period, bucket=bucket, status=status).update(
+            order_count=F('order_count') + count, revenue=F('revenue') + revenue
+        )
+
+
+def record_created(order):
+    """Yangi buyurtmani yig'indilarga qo'shish (create_order tranzaksiyasi ichida)"""
+    _apply([
+        (period, bucket, order.status, 1, order.total_amount)
+        for period, bucket in _buckets(order.created_at)
+    ])
+
+
+def record_status_change(order, old_status, new_status, old_total=None):
+    """Buyurtmani o'z bucketi ichida eski holatdan yangi holatga o'tkazish.
+    old_total berilsa (admin panelda summa o'zgartirilganda) summa farqi ham yoziladi."""
+    if old_total is None:
+        old_total = order.total_amount
+    if old_status == new_status and old_total == order.total_amount:
+        return
+    changes = []
+    for period, bucket in _buckets(order.created_at):
+        changes.append((period, bucket, old_status, -1, -old_total))
+        changes.append((period, bucket, new_status, 1, order.total_amount))
+    _apply(changes)
+
+
+def record_deleted(order):
+    """O'chirilgan buyurtmani yig'indilardan ayirish"""
+    _apply([
+        (period, bucket, order.status, -1, -order.total_amount)
+        for period, bucket in _buckets(order.created_at)
+    ])
+
+
+def window(since):
+    """`since` dan hozirgacha: to'liq kunlar kunlik qatorlardan, birinchi kunning qolgan
+    qismi soatlik qatorlardan olinadi (aniqlik - bir soat)."""
+    first_hour = timezone.localtime(since).replace(minute=0, second=0, microsecond=0)
+    first_day = _day_start(since)
+    if first_day < first_hour:
+        first_day += timedelta(days=1)
+    return Q(period='day', bucket__gte=first_day) | Q(period='hour', bucket__gte=first_hour, bucket__lt=first_day)
+
+
+def order_count(status=None):
+    """Buyurtmalar soni kunlik yig'indilardan (COUNT(*) siz)"""
+    rows = SalesRollup.objects.filter(period='day')
+    if status:
+        rows = rows.filter(status=status)
+    return rows.aggregate(total=Sum('order_count'))['total'] or 0
+
+
+@transaction.atomic
+def rebuild(since=None):
+    """Yig'indilarni buyurtmalar jadvalidan qayta hisoblash. since berilsa o'sha kundan boshlab."""
+    orders = Order.objects.all()
+    rows = SalesRollup.objects.all()
+    if since is not None:
+        since = _day_start(since)
+        orders = orders.filter(created_at__gte=since)
+        rows = rows.filter(bucket__gte=since)
+    rows.delete()
+
+    rollups = []
+    for period, trunc in [('day', TruncDay), ('hour', TruncHour)]:
+        grouped = (
+            orders.annotate(bucket=trunc('created_at')).values('bucket', 'status')
+            .annotate(order_count=Count('id'), revenue=Sum('total_amount')).order_by()
+        )
+        rollups.extend(SalesRollup(period=period, **row) for row in grouped)
+    SalesRollup.objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
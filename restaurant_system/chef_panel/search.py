@@ -0,0 +1,104 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Order
+
+# SQLite FTS5 jadvali (0011 migratsiyasi yaratadi), rowid = buyurtma id si
+SEARCH_TABLE = 'chef_panel_ordersearch'
+
+# Telefonning istalgan qismi bo'yicha qidirish uchun raqamlarning shu uzunlikdan
+# qisqa bo'lmagan barcha suffikslari indekslanadi ("4567" -> "...1234567")
+PHONE_SUFFIX_MIN = 3
+
+
+def enabled():
+    return connection.vendor == 'sqlite'
+
+
+def _phone_tokens(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    return ' '.join(digits[i:] for i in range(max(1, len(digits) - PHONE_SUFFIX_MIN + 1)))
+
+
+def _row(order_id, order_number, full_name, phone):
+    return [order_id, order_number, full_name, _phone_tokens(phone)]
+
+
+def index_order(order):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, order_number, full_name, phone) VALUES (%s, %s, %s, %s)',
+            _row(order.id, order.order_number, order.customer.full_name, order.customer.phone_number),
+        )
+
+
+def index_customer(customer):
+    """Mijoz ismi yoki telefoni o'zgarganda uning buyurtmalarini yangilash"""
+    if not enabled():
+        return
+    full_name, phone = customer.full_name, _phone_tokens(customer.phone_number)
+    with connection.cursor() as cursor:
+        # Har bir yangi buyurtmada update_or_create mijozni saqlaydi; o'zgarmagan bo'lsa yozilmaydi
+        cursor.execute(
+            f'UPDATE {SEARCH_TABLE} SET full_name = %s, phone = %s '
+            f'WHERE rowid IN (SELECT id FROM {Order._meta.db_table} WHERE customer_id = %s) '
+            f'AND (full_name != %s OR phone != %s)',
+            [full_name, phone, customer.id, full_name, phone],
+        )
+
+
+def remove_order(order_id):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [order_id])
+
+
+def rebuild():
+    """Indeksni buyurtmalar jadvalidan qayta yaratish"""
+    if not enabled():
+        return 0
+    rows = [
+        _row(*values)
+        for values in Order.objects.values_list(
+            'id', 'order_number', 'customer__full_name', 'customer__phone_number'
+        ).order_by().iterator()
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, order_number, full_name, phone) VALUES (%s, %s, %s, %s)', rows
+        )
+    return len(rows)
+
+
+def match_expression(text):
+    """Qidiruv matnidan FTS5 so'rovi. Faqat raqamlar (telefon yoki buyurtma raqami) bo'lsa
+    bitta prefiks, aks holda har bir so'z prefiks sifatida (AND). Tirnoqlar FTS sintaksisini o'chiradi."""
+    compact = re.sub(r'[\s()+\-]', '', text)
+    if compact.isdigit():
+        return f'{{order_number phone}} : "{compact}"*'
+    words = [word.replace('"', '""') for word in text.split() if any(ch.isalnum() for ch in word)]
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def filter_orders(queryset, text):
+    if not enabled():
+        return queryset.filter(
+            Q(order_number__icontains=text) |
+            Q(customer__full_name__icontains=text) |
+            Q(customer__phone_number__icontains=text)
+        )
+    expression = match_expression(text)
+    if expression is None:
+        return queryset
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [expression])
+    )
@@ -0,0 +1,133 @@
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Customer, Order, OrderItem, OrderStatusHistory, Product
+from . import rollup
+from .notifications import enqueue_status_notifications
+
+logger = logging.getLogger(__name__)
+
+
+class ProductNotFound(Exception):
+    def __init__(self, name):
+        self.name = name
+        super().__init__(f"Mahsulot topilmadi: {name}")
+
+
+def resolve_products(names):
+    """Savatdagi mahsulotlarni bitta so'rov bilan topish (nom -> Product)"""
+    products = {}
+    for product in Product.objects.filter(name__in=set(names)):
+        # Bir xil nomli mahsulotlar bo'lsa, avvalgi .filter(name=...).first() kabi birinchisi olinadi
+        products.setdefault(product.name, product)
+    return products
+
+
+@transaction.atomic
+def create_order(telegram_user_id, full_name, phone, items, payment_method='naqd', location=None,
+                 address=None, delivery_cost=0, products_total=None, total_amount=None,
+                 notes='Telegram bot orqali yaratildi', strict=True):
+    """Buyurtma va uning elementlarini yaratish.
+
+    items: [(mahsulot_nomi, miqdor)] yoki [(mahsulot_nomi, miqdor, narx)].
+    Narx berilmasa mahsulotning joriy narxi olinadi. So'rovlar soni savat
+    hajmiga bog'liq emas. strict=True bo'lsa topilmagan mahsulot uchun
+    ProductNotFound ko'tariladi, aks holda u o'tkazib yuboriladi.
+    Qaytaradi: (order, order_items)
+    """
+    products = resolve_products(item[0] for item in items)
+
+    lines = []
+    for item in items:
+        product_name, quantity = item[0], item[1]
+        product = products.get(product_name)
+        if product is None:
+            if strict:
+                raise ProductNotFound(product_name)
+            logger.warning(f"Mahsulot topilmadi: {product_name}")
+            continue
+        price = Decimal(str(item[2])) if len(item) > 2 else product.price
+        lines.append((product, quantity, price))
+
+    if products_total is None:
+        products_total = sum((price * quantity for _, quantity, price in lines), Decimal('0'))
+    if total_amount is None:
+        total_amount = products_total + delivery_cost
+
+    customer, created = Customer.objects.update_or_create(
+        telegram_id=telegram_user_id,
+        defaults={'full_name': full_name, 'phone_number': phone}
+    )
+
+    location = location or {}
+    order = Order.objects.create(
+        customer=customer,
+        telegram_user_id=telegram_user_id,
+        status='yangi',
+        payment_method=payment_method,
+        latitude=location.get('latitude'),
+        longitude=location.get('longitude'),
+        address=address,
+        products_total=products_total,
+        delivery_cost=delivery_cost,
+        total_amount=total_amount,
+    )
+
+    # bulk_create OrderItem.save() ni chaqirmaydi, shuning uchun total shu yerda hisoblanadi
+    order_items = OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=quantity, price=price, total=quantity * price)
+        for product, quantity, price in lines
+    ])
+
+    OrderStatusHistory.objects.create(
+        order=order,
+        old_status='',
+        new_status='yangi',
+        notes=notes
+    )
+    rollup.record_created(order)
+    return order, order_items
+
+
+# Faqat ruxsat etilgan status o'zgarishlari
+VALID_TRANSITIONS = {
+    'yangi': ['tasdiqlangan', 'bekor_qilingan'],
+    'tasdiqlangan': ['tayor', 'bekor_qilingan'],
+    'tayor': ['yolda', 'bekor_qilingan'],
+    'yolda': ['yetkazildi', 'bekor_qilingan'],
+}
+
+
+@transaction.atomic
+def change_order_status(order, new_status, changed_by=None, notes=''):
+    """Buyurtma holatini o'zgartirish.
+
+    Holat, vaqt belgisi, holat tarixi va Telegram xabarlari navbati (outbox)
+    bitta tranzaksiyada yoziladi. Xabarlarni dispatcher keyinroq yuboradi.
+    """
+    old_status = order.status
+    order.status = new_status
+
+    # Vaqt belgilarini yangilash
+    if new_status == 'tasdiqlangan':
+        order.confirmed_at = timezone.now()
+    elif new_status == 'tayor':
+        order.ready_at = timezone.now()
+    elif new_status == 'yetkazildi':
+        order.delivered_at = timezone.now()
+
+    order.save(update_fields=['status', 'confirmed_at', 'ready_at', 'delivered_at'])
+
+    OrderStatusHistory.objects.create(
+        order=order,
+        old_status=old_status,
+        new_status=new_status,
+        changed_by=changed_by,
+        notes=notes
+    )
+    rollup.record_status_change(order, old_status, new_status)
+    enqueue_status_notifications(order, new_status)
+    return order
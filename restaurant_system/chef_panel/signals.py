@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import bot_settings, catalog, delivery_zones, image_variants, order_feed, search, stats
+from .models import BotSettings, Category, Customer, DeliveryZone, Order, OrderItem, OrderStatusHistory, Product
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    catalog.invalidate()
+
+
+@receiver(post_save, sender=Product)
+def build_image_variants(sender, instance, **kwargs):
+    if image_variants.is_stale(instance):
+        transaction.on_commit(lambda: image_variants.schedule(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=DeliveryZone)
+def invalidate_delivery_zones(sender, **kwargs):
+    delivery_zones.invalidate()
+
+
+@receiver(post_save, sender=BotSettings)
+def bump_bot_settings_version(sender, instance, **kwargs):
+    # Boshqa jarayonlar (bot) versiya ustuni orqali o'zgarishni ko'radi
+    BotSettings.objects.filter(pk=instance.pk).update(version=F('version') + 1)
+    transaction.on_commit(bot_settings.invalidate)
+
+
+@receiver(post_save, sender=OrderStatusHistory)
+def notify_order_feed(sender, created, **kwargs):
+    if created:
+        transaction.on_commit(order_feed.notify)
+
+
+@receiver(post_save, sender=OrderStatusHistory)
+def invalidate_dashboard(sender, created, **kwargs):
+    if created:
+        transaction.on_commit(stats.invalidate_dashboard)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def bump_order_items_version(sender, instance, **kwargs):
+    # order_messages keshi barcha jarayonlarda eskiradi (create_order dagi bulk_create signal chaqirmaydi)
+    Order.objects.filter(pk=instance.order_id).update(items_version=F('items_version') + 1)
+
+
+@receiver(post_save, sender=Order)
+def index_order(sender, instance, created, update_fields, **kwargs):
+    # Holat o'zgarishlari (update_fields=['status', ...]) qidiruv maydonlariga tegmaydi
+    if created or update_fields is None or {'order_number', 'customer'} & set(update_fields):
+        search.index_order(instance)
+
+
+@receiver(post_delete, sender=Order)
+def unindex_order(sender, instance, **kwargs):
+    search.remove_order(instance.id)
+
+
+@receiver(post_save, sender=Customer)
+def reindex_customer(sender, instance, created, **kwargs):
+    if not created:
+        search.index_customer(instance)
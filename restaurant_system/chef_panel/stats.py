@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from . import rollup
+from .models import Customer, Order, SalesRollup
+
+DASHBOARD_CACHE_KEY = 'chef_panel:dashboard'
+
+# Dashboard kartochkalaridagi holatlar
+COUNTED_STATUSES = ['yangi', 'tasdiqlangan', 'tayor']
+
+
+def invalidate_dashboard():
+    """Buyurtma holati o'zgarganda (on_commit) chaqiriladi"""
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
+def _counters(now):
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Holatlar soni (status, created_at) indeksi bo'yicha, faqat faol buyurtmalar sanaladi
+    counters = Order.objects.filter(status__in=COUNTED_STATUSES).aggregate(
+        yangi=Count('id', filter=Q(status='yangi')),
+        tasdiqlangan=Count('id', filter=Q(status='tasdiqlangan')),
+        tayor=Count('id', filter=Q(status='tayor')),
+    )
+    # Bugungi va haftalik ko'rsatkichlar buyurtmalarni emas, bir necha yig'indi qatorini o'qiydi
+    today_window = rollup.window(today)
+    counters.update(SalesRollup.objects.filter(rollup.window(now - timedelta(days=7))).aggregate(
+        today_count=Sum('order_count', filter=today_window),
+        today_sales=Sum('revenue', filter=today_window),
+        week_count=Sum('order_count'),
+        week_sales=Sum('revenue'),
+    ))
+    return counters
+
+
+def _build():
+    counters = _counters(timezone.now())
+    return {
+        'stats': {
+            'yangi_buyurtmalar': counters['yangi'],
+            'tasdiqlangan_buyurtmalar': counters['tasdiqlangan'],
+            'tayor_buyurtmalar': counters['tayor'],
+            'bugungi_buyurtmalar': counters['today_count'] or 0,
+        },
+        'recent_orders': list(
+            Order.objects.filter(status__in=['yangi', 'tasdiqlangan'])
+            .select_related('customer')
+            .order_by('-created_at')[:10]
+        ),
+        # Eng ko'p buyurtma bergan mijozlar
+        'top_customers': list(Customer.objects.annotate(order_count=Count('order')).order_by('-order_count')[:10]),
+        'weekly_stats': {
+            'total_orders': counters['week_count'] or 0,
+            'total_amount': counters['week_sales'] or 0,
+        },
+        'today_sales': counters['today_sales'] or 0,
+    }
+
+
+def dashboard_context():
+    """Dashboard ma'lumotlari. DASHBOARD_CACHE_TTL soniya keshlanadi, holat o'zgarsa o'chiriladi."""
+    context = cache.get(DASHBOARD_CACHE_KEY)
+    if context is None:
+        context = _build()
+        cache.set(DASHBOARD_CACHE_KEY, context, settings.DASHBOARD_CACHE_TTL)
+    return context
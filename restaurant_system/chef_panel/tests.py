@@ -0,0 +1,174 @@
+from decimal import Decimal
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from . import delivery_zones, order_feed, order_messages, stats
+from .models import Category, DeliveryZone, Order, OrderStatusHistory, Product, SalesRollup
+from .services import change_order_status, create_order
+
+# Yangi mijoz uchun create_order so'rovlari (savepoint'lar bilan), savat hajmidan qat'i nazar
+CREATE_ORDER_QUERIES = 20
+
+
+class CreateOrderQueriesTests(TestCase):
+    """create_order so'rovlari soni savat hajmiga bog'liq emasligini tekshirish"""
+
+    sizes = [1, 5, 20, 100]
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Test')
+        Product.objects.bulk_create([
+            Product(category=category, name=f'Taom {i}', price=1000 + i)
+            for i in range(max(cls.sizes))
+        ])
+
+    def setUp(self):
+        # Kunning birinchi buyurtmasi: yig'indi qatorlari yaratiladi
+        create_order(1, 'Mijoz', '+998900000000', [('Taom 0', 1)])
+
+    def items(self, size):
+        return [(f'Taom {i}', 2) for i in range(size)]
+
+    def test_query_count_does_not_depend_on_cart_size(self):
+        for size in self.sizes:
+            with self.subTest(size=size), self.assertNumQueries(CREATE_ORDER_QUERIES):
+                order, order_items = create_order(1000 + size, 'Mijoz', '+998900000000', self.items(size))
+            self.assertEqual(len(order_items), size)
+
+    def test_first_order_of_the_day_costs_the_same(self):
+        SalesRollup.objects.all().delete()
+        with self.assertNumQueries(CREATE_ORDER_QUERIES):
+            create_order(2, 'Mijoz', '+998900000000', self.items(5))
+        self.assertEqual(SalesRollup.objects.count(), 2)
+
+
+class PanelPageQueriesTests(TestCase):
+    """Panel sahifalari buyurtmalar sonidan qat'i nazar belgilangan so'rovlar bilan render qilinadi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oshpaz')
+        category = Category.objects.create(name='Test')
+        Product.objects.bulk_create([
+            Product(category=category, name=f'Taom {i}', price=1000 + i) for i in range(6)
+        ])
+        orders = [
+            create_order(100 + i, f'Mijoz {i}', '+998900000000', [(f'Taom {j}', 1) for j in range(2 + i % 5)])[0]
+            for i in range(30)
+        ]
+        for order in orders[:10]:
+            change_order_status(order, 'tasdiqlangan', changed_by=cls.user)
+        for order in orders[:5]:
+            change_order_status(order, 'tayor', changed_by=cls.user)
+        cls.order = orders[0]
+
+    def setUp(self):
+        # Keshlar tozalanadi: sovuq render o'lchanadi
+        cache.delete(stats.DASHBOARD_CACHE_KEY)
+        order_feed.notify()
+
+    def assertPageQueries(self, url, num):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_orders(self):
+        self.assertPageQueries(reverse('chef_panel:new_orders'), 4)
+
+    def test_order_list(self):
+        self.assertPageQueries(reverse('chef_panel:order_list'), 2)
+        self.assertPageQueries(reverse('chef_panel:order_list') + '?status=yangi', 2)
+
+    def test_order_detail(self):
+        self.assertPageQueries(reverse('chef_panel:order_detail', args=[self.order.id]), 3)
+
+    def test_dashboard(self):
+        self.assertPageQueries(reverse('chef_panel:dashboard'), 4)
+
+
+class OrderAdminRollupTests(TestCase):
+    """Admin panelda buyurtma o'zgartirilsa yoki o'chirilsa savdo yig'indilari to'g'ri qoladi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Test')
+        Product.objects.create(category=category, name='Taom', price=1000)
+        cls.orders = [create_order(100 + i, 'Mijoz', '+998900000000', [('Taom', 1 + i)])[0] for i in range(3)]
+
+    def setUp(self):
+        self.admin = site._registry[Order]
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_superuser('admin')
+
+    def assertRollupMatchesOrders(self):
+        for period in ['day', 'hour']:
+            rows = SalesRollup.objects.filter(period=period, order_count__gt=0)
+            self.assertEqual(
+                sorted(rows.values_list('status', 'order_count', 'revenue')),
+                sorted(
+                    (row['status'], row['count'], row['revenue'])
+                    for row in Order.objects.values('status').annotate(count=Count('id'), revenue=Sum('total_amount'))
+                ),
+            )
+
+    def test_change_status_and_total(self):
+        order = Order.objects.get(pk=self.orders[0].pk)
+        order.status = 'tasdiqlangan'
+        order.total_amount = Decimal('7777')
+        self.admin.save_model(self.request, order, None, change=True)
+        self.assertRollupMatchesOrders()
+
+    def test_status_change_moves_order_feed_cursor(self):
+        cursor = OrderStatusHistory.objects.latest('id').id
+        order = Order.objects.get(pk=self.orders[0].pk)
+        order.status = 'tasdiqlangan'
+        self.admin.save_model(self.request, order, None, change=True)
+        new_cursor, orders, removed = order_feed.changed_orders(cursor)
+        self.assertGreater(new_cursor, cursor)
+        self.assertEqual([changed.id for changed in orders], [order.id])
+
+    def test_delete(self):
+        self.admin.delete_model(self.request, Order.objects.get(pk=self.orders[0].pk))
+        self.admin.delete_queryset(self.request, Order.objects.filter(pk=self.orders[1].pk))
+        self.assertRollupMatchesOrders()
+
+
+class OrderTextMemoTests(TestCase):
+    def test_item_change_refreshes_memoized_text(self):
+        category = Category.objects.create(name='Test')
+        Product.objects.create(category=category, name='Taom', price=1000)
+        order, order_items = create_order(100, 'Mijoz', '+998900000000', [('Taom', 1)])
+        self.assertIn('1 дона Taom', order_messages.order_text(order).items)
+
+        item = order_items[0]
+        item.quantity = 3
+        item.save()
+        # Boshqa jarayon (bot) buyurtmani bazadan qayta o'qiydi: items_version kesh kalitini o'zgartiradi
+        order = Order.objects.select_related('customer').get(pk=order.pk)
+        self.assertIn('3 дона Taom', order_messages.order_text(order).items)
+
+
+class DeliveryZoneIndexTests(TestCase):
+    def test_clean_rejects_oversized_polygon(self):
+        zone = DeliveryZone(name='Dunyo', polygon=[[-90, -180], [-90, 180], [90, 180], [90, -180]])
+        with self.assertRaises(ValidationError):
+            zone.clean()
+
+    def test_oversized_zone_is_checked_without_buckets(self):
+        # clean() chetlab o'tilgan (masalan, shell orqali yozilgan) ulkan hudud
+        DeliveryZone.objects.create(name='Dunyo', priority=1,
+                                    polygon=[[-80, -170], [-80, 170], [80, 170], [80, -170]])
+        DeliveryZone.objects.create(name='Markaz', priority=0,
+                                    polygon=[[40.6, 72.5], [40.6, 72.6], [40.7, 72.6], [40.7, 72.5]])
+        index = delivery_zones._compile((0,))
+        self.assertEqual([zone.name for zone in index.wide], ['Dunyo'])
+        self.assertLess(len(index.buckets), 200)
+        self.assertEqual(index.find(40.65, 72.55).name, 'Markaz')
+        self.assertEqual(index.find(10, 10).name, 'Dunyo')
@@ -1,13 +1,108 @@
-import requests
+import asyncio
 import json
 import logging
+import threading
+import weakref
+
+import httpx
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
-def send_telegram_message(chat_id, text, reply_markup=None, message_id=None, parse_mode="Markdown"):
-    """Telegram Bot API orqali xabar yuborish/tahrirlash"""
-    url = f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/"
+# Telegram Bot API uchun umumiy HTTP transport.
+# Sync klient Django view'lar uchun, async klient esa bot handlerlari uchun.
+# Ikkalasi ham ulanishlarni pool'da saqlaydi (keep-alive), shuning uchun har
+# bir xabar uchun yangi TLS handshake bo'lmaydi.
+_sync_client = None
+_sync_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _api_url(method):
+    return f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/{method}"
+
+
+def _client_options():
+    pool_size = settings.TELEGRAM_HTTP_POOL_SIZE
+    return {
+        'timeout': httpx.Timeout(settings.TELEGRAM_HTTP_TIMEOUT),
+        'limits': httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+    }
+
+
+def get_client():
+    """Jarayon bo'yicha umumiy sync HTTP klient"""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_client_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_client():
+    """Joriy event loop uchun umumiy async HTTP klient"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def close_client():
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+
+
+async def aclose_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _parse_response(method, response):
+    # Telegram xato bo'lsa ham JSON qaytaradi (ok=False, description, parameters)
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    if response.is_error:
+        description = data.get('description') if isinstance(data, dict) else response.text[:200]
+        logger.error(f"Telegram {method} xatosi ({response.status_code}): {description}")
+    return data
+
+
+def call(method, payload, files=None):
+    """Bot API metodini sync chaqirish. Tarmoq xatosida None qaytaradi."""
+    try:
+        if files:
+            response = get_client().post(_api_url(method), data=payload, files=files)
+        else:
+            response = get_client().post(_api_url(method), json=payload)
+    except httpx.HTTPError as e:
+        logger.error(f"Telegram {method} so'rovida xato: {e}")
+        return None
+    return _parse_response(method, response)
+
+
+async def acall(method, payload, files=None):
+    """Bot API metodini async chaqirish. Tarmoq xatosida None qaytaradi."""
+    try:
+        if files:
+            response = await get_async_client().post(_api_url(method), data=payload, files=files)
+        else:
+            response = await get_async_client().post(_api_url(method), json=payload)
+    except httpx.HTTPError as e:
+        logger.error(f"Telegram {method} so'rovida xato: {e}")
+        return None
+    return _parse_response(method, response)
+
+
+def _message_request(chat_id, text, reply_markup=None, message_id=None, parse_mode="Markdown"):
     payload = {
         'chat_id': chat_id,
         'text': text,
@@ -16,32 +111,35 @@ def send_telegram_message(chat_id, text, reply_markup=None, message_id=None, par
     if reply_markup:
         payload['reply_markup'] = json.dumps(reply_markup)
 
-    try:
-        if message_id:
-            url += "editMessageText"
-            payload['message_id'] = message_id
-        else:
-            url += "sendMessage"
+    if message_id:
+        payload['message_id'] = message_id
+        return "editMessageText", payload
+    return "sendMessage", payload
 
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Telegram xabar yuborishda xato: {e}")
-        return None
 
-def send_telegram_location(chat_id, latitude, longitude):
-    """Telegram Bot API orqali lokatsiya yuborish"""
-    url = f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/sendLocation"
-    payload = {
+def _location_request(chat_id, latitude, longitude):
+    return "sendLocation", {
         'chat_id': chat_id,
         'latitude': latitude,
         'longitude': longitude
     }
-    try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Telegram lokatsiya yuborishda xato: {e}")
-        return None
+
+
+def send_telegram_message(chat_id, text, reply_markup=None, message_id=None, parse_mode="Markdown"):
+    """Telegram Bot API orqali xabar yuborish/tahrirlash"""
+    return call(*_message_request(chat_id, text, reply_markup, message_id, parse_mode))
+
+
+def send_telegram_location(chat_id, latitude, longitude):
+    """Telegram Bot API orqali lokatsiya yuborish"""
+    return call(*_location_request(chat_id, latitude, longitude))
+
+
+async def asend_telegram_message(chat_id, text, reply_markup=None, message_id=None, parse_mode="Markdown"):
+    """send_telegram_message ning async varianti (bot handlerlari uchun)"""
+    return await acall(*_message_request(chat_id, text, reply_markup, message_id, parse_mode))
+
+
+async def asend_telegram_location(chat_id, latitude, longitude):
+    """send_telegram_location ning async varianti (bot handlerlari uchun)"""
+    return await acall(*_location_request(chat_id, latitude, longitude))
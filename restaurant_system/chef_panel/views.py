@@ -1,101 +1,49 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.utils import timezone
-from django.db.models import Count, Q, Sum
-from django.core.paginator import Paginator
+from django.views.decorators.http import condition, require_GET
 import json
 import logging
-from datetime import timedelta
 
 from django.conf import settings
 from .utils import send_telegram_message, send_telegram_location
-from .models import Order, Product, Category, OrderItem, OrderStatusHistory, Customer
+from .models import Order, Product, Category, Customer, BroadcastJob
 from .forms import ProductForm, CategoryForm
+from . import order_feed, rollup, search as order_search, stats
+from .order_messages import chef_keyboard, new_order_texts
+from .pagination import keyset_page
+from .services import VALID_TRANSITIONS, change_order_status, create_order
 
 logger = logging.getLogger(__name__)
 
 def dashboard(request):
   """Oshpaz dashboard"""
-  # Statistika
-  today = timezone.now().date()
-  
-  stats = {
-      'yangi_buyurtmalar': Order.objects.filter(status='yangi').count(),
-      'tasdiqlangan_buyurtmalar': Order.objects.filter(status='tasdiqlangan').count(),
-      'tayor_buyurtmalar': Order.objects.filter(status='tayor').count(),
-      'bugungi_buyurtmalar': Order.objects.filter(created_at__date=today).count(),
-  }
-  
-  # Oxirgi buyurtmalar
-  recent_orders = Order.objects.filter(
-      status__in=['yangi', 'tasdiqlangan']
-  ).order_by('-created_at')[:10]
-  
-  # Mijozlar statistikasi: eng ko'p buyurtma bergan mijozlar
-  top_customers = Customer.objects.annotate(
-      order_count=Count('order')
-  ).order_by('-order_count')[:10]
-
-  # Haftalik buyurtmalar statistikasi
-  seven_days_ago = timezone.now() - timedelta(days=7)
-  weekly_orders_queryset = Order.objects.filter(created_at__gte=seven_days_ago)
-  
-  weekly_stats = {
-      'total_orders': weekly_orders_queryset.count(),
-      'total_amount': weekly_orders_queryset.aggregate(Sum('total_amount'))['total_amount__sum'] or 0,
-  }
-
-  # Bugungi umumiy savdo
-  today_sales = Order.objects.filter(created_at__date=today).aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-
-  # Holatlar bo'yicha savdo
-  sales_by_status = Order.objects.values('status').annotate(total_sales=Sum('total_amount')).order_by('status')
-  
-  # Status nomlarini olish uchun lug'at yaratamiz
-  status_display_map = dict(Order.STATUS_CHOICES)
-  sales_by_status_display = []
-  for item in sales_by_status:
-      sales_by_status_display.append({
-          'status': status_display_map.get(item['status'], item['status']),
-          'total_sales': item['total_sales']
-      })
-
-  context = {
-      'stats': stats,
-      'recent_orders': recent_orders,
-      'top_customers': top_customers,
-      'weekly_stats': weekly_stats,
-      'today_sales': today_sales, # Yangi bugungi savdo
-      'sales_by_status': sales_by_status_display, # Yangi holatlar bo'yicha savdo
-  }
-  return render(request, 'chef_panel/dashboard.html', context)
+  return render(request, 'chef_panel/dashboard.html', stats.dashboard_context())
 
 def order_list(request):
   """Barcha buyurtmalar ro'yxati"""
   status_filter = request.GET.get('status', '')
   search = request.GET.get('search', '')
   
-  orders = Order.objects.all().order_by('-created_at')
+  orders = Order.objects.select_related('customer')
   
   if status_filter:
       orders = orders.filter(status=status_filter)
   
   if search:
-      orders = orders.filter(
-          Q(order_number__icontains=search) |
-          Q(customer__full_name__icontains=search) |
-          Q(customer__phone_number__icontains=search)
-      )
+      orders = order_search.filter_orders(orders, search)
+  
+  page_obj = keyset_page(orders, request.GET.get('cursor'), 20)
   
-  paginator = Paginator(orders, 20)
-  page_number = request.GET.get('page')
-  page_obj = paginator.get_page(page_number)
+  # Qidiruvsiz ro'yxat uchun taxminiy jami son yig'indilardan olinadi (COUNT(*) qilinmaydi)
+  estimated_total = None if search else rollup.order_count(status_filter)
   
   context = {
       'page_obj': page_obj,
+      'estimated_total': estimated_total,
       'status_filter': status_filter,
       'search': search,
       'status_choices': Order.STATUS_CHOICES,
@@ -104,21 +52,35 @@ def order_list(request):
 
 def new_orders(request):
   """Yangi buyurtmalar"""
-  orders = Order.objects.filter(
-      status__in=['yangi', 'tasdiqlangan']
-  ).order_by('-created_at')
+  # Cursor buyurtmalardan oldin olinadi: oraliqda bo'lgan o'zgarish feed orqali keladi
+  feed_cursor = order_feed.latest_cursor()
+  orders = order_feed.active_orders()
   
   context = {
       'orders': orders,
       'title': 'Yangi buyurtmalar',
+      'feed_cursor': feed_cursor,
   }
   return render(request, 'chef_panel/new_orders.html', context)
 
+def new_orders_feed(request):
+  """SSE: yangi buyurtmalar ekraniga faqat o'zgargan buyurtmalarni yuborish"""
+  cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+  try:
+      cursor = int(cursor)
+  except (TypeError, ValueError):
+      cursor = order_feed.latest_cursor()
+
+  response = StreamingHttpResponse(order_feed.stream(cursor), content_type='text/event-stream')
+  response['Cache-Control'] = 'no-cache'
+  response['X-Accel-Buffering'] = 'no'  # nginx oqimni buferlamasligi uchun
+  return response
+
 def order_detail(request, order_id):
   """Buyurtma tafsilotlari"""
-  order = get_object_or_404(Order, id=order_id)
-  order_items = order.items.all()
-  status_history = order.status_history.all()
+  order = get_object_or_404(Order.objects.select_related('customer'), id=order_id)
+  order_items = order.items.select_related('product')
+  status_history = order.status_history.select_related('changed_by')
   
   context = {
       'order': order,
@@ -134,78 +96,26 @@ def create_order_api(request):
       try:
           data = json.loads(request.body)
           
-          # Mijozni topish yoki yaratish
           telegram_id = data.get('user_id')
           full_name = data.get('full_name', 'Noma\'lum')
           phone_number = data.get('phone', 'Noma\'lum')
-          
-          customer, created = Customer.objects.get_or_create(
-              telegram_id=telegram_id,
-              defaults={'full_name': full_name, 'phone_number': phone_number}
-          )
-          if not created:
-              # Agar mijoz mavjud bo'lsa, ma'lumotlarini yangilash
-              customer.full_name = full_name
-              customer.phone_number = phone_number
-              customer.save()
-
-          # Buyurtma yaratish
-          order = Order.objects.create(
-              customer=customer,
-              telegram_user_id=telegram_id,
-              status='yangi',
+
+          # Mijoz, buyurtma, elementlar (bulk) va holat tarixi - bitta tranzaksiyada
+          order, order_items = create_order(
+              telegram_id, full_name, phone_number,
+              items=data.get('products', []),
               payment_method=data.get('payment_method', 'naqd'),
-              latitude=data.get('location', {}).get('latitude'),
-              longitude=data.get('location', {}).get('longitude'),
+              location=data.get('location', {}),
               address=data.get('address', ''),
-              products_total=data.get('products_total'),
               delivery_cost=data.get('delivery_cost', 0),
+              products_total=data.get('products_total'),
               total_amount=data.get('total'),
-          )
-
-          # Buyurtma elementlarini qo'shish
-          for item_data in data.get('products', []):
-              product_name, quantity, item_price = item_data
-              product = Product.objects.filter(name=product_name).first()
-              if product:
-                  OrderItem.objects.create(
-                      order=order,
-                      product=product,
-                      quantity=quantity,
-                      price=item_price,
-                      total=quantity * item_price
-                  )
-              else:
-                  logger.warning(f"Mahsulot topilmadi: {product_name} (Buyurtma ID: {order.id})")
-
-          # Holat tarixini saqlash
-          OrderStatusHistory.objects.create(
-              order=order,
-              old_status='',
-              new_status='yangi',
-              notes='Telegram bot orqali yaratildi'
+              strict=False,
           )
 
           # Oshpazga xabar yuborish
-          chef_text = f"🍽 **Yangi buyurtma #{order.order_number}**\n\n"
-          chef_text += f"👨‍💼 Ism: {full_name}\n"
-          chef_text += f"📱 Telefon: {phone_number}\n"
-          chef_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-          if order.address:
-              chef_text += f"🏠 Manzil: {order.address}\n"
-          else:
-              chef_text += "📍 Manzil: Faqat lokatsiya\n"
-          chef_text += f"\n🍽 **Mahsulotlar:**\n"
-          for item in order.items.all():
-              chef_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-          chef_text += f"\n💰 Jami: {order.total_amount:,} so'm"
-
-          keyboard_chef = [
-              [
-                  {'text': "✅ Tasdiqlash", 'callback_data': f"chef_confirm:{order.id}"},
-                  {'text': "❌ Bekor qilish", 'callback_data': f"chef_cancel:{order.id}"}
-              ]
-          ]
+          chef_text, user_text = new_order_texts(order, order_items)
+          keyboard_chef = chef_keyboard(order, 'yangi')
           
           chef_msg_response = send_telegram_message(
               chat_id=settings.CHEF_CHAT_ID, 
@@ -223,23 +133,7 @@ def create_order_api(request):
               )
 
           # Foydalanuvchiga xabar
-          user_text = f"✅ **Buyurtmangiz qabul qilindi!**\n\n"
-          user_text += f"📋 Buyurtma ID: **{order.order_number}**\n"
-          user_text += f"👨‍💼 Ism: {full_name}\n"
-          user_text += f"📱 Telefon: {phone_number}\n"
-          user_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-          if order.address:
-              user_text += f"🏠 Manzil: {order.address}\n"
-          else:
-              user_text += "📍 Manzil: Faqat lokatsiya\n"
-          if order.latitude and order.longitude:
-              user_text += f"📍 Lokatsiya: https://www.google.com/maps?q={order.latitude},{order.longitude}\n"
-          user_text += f"\n🍽 **Mahsulotlar:**\n"
-          for item in order.items.all():
-              user_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-          user_text += f"\n💰 Jami: {order.total_amount:,} so'm\n🆕 Status: **Yangi**"
-
-          user_keyboard = [[{'text': "⬅️ Bosh menu", 'callback_data': "main_menu"}]]
+          user_keyboard = [[{'text': "⬅️ Бош меню", 'callback_data': "main_menu"}]]
           user_msg_response = send_telegram_message(
               chat_id=telegram_id,
               text=user_text,
@@ -256,160 +150,6 @@ def create_order_api(request):
           return JsonResponse({'success': False, 'message': str(e)}, status=400)
   return JsonResponse({'success': False, 'message': 'Faqat POST so\'rov qabul qilinadi'}, status=405)
 
-def _update_telegram_messages(order, old_status, new_status, changed_by_user=None):
-  """Buyurtma holati o'zgarganda Telegram xabarlarini yangilash"""
-  status_emoji = {
-      "yangi": "🆕",
-      "tasdiqlangan": "✅",
-      "tayor": "🍽",
-      "yolda": "🚚",
-      "yetkazildi": "✅",
-      "bekor_qilingan": "❌"
-  }
-  emoji = status_emoji.get(new_status, "📋")
-
-  # Foydalanuvchi xabarini yangilash
-  user_text = f"✅ **Buyurtmangiz qabul qilindi!**\n\n"
-  user_text += f"📋 Buyurtma ID: **{order.order_number}**\n"
-  user_text += f"👨‍💼 Ism: {order.customer.full_name}\n"
-  user_text += f"📱 Telefon: {order.customer.phone_number}\n"
-  user_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-  if order.address:
-      user_text += f"🏠 Manzil: {order.address}\n"
-  else:
-      user_text += "📍 Manzil: Faqat lokatsiya\n"
-  if order.latitude and order.longitude:
-      user_text += f"📍 Lokatsiya: https://www.google.com/maps?q={order.latitude},{order.longitude}\n"
-  user_text += f"\n🍽 **Mahsulotlar:**\n"
-  for item in order.items.all():
-      user_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-  user_text += f"\n💰 Jami: {order.total_amount:,} so'm\n"
-  user_text += f"{emoji} Status: **{order.get_status_display()}**"
-
-  user_keyboard = [[{'text': "⬅️ Bosh menu", 'callback_data': "main_menu"}]]
-  
-  if order.user_message_id and order.telegram_user_id:
-      send_telegram_message(
-          chat_id=order.telegram_user_id,
-          text=user_text,
-          reply_markup={'inline_keyboard': user_keyboard},
-          message_id=order.user_message_id
-      )
-  else:
-      # Agar message_id yo'q bo'lsa, yangi xabar yuborish
-      if order.telegram_user_id:
-          response = send_telegram_message(
-              chat_id=order.telegram_user_id,
-              text=user_text,
-              reply_markup={'inline_keyboard': user_keyboard}
-          )
-          if response and response.get('ok'):
-              order.user_message_id = response['result']['message_id']
-              order.save()
-
-  # Oshpaz xabarini yangilash
-  if order.chef_message_id:
-      chef_text = f"{emoji} **Buyurtma #{order.order_number} holati o'zgardi: {order.get_status_display()}**\n\n"
-      chef_text += f"👨‍💼 Ism: {order.customer.full_name}\n"
-      chef_text += f"📱 Telefon: {order.customer.phone_number}\n"
-      chef_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-      if order.address:
-          chef_text += f"🏠 Manzil: {order.address}\n"
-      else:
-          chef_text += "📍 Manzil: Faqat lokatsiya\n"
-      chef_text += f"\n🍽 **Mahsulotlar:**\n"
-      for item in order.items.all():
-          chef_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-      chef_text += f"\n💰 Jami: {order.total_amount:,} so'm"
-
-      chef_keyboard = []
-      if new_status == 'yangi':
-          chef_keyboard = [
-              [{'text': "✅ Tasdiqlash", 'callback_data': f"chef_confirm:{order.id}"},
-               {'text': "❌ Bekor qilish", 'callback_data': f"chef_cancel:{order.id}"}]
-          ]
-      elif new_status == 'tasdiqlangan':
-          chef_keyboard = [
-              [{'text': "🍽 Tayor", 'callback_data': f"chef_ready:{order.id}"}],
-              [{'text': "❌ Bekor qilish", 'callback_data': f"chef_cancel:{order.id}"}]
-          ]
-      # If status is 'tayor', 'yolda', 'yetkazildi', 'bekor_qilingan', no more actions for chef
-      
-      send_telegram_message(
-          chat_id=settings.CHEF_CHAT_ID,
-          text=chef_text,
-          reply_markup={'inline_keyboard': chef_keyboard},
-          message_id=order.chef_message_id
-      )
-
-  # Kuryer xabarini yangilash (agar mavjud bo'lsa)
-  if order.courier_message_id:
-      courier_text = f"{emoji} **Buyurtma #{order.order_number} holati o'zgardi: {order.get_status_display()}**\n\n"
-      courier_text += f"👨‍💼 Ism: {order.customer.full_name}\n"
-      courier_text += f"📱 Telefon: {order.customer.phone_number}\n"
-      courier_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-      if order.address:
-          courier_text += f"🏠 Manzil: {order.address}\n"
-      else:
-          courier_text += "📍 Manzil: Faqat lokatsiya\n"
-      courier_text += f"\n🍽 **Mahsulotlar:**\n"
-      for item in order.items.all():
-          courier_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-      courier_text += f"\n💰 Jami: {order.total_amount:,} so'm"
-
-      courier_keyboard = []
-      if new_status == 'tayor':
-          courier_keyboard = [
-              [{'text': "🚚 Yo'lda", 'callback_data': f"courier_on_way:{order.id}"}],
-              [{'text': "❌ Bekor qilish", 'callback_data': f"courier_cancel:{order.id}"}]
-          ]
-      elif new_status == 'yolda':
-          courier_keyboard = [
-              [{'text': "✅ Yetkazildi", 'callback_data': f"courier_delivered:{order.id}"}],
-              [{'text': "❌ Bekor qilish", 'callback_data': f"courier_cancel:{order.id}"}]
-          ]
-      
-      send_telegram_message(
-          chat_id=settings.ADMIN_CHAT_ID, # Assuming ADMIN_CHAT_ID is courier's chat ID
-          text=courier_text,
-          reply_markup={'inline_keyboard': courier_keyboard},
-          message_id=order.courier_message_id
-      )
-  elif new_status == 'tayor': # If order is ready, send new message to courier if no existing message_id
-      courier_text = f"🚚 **Yetkazib berish uchun yangi buyurtma #{order.order_number}**\n\n"
-      courier_text += f"👨‍💼 Ism: {order.customer.full_name}\n"
-      courier_text += f"📱 Telefon: {order.customer.phone_number}\n"
-      courier_text += f"💳 To'lov usuli: {order.get_payment_method_display()}\n"
-      if order.address:
-          courier_text += f"🏠 Manzil: {order.address}\n"
-      else:
-          courier_text += "📍 Manzil: Faqat lokatsiya\n"
-      courier_text += f"\n🍽 **Mahsulotlar:**\n"
-      for item in order.items.all():
-          courier_text += f"• {item.quantity} dona {item.product.name} - {item.total:,} so'm\n"
-      courier_text += f"\n💰 Jami: {order.total_amount:,} so'm"
-
-      courier_keyboard = [
-          [{'text': "🚚 Yo'lda", 'callback_data': f"courier_on_way:{order.id}"}],
-          [{'text': "❌ Bekor qilish", 'callback_data': f"courier_cancel:{order.id}"}]
-      ]
-      courier_msg_response = send_telegram_message(
-          chat_id=settings.ADMIN_CHAT_ID,
-          text=courier_text,
-          reply_markup={'inline_keyboard': courier_keyboard}
-      )
-      if courier_msg_response and courier_msg_response.get('ok'):
-          order.courier_message_id = courier_msg_response['result']['message_id']
-          order.save()
-      
-      if order.latitude and order.longitude:
-          send_telegram_location(
-              chat_id=settings.ADMIN_CHAT_ID,
-              latitude=order.latitude,
-              longitude=order.longitude
-          )
-
-
 @csrf_exempt
 def confirm_order(request, order_id):
   """Buyurtmani tasdiqlash"""
@@ -417,22 +157,13 @@ def confirm_order(request, order_id):
       order = get_object_or_404(Order, id=order_id)
       
       if order.status == 'yangi':
-          old_status = order.status
-          order.status = 'tasdiqlangan'
-          order.confirmed_at = timezone.now()
-          order.save()
-          
-          # Holat tarixini saqlash
-          OrderStatusHistory.objects.create(
-              order=order,
-              old_status=old_status,
-              new_status='tasdiqlangan',
+          # Holat, tarix va Telegram xabarlari navbati bitta tranzaksiyada yoziladi
+          change_order_status(
+              order, 'tasdiqlangan',
               changed_by=request.user if request.user.is_authenticated else None,
               notes='Oshpaz tomonidan tasdiqlandi'
           )
           
-          _update_telegram_messages(order, old_status, 'tasdiqlangan', request.user)
-          
           messages.success(request, f'Buyurtma #{order.order_number} tasdiqlandi!')
           return JsonResponse({'success': True, 'message': 'Buyurtma tasdiqlandi'})
       else:
@@ -447,22 +178,12 @@ def mark_ready(request, order_id):
       order = get_object_or_404(Order, id=order_id)
       
       if order.status == 'tasdiqlangan':
-          old_status = order.status
-          order.status = 'tayor'
-          order.ready_at = timezone.now()
-          order.save()
-          
-          # Holat tarixini saqlash
-          OrderStatusHistory.objects.create(
-              order=order,
-              old_status=old_status,
-              new_status='tayor',
+          change_order_status(
+              order, 'tayor',
               changed_by=request.user if request.user.is_authenticated else None,
               notes='Oshpaz tomonidan tayor deb belgilandi'
           )
           
-          _update_telegram_messages(order, old_status, 'tayor', request.user)
-          
           messages.success(request, f'Buyurtma #{order.order_number} tayor!')
           return JsonResponse({'success': True, 'message': 'Buyurtma tayor'})
       else:
@@ -477,21 +198,12 @@ def cancel_order(request, order_id):
       order = get_object_or_404(Order, id=order_id)
       
       if order.status not in ['yetkazildi', 'bekor_qilingan']:
-          old_status = order.status
-          order.status = 'bekor_qilingan'
-          order.save()
-          
-          # Holat tarixini saqlash
-          OrderStatusHistory.objects.create(
-              order=order,
-              old_status=old_status,
-              new_status='bekor_qilingan',
+          change_order_status(
+              order, 'bekor_qilingan',
               changed_by=request.user if request.user.is_authenticated else None,
               notes='Oshpaz tomonidan bekor qilindi'
           )
           
-          _update_telegram_messages(order, old_status, 'bekor_qilingan', request.user)
-          
           messages.success(request, f'Buyurtma #{order.order_number} bekor qilindi!')
           return JsonResponse({'success': True, 'message': 'Buyurtma bekor qilindi'})
       else:
@@ -578,37 +290,10 @@ def update_order_status_api(request):
           old_status = order.status
           
           # Faqat ruxsat etilgan status o'zgarishlarini tekshirish
-          valid_transitions = {
-              'yangi': ['tasdiqlangan', 'bekor_qilingan'],
-              'tasdiqlangan': ['tayor', 'bekor_qilingan'],
-              'tayor': ['yolda', 'bekor_qilingan'],
-              'yolda': ['yetkazildi', 'bekor_qilingan'],
-          }
-
-          if new_status not in valid_transitions.get(old_status, []):
+          if new_status not in VALID_TRANSITIONS.get(old_status, []):
               return JsonResponse({'success': False, 'message': f"Holat {old_status} dan {new_status} ga o'zgartirishga ruxsat berilmagan."}, status=400)
 
-          order.status = new_status
-          
-          # Vaqt belgilarini yangilash
-          if new_status == 'tasdiqlangan':
-              order.confirmed_at = timezone.now()
-          elif new_status == 'tayor':
-              order.ready_at = timezone.now()
-          elif new_status == 'yetkazildi':
-              order.delivered_at = timezone.now()
-          
-          order.save()
-          
-          # Holat tarixini saqlash
-          OrderStatusHistory.objects.create(
-              order=order,
-              old_status=old_status,
-              new_status=new_status,
-              notes=f'Telegram bot orqali yangilandi'
-          )
-          
-          _update_telegram_messages(order, old_status, new_status) # Update messages after status change
+          change_order_status(order, new_status, notes=f'Telegram bot orqali yangilandi')
           
           return JsonResponse({
               'success': True, 
@@ -621,25 +306,51 @@ def update_order_status_api(request):
   
   return JsonResponse({'success': False, 'message': 'Faqat POST so\'rov qabul qilinadi'}, status=405)
 
+USER_ORDER_FIELDS = ('id', 'order_number', 'created_at', 'total_amount', 'status')
+
+def _user_order_data(row, status_display):
+  return {
+      'order_id': row['order_number'],
+      'date': row['created_at'].strftime("%Y-%m-%d %H:%M"),
+      'total': float(row['total_amount']),
+      'status': row['status'],
+      'status_display': status_display.get(row['status'], row['status']),
+  }
+
+def _stream_user_orders(orders, status_display):
+  # Har bir buyurtma alohida JSON qator (NDJSON); xotira tarix uzunligiga bog'liq emas
+  for row in orders.order_by('-created_at', '-id').iterator(chunk_size=500):
+      yield json.dumps(_user_order_data(row, status_display), ensure_ascii=False) + "\n"
+
 @csrf_exempt
 def get_user_orders_api(request, telegram_id):
-  """API: Foydalanuvchining buyurtmalarini olish"""
+  """API: Foydalanuvchining buyurtmalarini olish (limit/cursor bo'yicha sahifalab yoki ?format=ndjson oqim)"""
   if request.method == 'GET':
       try:
-          customer = get_object_or_404(Customer, telegram_id=telegram_id)
-          orders = Order.objects.filter(customer=customer).order_by('-created_at')
-          
-          orders_data = []
-          for order in orders:
-              orders_data.append({
-                  'order_id': order.order_number,
-                  'date': order.created_at.strftime("%Y-%m-%d %H:%M"),
-                  'total': float(order.total_amount),
-                  'status': order.status,
-                  'status_display': order.get_status_display(),
-              })
-          
-          return JsonResponse({'success': True, 'orders': orders_data})
+          customer_id = Customer.objects.filter(telegram_id=telegram_id).values_list('id', flat=True).first()
+          if customer_id is None:
+              return JsonResponse({'success': False, 'message': 'Mijoz topilmadi'}, status=404)
+          orders = Order.objects.filter(customer_id=customer_id).values(*USER_ORDER_FIELDS)
+          status_display = dict(Order.STATUS_CHOICES)
+
+          if request.GET.get('format') == 'ndjson':
+              return StreamingHttpResponse(
+                  _stream_user_orders(orders, status_display), content_type='application/x-ndjson'
+              )
+
+          try:
+              limit = int(request.GET.get('limit', settings.USER_ORDERS_API_LIMIT))
+          except ValueError:
+              limit = settings.USER_ORDERS_API_LIMIT
+          limit = max(1, min(limit, settings.USER_ORDERS_API_MAX_LIMIT))
+          page = keyset_page(orders, request.GET.get('cursor'), limit)
+
+          return JsonResponse({
+              'success': True,
+              'orders': [_user_order_data(row, status_display) for row in page],
+              'next_cursor': page.next_cursor,
+              'previous_cursor': page.previous_cursor,
+          })
       except Exception as e:
           logger.error(f"Foydalanuvchi buyurtmalarini olishda xato: {e}", exc_info=True)
           return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -700,6 +411,68 @@ def get_order_details_api(request, order_id):
           return JsonResponse({'success': False, 'message': str(e)}, status=400)
   return JsonResponse({'success': False, 'message': 'Faqat GET so\'rov qabul qilinadi'}, status=405)
 
+def _delta_cursor(request):
+  try:
+      return int(request.GET['cursor'])
+  except (KeyError, ValueError):
+      return None
+
+def _active_orders_etag(request):
+  # Faqat OrderStatusHistory cursori solishtiriladi, buyurtmalar jadvaliga murojaat qilinmaydi
+  cursor = _delta_cursor(request)
+  return f"{'all' if cursor is None else cursor}-{order_feed.latest_cursor()}"
+
+@require_GET
+@condition(etag_func=_active_orders_etag)
+def active_orders_delta_api(request):
+  """API: cursor dan keyin o'zgargan faol buyurtmalar (If-None-Match mos kelsa 304)"""
+  cursor = _delta_cursor(request)
+  if cursor is None:
+      # Cursor berilmagan: barcha faol buyurtmalar va joriy cursor
+      new_cursor = order_feed.latest_cursor()
+      orders, removed = list(order_feed.active_orders()), []
+  else:
+      new_cursor, orders, removed = order_feed.changed_orders(cursor)
+
+  response = JsonResponse({
+      'success': True,
+      'cursor': new_cursor,
+      'full': cursor is None,
+      'orders': [order_feed.order_data(order) for order in orders],
+      'removed': removed,
+      'count': order_feed.active_count(),
+  })
+  response['Cache-Control'] = 'no-cache'
+  return response
+
+def _broadcast_data(job):
+  return {
+      'id': job.id,
+      'status': job.status,
+      'status_display': job.get_status_display(),
+      'total_recipients': job.total_recipients,
+      'sent_count': job.sent_count,
+      'failed_count': job.failed_count,
+      'progress_percent': job.progress_percent,
+      'last_error': job.last_error,
+      'started_at': job.started_at.strftime("%Y-%m-%d %H:%M:%S") if job.started_at else None,
+      'finished_at': job.finished_at.strftime("%Y-%m-%d %H:%M:%S") if job.finished_at else None,
+  }
+
+def broadcast_progress(request, job_id):
+  """E'lon yuborish jarayoni"""
+  job = get_object_or_404(BroadcastJob, id=job_id)
+  context = {
+      'job': job,
+      'admin_url': reverse('admin:chef_panel_broadcastjob_changelist'),
+  }
+  return render(request, 'chef_panel/broadcast_progress.html', context)
+
+def broadcast_progress_api(request, job_id):
+  """API: E'lon jarayoni (sahifa avtomatik yangilanishi uchun)"""
+  job = get_object_or_404(BroadcastJob, id=job_id)
+  return JsonResponse({'success': True, 'job': _broadcast_data(job)})
+
 
 
 # # ----------------------------------------------------
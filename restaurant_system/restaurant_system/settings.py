@@ -103,6 +103,73 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # Telegram Bot Settings
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '7823584139:AAEwKx3qgXrd8df9IwQLC2_OMxoqm7Lsia4') # BotFather dan olingan token
-TELEGRAM_API_BASE_URL = "https://api.telegram.org/bot"
+TELEGRAM_API_BASE_URL = os.environ.get('TELEGRAM_API_BASE_URL', "https://api.telegram.org/bot") # Lokal stub uchun almashtirish mumkin
+TELEGRAM_HTTP_TIMEOUT = float(os.environ.get('TELEGRAM_HTTP_TIMEOUT', '10')) # soniya
+TELEGRAM_HTTP_POOL_SIZE = int(os.environ.get('TELEGRAM_HTTP_POOL_SIZE', '20')) # keep-alive ulanishlar soni
 CHEF_CHAT_ID = int(os.environ.get('CHEF_CHAT_ID', '6963429482'))   # Oshpaz chat ID - O'ZGARTIRING!
 ADMIN_CHAT_ID = int(os.environ.get('ADMIN_CHAT_ID', '8194156959')) # Kuryer/Admin chat ID - O'ZGARTIRING!
+
+# Mahsulot rasmlarining kichraytirilgan nusxalari (Telegram, panel, WebP) fon oqimida yaratiladi
+PRODUCT_IMAGE_WORKER = os.environ.get('PRODUCT_IMAGE_WORKER', 'True') == 'True' # False bo'lsa: manage.py build_image_variants
+
+# Bot menyu keshi: boshqa jarayondagi o'zgarishlar necha soniyada tekshiriladi
+CATALOG_PROBE_INTERVAL = float(os.environ.get('CATALOG_PROBE_INTERVAL', '5'))
+
+# Bot sozlamalari (BotSettings) keshi: admin paneldagi o'zgarishlar necha soniyada tekshiriladi
+BOT_SETTINGS_PROBE_INTERVAL = float(os.environ.get('BOT_SETTINGS_PROBE_INTERVAL', '5'))
+
+# Yetkazib berish hududlari (DeliveryZone) indeksi: admin paneldagi o'zgarishlar necha soniyada tekshiriladi
+DELIVERY_ZONES_PROBE_INTERVAL = float(os.environ.get('DELIVERY_ZONES_PROBE_INTERVAL', '5'))
+
+# Buyurtma raqamlari nechtadan band qilinadi (1 = har safar hisoblagichdan)
+ORDER_NUMBER_BLOCK_SIZE = int(os.environ.get('ORDER_NUMBER_BLOCK_SIZE', '1'))
+
+# Telegram xabarlari navbati (outbox) dispatcheri
+OUTBOX_DISPATCH_IN_BOT = os.environ.get('OUTBOX_DISPATCH_IN_BOT', 'True') == 'True' # False bo'lsa: manage.py run_outbox_dispatcher
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '50'))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '1')) # soniya
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_RETRY_BASE = float(os.environ.get('OUTBOX_RETRY_BASE', '2')) # birinchi qayta urinishgacha soniya, keyin ikki baravar
+OUTBOX_RETRY_MAX = float(os.environ.get('OUTBOX_RETRY_MAX', '300'))
+OUTBOX_CLAIM_TIMEOUT = int(os.environ.get('OUTBOX_CLAIM_TIMEOUT', '300')) # band qilingan yozuv qancha vaqtdan keyin qaytariladi
+
+# Telegram limitlari: bot bo'yicha ~30 xabar/soniya, bitta chatga ~1 xabar/soniya
+TELEGRAM_GLOBAL_RATE = float(os.environ.get('TELEGRAM_GLOBAL_RATE', '30'))
+TELEGRAM_PER_CHAT_INTERVAL = float(os.environ.get('TELEGRAM_PER_CHAT_INTERVAL', '1')) # soniya
+
+# E'lonlar (broadcast) workeri
+BROADCAST_IN_BOT = os.environ.get('BROADCAST_IN_BOT', 'True') == 'True' # False bo'lsa: manage.py run_broadcasts
+BROADCAST_RATE = float(os.environ.get('BROADCAST_RATE', '20')) # umumiy limitdan e'lonlarga ajratilgan qism
+BROADCAST_CONCURRENCY = int(os.environ.get('BROADCAST_CONCURRENCY', '20'))
+BROADCAST_CHUNK_SIZE = int(os.environ.get('BROADCAST_CHUNK_SIZE', '100'))
+BROADCAST_MAX_ATTEMPTS = int(os.environ.get('BROADCAST_MAX_ATTEMPTS', '5'))
+BROADCAST_POLL_INTERVAL = float(os.environ.get('BROADCAST_POLL_INTERVAL', '2')) # soniya
+BROADCAST_STALE_AFTER = int(os.environ.get('BROADCAST_STALE_AFTER', '60')) # heartbeat eskirsa vazifani boshqa worker oladi
+
+# Bot foydalanuvchi holati (user_data) bazaga shu oraliqda birgalikda yoziladi
+BOT_PERSISTENCE_INTERVAL = float(os.environ.get('BOT_PERSISTENCE_INTERVAL', '10')) # soniya
+
+# Bot rejimi: 'polling' yoki 'webhook' (python telegram_bot.py --mode webhook)
+TELEGRAM_BOT_MODE = os.environ.get('TELEGRAM_BOT_MODE', 'polling')
+TELEGRAM_WEBHOOK_URL = os.environ.get('TELEGRAM_WEBHOOK_URL', '') # Tashqi HTTPS manzil, masalan https://example.uz
+TELEGRAM_WEBHOOK_PATH = os.environ.get('TELEGRAM_WEBHOOK_PATH', 'telegram/webhook')
+TELEGRAM_WEBHOOK_LISTEN = os.environ.get('TELEGRAM_WEBHOOK_LISTEN', '127.0.0.1') # reverse proxy ortida
+TELEGRAM_WEBHOOK_PORT = int(os.environ.get('TELEGRAM_WEBHOOK_PORT', '8443'))
+TELEGRAM_WEBHOOK_SECRET = os.environ.get('TELEGRAM_WEBHOOK_SECRET', '') # bo'sh bo'lsa bot tokenidan hosil qilinadi
+TELEGRAM_WEBHOOK_MAX_CONNECTIONS = int(os.environ.get('TELEGRAM_WEBHOOK_MAX_CONNECTIONS', '40'))
+TELEGRAM_CONCURRENT_UPDATES = int(os.environ.get('TELEGRAM_CONCURRENT_UPDATES', '1')) # 1 = updatelar ketma-ket
+
+# Yangi buyurtmalar ekrani uchun SSE feed.
+# Har bir ochiq sahifa oqim davomida bitta WSGI worker/threadni band qiladi: gunicorn
+# --worker-class gthread --threads bilan ekranlar sonidan ko'proq thread bering va
+# ORDER_FEED_MAX_DURATION ni worker --timeout (standart 30 s) dan kichik qoldiring.
+ORDER_FEED_PROBE_INTERVAL = float(os.environ.get('ORDER_FEED_PROBE_INTERVAL', '1')) # boshqa jarayondagi o'zgarishlarni tekshirish, soniya
+ORDER_FEED_HEARTBEAT = float(os.environ.get('ORDER_FEED_HEARTBEAT', '10')) # soniya
+ORDER_FEED_MAX_DURATION = float(os.environ.get('ORDER_FEED_MAX_DURATION', '25')) # keyin brauzer Last-Event-ID bilan qayta ulanadi
+
+# Dashboard statistikasi keshi (buyurtma holati o'zgarganda ham o'chiriladi)
+DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', '5')) # soniya
+
+# Mijoz buyurtmalari API (api/get_user_orders/<telegram_id>/): bitta javobdagi buyurtmalar soni
+USER_ORDERS_API_LIMIT = int(os.environ.get('USER_ORDERS_API_LIMIT', '20'))
+USER_ORDERS_API_MAX_LIMIT = int(os.environ.get('USER_ORDERS_API_MAX_LIMIT', '100'))
@@ -1,15 +1,15 @@
 import os
+import argparse
+import asyncio
+import hashlib
 import django
 import logging
-import json
-import math
-import requests # Still needed for Telegram API calls
 import datetime # Added for time comparison
 from decimal import Decimal
 
 from telegram import (
     Update, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton,
-    ReplyKeyboardMarkup, InputMediaPhoto, ReplyKeyboardRemove
+    ReplyKeyboardMarkup, InputMediaPhoto, ReplyKeyboardRemove, Message
 )
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, CallbackQueryHandler, MessageHandler,
@@ -18,7 +18,6 @@ from telegram.ext import (
 
 # Import sync_to_async for bridging sync Django ORM with async bot
 from asgiref.sync import sync_to_async
-from django.db import transaction # For atomic operations
 
 # Configure logging
 logging.basicConfig(
@@ -34,293 +33,28 @@ django.setup()
 
 # Now you can import Django models and settings
 from django.conf import settings
-from chef_panel.models import Category, Product, Customer, Order, OrderItem, OrderStatusHistory, BotSettings # Import BotSettings
+from django.core.exceptions import ImproperlyConfigured
+from chef_panel.models import Customer, Order
 from django.utils import timezone # For setting timestamps
-
-# Global variables
-STORE_LAT = 40.665236
-STORE_LON = 72.563908
-
-mahsulotlar = {}
-kategoriyalar = {}
-bot_settings = None # Global variable to hold bot settings
-
-# --- Utility functions for Telegram API (adapted from chef_panel/utils.py) ---
-def send_telegram_message(chat_id, text, reply_markup=None, message_id=None, parse_mode="Markdown"):
-    """Telegram Bot API orqali xabar yuborish/tahrirlash"""
-    url = f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/"
-    payload = {
-        'chat_id': chat_id,
-        'text': text,
-        'parse_mode': parse_mode
-    }
-    if reply_markup:
-        payload['reply_markup'] = json.dumps(reply_markup)
-
-    try:
-        if message_id:
-            url += "editMessageText"
-            payload['message_id'] = message_id
-        else:
-            url += "sendMessage"
-
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Telegram xabar yuborishda xato: {e}")
-        return None
-
-def send_telegram_location(chat_id, latitude, longitude):
-    """Telegram Bot API orqali lokatsiya yuborish"""
-    url = f"{settings.TELEGRAM_API_BASE_URL}{settings.TELEGRAM_BOT_TOKEN}/sendLocation"
-    payload = {
-        'chat_id': chat_id,
-        'latitude': latitude,
-        'longitude': longitude
-    }
-    try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Telegram lokatsiya yuborishda xato: {e}")
-        return None
+from chef_panel.utils import (
+    asend_telegram_message, asend_telegram_location, aclose_client
+)
+from chef_panel.catalog import aget_catalog, current_catalog
+from chef_panel.bot_settings import aget_settings
+from chef_panel import delivery_zones, pricing
+from chef_panel.services import create_order, change_order_status, ProductNotFound, VALID_TRANSITIONS
+from chef_panel.dispatcher import OutboxDispatcher
+from chef_panel.broadcast import BroadcastWorker
+from chef_panel.bot_persistence import DjangoPersistence
+from chef_panel.order_messages import STATUS_EMOJI, chef_keyboard, new_order_texts
+from chef_panel.product_photos import amedia_for, file_id_from_result, remember as remember_photo
 
 # --- Data loading from Django ORM ---
-@sync_to_async
-def load_data():
-    global mahsulotlar, kategoriyalar, bot_settings
-    mahsulotlar = {}
-    kategoriyalar = {}
-    
-    for product in Product.objects.filter(is_available=True):
-        mahsulotlar[product.name] = {
-            "narx": product.price,  # Keep as Decimal
-            "desc": product.description,
-            "rasm": product.image.url if product.image else None
-        }
-    
-    for category in Category.objects.filter(is_active=True):
-        kategoriyalar[category.name] = [p.name for p in category.product_set.filter(is_available=True)]
-
-    # Load bot settings
-    try:
-        # Get the first (and ideally only) instance of BotSettings
-        # If it doesn't exist, create a default one.
-        bot_settings, created = BotSettings.objects.get_or_create(
-            pk=1, # Use a fixed primary key to ensure only one instance
-            defaults={
-                'service_start_time': datetime.time(90, 0),  # 10:00
-                'service_end_time': datetime.time(00, 0),    # 22:00
-                'delivery_base_cost': 5000,
-                'delivery_cost_per_extra_km_block': 5000,
-                'delivery_max_radius_km': 10.0
-            }
-        )
-        if created:
-            logger.info("Default BotSettings yaratildi.")
-    except Exception as e:
-        logger.error(f"BotSettings yuklashda yoki yaratishda xato: {e}", exc_info=True)
-        # Fallback to hardcoded defaults if DB access fails
-        bot_settings = type('BotSettings', (object,), {
-            'service_start_time': datetime.time(9, 0),
-            'service_end_time': datetime.time(00, 0),
-            'delivery_base_cost': Decimal('5000'),
-            'delivery_cost_per_extra_km_block': Decimal('5000'),
-            'delivery_max_radius_km': 2.0
-        })() # Create a dummy object with default attributes
-
-# --- Order status update logic (adapted from chef_panel/views.py) ---
-@sync_to_async
-def _update_telegram_messages(order, old_status, new_status, changed_by_user=None):
-    """Buyurtma holati o'zgarganda Telegram xabarlarini yangilash"""
-    status_emoji = {
-        "yangi": "🆕",
-        "tasdiqlangan": "✅",
-        "tayor": "🍽",
-        "yolda": "🚚",
-        "yetkazildi": "✅",
-        "bekor_qilingan": "❌"
-    }
-    emoji = status_emoji.get(new_status, "📋")
-
-    # Foydalanuvchi xabarini yangilash
-    user_text = f"✅ **Буюртмангиз қабул қилинди!**\n\n"
-    user_text += f"📋 Буюртма ID: **{order.order_number}**\n"
-    user_text += f"👨‍💼 Исм: {order.customer.full_name}\n"
-    user_text += f"📱 Телефон: {order.customer.phone_number}\n"
-    user_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-    if order.address:
-        user_text += f"🏠 Манзил: {order.address}\n"
-    else:
-        user_text += "📍 Манзил: Фақат локация\n"
-    if order.latitude and order.longitude:
-        user_text += f"📍 Локация: https://www.google.com/maps?q={order.latitude},{order.longitude}\n"
-    user_text += f"\n🍽 **Маҳсулотлар:**\n"
-    for item in list(order.items.all()): # Convert queryset to list in sync context
-        user_text += f"• {item.quantity} дона {item.product.name} - {item.total:,} сўм\n"
-    user_text += f"\n💰 Жами: {order.total_amount:,} сўм\n"
-    user_text += f"{emoji} Статус: **{order.get_status_display()}**"
-
-    user_keyboard = [[{'text': "⬅️ Бош меню", 'callback_data': "main_menu"}]]
-    
-    if order.user_message_id and order.telegram_user_id:
-        send_telegram_message(
-            chat_id=order.telegram_user_id,
-            text=user_text,
-            reply_markup={'inline_keyboard': user_keyboard},
-            message_id=order.user_message_id
-        )
-    else:
-        # Agar message_id yo'q bo'lsa, yangi xabar yuborish
-        if order.telegram_user_id:
-            response = send_telegram_message(
-                chat_id=order.telegram_user_id,
-                text=user_text,
-                reply_markup={'inline_keyboard': user_keyboard}
-            )
-            if response and response.get('ok'):
-                order.user_message_id = response['result']['message_id']
-                order.save()
-
-    # Oshpaz xabarini yangilash
-    if order.chef_message_id:
-        chef_text = f"{emoji} **Буюртма #{order.order_number} ҳолати ўзгарди: {order.get_status_display()}**\n\n"
-        chef_text += f"👨‍💼 Исм: {order.customer.full_name}\n"
-        chef_text += f"📱 Телефон: {order.customer.phone_number}\n"
-        chef_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-        if order.address:
-            chef_text += f"🏠 Манзил: {order.address}\n"
-        else:
-            chef_text += "📍 Манзил: Фақат локация\n"
-        chef_text += f"\n🍽 **Маҳсулотлар:**\n"
-        for item in list(order.items.all()): # Convert queryset to list in sync context
-            chef_text += f"• {item.quantity} дона {item.product.name} - {item.total:,} сўм\n"
-        chef_text += f"\n💰 Жами: {order.total_amount:,} сўм"
-
-        chef_keyboard = []
-        if new_status == 'yangi':
-            chef_keyboard = [
-                [{'text': "✅ Тасдиқлаш", 'callback_data': f"chef_confirm:{order.id}"},
-                 {'text': "❌ Бекор қилиш", 'callback_data': f"chef_cancel:{order.id}"}]
-            ]
-        elif new_status == 'tasdiqlangan':
-            chef_keyboard = [
-                [{'text': "🍽 Тайёр", 'callback_data': f"chef_ready:{order.id}"}],
-                [{'text': "❌ Бекор қилиш", 'callback_data': f"chef_cancel:{order.id}"}]
-            ]
-        # If status is 'tayor', 'yolda', 'yetkazildi', 'bekor_qilingan', no more actions for chef
-        
-        send_telegram_message(
-            chat_id=settings.CHEF_CHAT_ID,
-            text=chef_text,
-            reply_markup={'inline_keyboard': chef_keyboard},
-            message_id=order.chef_message_id
-        )
-
-    # Kuryer xabarini yangilash (agar mavjud bo'lsa)
-    if order.courier_message_id:
-        courier_text = f"{emoji} **Буюртма #{order.order_number} ҳолати ўзгарди: {order.get_status_display()}**\n\n"
-        courier_text += f"👨‍💼 Исм: {order.customer.full_name}\n"
-        courier_text += f"📱 Телефон: {order.customer.phone_number}\n"
-        courier_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-        if order.address:
-            courier_text += f"🏠 Манзил: {order.address}\n"
-        else:
-            courier_text += "📍 Манзил: Фақат локация\n"
-        courier_text += f"\n🍽 **Маҳсулотлар:**\n"
-        for item in list(order.items.all()): # Convert queryset to list in sync context
-            courier_text += f"• {item.quantity} дона {item.product.name} - {item.total:,} сўм\n"
-        courier_text += f"\n💰 Жами: {order.total_amount:,} сўм"
-
-        courier_keyboard = []
-        if new_status == 'tayor':
-            courier_keyboard = [
-                [{'text': "🚚 Йўлда", 'callback_data': f"courier_on_way:{order.id}"}],
-                [{'text': "❌ Бекор қилиш", 'callback_data': f"courier_cancel:{order.id}"}]
-            ]
-        elif new_status == 'yolda':
-            courier_keyboard = [
-                [{'text': "✅ Етказилди", 'callback_data': f"courier_delivered:{order.id}"}],
-                [{'text': "❌ Бекор қилиш", 'callback_data': f"courier_cancel:{order.id}"}]
-            ]
-        
-        send_telegram_message(
-            chat_id=settings.ADMIN_CHAT_ID, # Assuming ADMIN_CHAT_ID is courier's chat ID
-            text=courier_text,
-            reply_markup={'inline_keyboard': courier_keyboard},
-            message_id=order.courier_message_id
-        )
-    elif new_status == 'tayor': # If order is ready, send new message to courier if no existing message_id
-        courier_text = f"🚚 **Етказиб бериш учун янги буюртма #{order.order_number}**\n\n"
-        courier_text += f"👨‍💼 Исм: {order.customer.full_name}\n"
-        courier_text += f"📱 Телефон: {order.customer.phone_number}\n"
-        courier_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-        if order.address:
-            courier_text += f"🏠 Манзил: {order.address}\n"
-        else:
-            courier_text += "📍 Манзил: Фақат локация\n"
-        courier_text += f"\n🍽 **Маҳсулотлар:**\n"
-        for item in list(order.items.all()): # Convert queryset to list in sync context
-            courier_text += f"• {item.quantity} дона {item.product.name} - {item.total:,} сўм\n"
-        courier_text += f"\n💰 Жами: {order.total_amount:,} сўм"
-
-        courier_keyboard = [
-            [{'text': "🚚 Йўлда", 'callback_data': f"courier_on_way:{order.id}"}],
-            [{'text': "❌ Бекор қилиш", 'callback_data': f"courier_cancel:{order.id}"}]
-        ]
-        courier_msg_response = send_telegram_message(
-            chat_id=settings.ADMIN_CHAT_ID,
-            text=courier_text,
-            reply_markup={'inline_keyboard': courier_keyboard}
-        )
-        if courier_msg_response and courier_msg_response.get('ok'):
-            order.courier_message_id = courier_msg_response['result']['message_id']
-            order.save()
-        
-        if order.latitude and order.longitude:
-            send_telegram_location(
-                chat_id=settings.ADMIN_CHAT_ID,
-                latitude=order.latitude,
-                longitude=order.longitude
-            )
+# Menyu (mahsulot/kategoriya) chef_panel.catalog keshidan, sozlamalar chef_panel.bot_settings keshidan o'qiladi
 
 # ----------------------------------------------------
-# 1) Masofa va yetkazib berish narxi hisoblash
+# 1) Xizmat vaqti (masofa va yetkazib berish narxi: chef_panel.pricing)
 # ----------------------------------------------------
-def calculate_distance_km(lat1, lon1, lat2, lon2):
-    """
-    Haversine formula orqali (lat1, lon1) dan (lat2, lon2) ga bo'lgan
-    masofani (kmda) qaytaradi.
-    """
-    R = 6371.0  # Yer shari radiusi (km)
-    d_lat = math.radians(lat2 - lat1)
-    d_lon = math.radians(lon2 - lon1)
-
-    a = (math.sin(d_lat / 2))**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * (math.sin(d_lon / 2))**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    distance = R * c
-    return distance
-
-def calculate_delivery_cost(distance_km, bot_settings_obj=None):
-    """
-    Yetkazib berish narxini yangi qoidalar asosida hisoblaydi:
-    - Boshlang'ich narx: 5000 so'm (har qanday masofa uchun)
-    - Qo'shimcha: har km uchun 5000 so'm (1 km dan keyin)
-    - Maksimal radius: 10 km
-    """
-    if distance_km > 10.0:  # Fixed 10km max radius
-        return None  # Maksimal radiusdan uzoq joylarga xizmat yo'q
-
-    base_cost = Decimal('5000')  # Fixed base cost
-    if distance_km <= 1.0:
-        return base_cost
-    else:
-        additional_km = math.ceil(distance_km - 1.0)  # Round up additional km
-        additional_cost = Decimal('5000') * additional_km
-        return base_cost + additional_cost
-
 def is_service_time_active(current_time, start_time, end_time):
     """
     Hozirgi vaqt xizmat ko'rsatish vaqti oralig'ida ekanligini tekshiradi.
@@ -357,13 +91,20 @@ def main_inline_menu(context: ContextTypes.DEFAULT_TYPE) -> InlineKeyboardMarkup
         buttons[0].append(InlineKeyboardButton("🛒 Сават", callback_data="show_cart"))
     return InlineKeyboardMarkup(buttons)
 
-def build_cart_message(user_savat, context):
+def delivery_area_text(bot_settings, zones):
+    """Xizmat hududi: faol hududlar bo'lsa ular, aks holda BotSettings radiusi"""
+    if zones:
+        return "етказиб бериш ҳудудимиздан"
+    return f"бизнинг {bot_settings.delivery_max_radius_km:g} км радиусимиздан"
+
+async def build_cart_message(user_savat, context):
     if not user_savat:
         return "🛒 Савтингиз бўш!"
     text = "🛒 Саватчада:\n"
     total = Decimal('0')
+    products = current_catalog().products
     for product, qty in user_savat.items():
-        narx = mahsulotlar.get(product, {}).get("narx", Decimal('0'))
+        narx = products[product].narx if product in products else Decimal('0')
         summa = narx * qty
         total += summa
         text += f"• {qty} x {product} - {summa:,} сўм\n"
@@ -373,8 +114,8 @@ def build_cart_message(user_savat, context):
     # Yetkazib berish narxini context dan olamiz:
     delivery_possible = context.user_data.get('delivery_possible', None)
     if delivery_possible is False:
-        # Use bot_settings for max radius in message
-        text += f"🚫 Етказиб бериш: Мавжуд эмас (10 км дан узоқ)\n"
+        area = delivery_area_text(await aget_settings(), await delivery_zones.aget_index())
+        text += f"🚫 Етказиб бериш: Мавжуд эмас (манзил {area} ташқарида)\n"
         text += f"📊 Жами: {total:,} сўм\n"
     else:
         delivery_cost = context.user_data.get('delivery_cost')
@@ -419,6 +160,17 @@ async def remove_image_from_message(query, text, keyboard):
         logger.error(f"Failed to replace image with placeholder: {e}")
         await query.answer("Хатолик юз берди. Илтимос, қайта уриниб кўринг.", show_alert=True)
 
+async def edit_product_photo(query, product_data, image, text, keyboard):
+    """Mahsulot rasmini ko'rsatish. Fayl birinchi marta yuklanganda Telegram bergan file_id saqlanadi."""
+    message = await query.edit_message_media(
+        media=InputMediaPhoto(media=image, caption=text, parse_mode='Markdown'),
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+    if isinstance(image, bytes) and isinstance(message, Message):
+        file_id = file_id_from_result(message.photo)
+        if file_id:
+            await sync_to_async(remember_photo)(product_data.id, product_data.image_hash, product_data.image_path, file_id)
+
 async def edit_message_based_on_type(query, text, keyboard, force_text=False):
     message = query.message
     if force_text:
@@ -465,7 +217,7 @@ async def edit_message_based_on_type(query, text, keyboard, force_text=False):
 # ----------------------------------------------------
 async def show_cart(update_or_query, context: ContextTypes.DEFAULT_TYPE, edit=False):
     user_savat = context.user_data.get('savat', {})
-    text = build_cart_message(user_savat, context)
+    text = await build_cart_message(user_savat, context)
     keyboard = build_cart_keyboard(user_savat)
 
     if isinstance(update_or_query, Update):
@@ -554,17 +306,21 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_lat = location.latitude
         user_lon = location.longitude
 
-        # Masofani hisoblaymiz
-        distance_km = calculate_distance_km(STORE_LAT, STORE_LON, user_lat, user_lon)
-        delivery_cost = calculate_delivery_cost(distance_km)
+        # Masofa va narx BotSettings tarifi bo'yicha (takroriy kataklar jadvaldan)
+        current_bot_settings = await aget_settings()
+        zones = await delivery_zones.aget_index()
+        quote = pricing.quote(user_lat, user_lon, current_bot_settings, zones)
+        distance_km = quote.distance_km
+        delivery_cost = quote.cost
 
         if delivery_cost is None:
-            # Maksimal radiusdan uzoq => yetkazib berish yo'q
+            # Radius (yoki hududlar) dan tashqarida => yetkazib berish yo'q
             del context.user_data['awaiting_location']
             context.user_data['delivery_possible'] = False
 
+            area = delivery_area_text(current_bot_settings, zones)
             await update.message.reply_text(
-                f"😔 Узр, сизнинг манзилингиз бизнинг 10 км радиусимиздан ташқарида.\n"
+                f"😔 Узр, сизнинг манзилингиз {area} ташқарида.\n"
                 "🚫 Шу сабаб етказиб бериш хизмати мавжуд эмас.\n"
                 "📋 Аммо менудан маҳсулотларни кўришингиз мумкин.",
                 reply_markup=ReplyKeyboardRemove()
@@ -651,69 +407,47 @@ async def show_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     page = int(page_str)
 
     user = update.effective_user
-    
-    # Django ORM dan foydalanuvchi buyurtmalarini olish
-    orders_data = []
+
+    # Faqat so'ralgan sahifa (+1 qator keyingi sahifa borligini bilish uchun), mijoz JOIN orqali bitta so'rovda
+    items_per_page = 5 # Changed to 5 for more compact view, can be adjusted
+    start_idx = (page - 1) * items_per_page
     try:
-        customer = await sync_to_async(Customer.objects.filter(telegram_id=user.id).first)()
-        if customer:
-            # Ensure the queryset is evaluated in the sync context before passing to async
-            all_orders_queryset = await sync_to_async(list)(Order.objects.filter(customer=customer).order_by('-created_at'))
-            for order in all_orders_queryset:
-                orders_data.append({
-                    'order_id': order.order_number,
-                    'date': order.created_at.strftime("%Y-%m-%d %H:%M"),
-                    'total': float(order.total_amount),
-                    'status': order.status,
-                    'status_display': order.get_status_display(),
-                })
-            logger.info(f"Foydalanuvchi {user.id} uchun {len(orders_data)} ta buyurtma topildi.")
-        else:
-            logger.info(f"Foydalanuvchi {user.id} uchun mijoz topilmadi, buyurtmalar yo'q.")
-            await query.edit_message_text(
-                "📋 Сизда ҳали буюртмалар мавжуд эмас.",
-                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Орқага", callback_data="main_menu")]])
-            )
-            return # Exit early if no customer
+        rows = await sync_to_async(list)(
+            Order.objects.filter(customer__telegram_id=user.id)
+            .order_by('-created_at')
+            .values('order_number', 'created_at', 'total_amount', 'status')[start_idx:start_idx + items_per_page + 1]
+        )
     except Exception as e:
         logger.error(f"Django ORM dan buyurtmalarni olishda xato: {e}", exc_info=True)
         await query.edit_message_text("Буюртмаларни юклашда техник хато юз берди. Илтимос, кейинроқ уриниб кўринг.")
         return # Exit early on error
 
-    # Pagination logic
-    items_per_page = 5 # Changed to 5 for more compact view, can be adjusted
-    total_orders = len(orders_data)
-    total_pages = math.ceil(total_orders / items_per_page)
-    
-    start_idx = (page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
-    subset = orders_data[start_idx:end_idx]
+    has_next = len(rows) > items_per_page
+    subset = rows[:items_per_page]
 
     if not subset:
-        # This case should ideally be caught by the 'if customer' block above,
-        # but keeping it for robustness if pagination results in empty subset.
+        if page == 1:
+            logger.info(f"Foydalanuvchi {user.id} uchun buyurtmalar topilmadi.")
+            await query.edit_message_text(
+                "📋 Сизда ҳали буюртмалар мавжуд эмас.",
+                reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Орқага", callback_data="main_menu")]])
+            )
+            return
         await query.edit_message_text(
             "📋 Бу саҳифада буюртма топилмади.",
             reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("⬅️ Орқага", callback_data="main_menu")]])
         )
         return
 
+    status_display = dict(Order.STATUS_CHOICES)
+
     text = "🛍 **Сизнинг буюртмалар тарихи** (охиргилари аввал):\n\n"
     for order in subset:
-        order_id = order['order_id']
-        date = order['date']
-        total = order['total']
-        status = order['status_display']
-        
-        status_emoji = {
-            "Янги": "🆕",
-            "Тасдиқланган": "✅", 
-            "Тайёр": "🍽",
-            "Йўлда": "🚚",
-            "Етказилди": "✅",
-            "Бекор қилинган": "❌"
-        }
-        emoji = status_emoji.get(status, "📋")
+        order_id = order['order_number']
+        date = timezone.localtime(order['created_at']).strftime("%Y-%m-%d %H:%M")
+        total = float(order['total_amount'])
+        status = status_display.get(order['status'], order['status'])
+        emoji = STATUS_EMOJI.get(order['status'], "📋")
         
         text += f"📋 Буюртма ID: **{order_id}**\n"
         text += f"📅 Вақт: {date}\n"
@@ -725,7 +459,7 @@ async def show_user_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     nav_buttons = []
     if page > 1:
         nav_buttons.append(InlineKeyboardButton("◀️ Олдинги", callback_data=f"user_orders:{page-1}"))
-    if page < total_pages:
+    if has_next:
         nav_buttons.append(InlineKeyboardButton("Кейинги ▶️", callback_data=f"user_orders:{page+1}"))
 
     if nav_buttons:
@@ -742,7 +476,7 @@ async def show_menu_inline(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    await load_data() # Ensure latest products/categories are loaded
+    kategoriyalar = (await aget_catalog()).categories
 
     if not kategoriyalar:
         await edit_message_based_on_type(
@@ -769,7 +503,7 @@ async def show_menu_inline(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard.append(navigation_buttons)
 
     if user_savat:
-        text = build_cart_message(user_savat, context) + "\n\n🍽 **Категория танланг:**"
+        text = await build_cart_message(user_savat, context) + "\n\n🍽 **Категория танланг:**"
     else:
         text = "🍽 **Категория танланг:**"
 
@@ -780,12 +514,12 @@ async def show_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
     category_name = query.data.split(":")[1]
 
-    await load_data() # Ensure latest products/categories are loaded
+    catalog = await aget_catalog()
 
     product_buttons = []
     row = []
-    for nom in kategoriyalar.get(category_name, []):
-        if nom in mahsulotlar:
+    for nom in catalog.categories.get(category_name, ()):
+        if nom in catalog.products:
             row.append(InlineKeyboardButton(f"🔸 {nom}", callback_data=f"product:{nom}"))
             if len(row) == 2:
                 product_buttons.append(row)
@@ -809,20 +543,15 @@ async def show_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     product_name = query.data.split(":")[1]
-    product_data = mahsulotlar.get(product_name, {})
+    catalog = await aget_catalog()
+    product_data = catalog.products.get(product_name)
     if not product_data:
         await query.edit_message_text("❌ Бу маҳсулот топилмади.")
         return
 
-    narx = product_data.get("narx", Decimal('0'))
-    desc = product_data.get("desc", "")
-    image = product_data.get("rasm", None)
-
-    product_category = None
-    for cat, prods in kategoriyalar.items():
-        if product_name in prods:
-            product_category = cat
-            break
+    narx = product_data.narx
+    desc = product_data.desc
+    image = await amedia_for(product_data.image_path, product_data.file_id)
 
     context.user_data[product_name] = context.user_data.get(product_name, 1)
 
@@ -841,20 +570,13 @@ async def show_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("🛒 Саватга қўшиш", callback_data=f"add_to_cart:{product_name}")]
     ]
 
-    product_category = None
-    for cat, prods in kategoriyalar.items():
-        if product_name in prods:
-            product_category = cat
-            break
+    product_category = catalog.product_category.get(product_name)
     if product_category:
         keyboard.append([InlineKeyboardButton("⬅️ Орқага", callback_data=f"category:{product_category}")])
 
     if image:
         try:
-            await query.edit_message_media(
-                media=InputMediaPhoto(media=image, caption=text, parse_mode='Markdown'),
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+            await edit_product_photo(query, product_data, image, text, keyboard)
         except Exception as e:
             logger.error(f"Failed to edit message media: {e}")
             await edit_message_based_on_type(query, text, keyboard)
@@ -875,7 +597,7 @@ async def product_go_back(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Inline tugmalarni o'chirishda xatolik: {e}")
 
-    await load_data() # Ensure latest products/categories are loaded
+    kategoriyalar = (await aget_catalog()).categories
 
     if not kategoriyalar:
         await query.message.reply_text(
@@ -920,10 +642,11 @@ async def handle_quantity(update: Update, context: ContextTypes.DEFAULT_TYPE):
     new_quantity = max(1, current_quantity + change)
     context.user_data[product_name] = new_quantity
 
-    product_data = mahsulotlar.get(product_name, {})
-    narx = product_data.get("narx", Decimal('0'))
-    desc = product_data.get("desc", "")
-    image = product_data.get("rasm", None)
+    catalog = await aget_catalog()
+    product_data = catalog.products.get(product_name)
+    narx = product_data.narx if product_data else Decimal('0')
+    desc = product_data.desc if product_data else ""
+    image = await amedia_for(product_data.image_path, product_data.file_id) if product_data else None
 
     text = f"🍽 **{product_name}**\n"
     text += f"💰 Нархи: {narx:,} сўм\n"
@@ -940,20 +663,13 @@ async def handle_quantity(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("🛒 Саватга қўшиш", callback_data=f"add_to_cart:{product_name}")]
     ]
 
-    product_category = None
-    for cat, prods in kategoriyalar.items():
-        if product_name in prods:
-            product_category = cat
-            break
+    product_category = catalog.product_category.get(product_name)
     if product_category:
         keyboard.append([InlineKeyboardButton("⬅️ Орқага", callback_data=f"category:{product_category}")])
 
     if image:
         try:
-            await query.edit_message_media(
-                media=InputMediaPhoto(media=image, caption=text, parse_mode='Markdown'),
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+            await edit_product_photo(query, product_data, image, text, keyboard)
         except Exception as e:
             logger.error(f"Failed to update quantity selection: {e}")
             await edit_message_based_on_type(query, text, keyboard)
@@ -970,7 +686,7 @@ async def add_to_cart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     selected_quantity = context.user_data.get(product_name, 1)
 
     # Check service time before adding to cart
-    current_bot_settings = context.bot_data.get('bot_settings')
+    current_bot_settings = await aget_settings()
     if current_bot_settings:
         now = timezone.now()
         if not is_service_time_active(now, current_bot_settings.service_start_time, current_bot_settings.service_end_time):
@@ -984,16 +700,13 @@ async def add_to_cart(update: Update, context: ContextTypes.DEFAULT_TYPE):
     savat[product_name] = savat.get(product_name, 0) + selected_quantity
     context.user_data['savat'] = savat
 
-    product_category = None
-    for cat, prods in kategoriyalar.items():
-        if product_name in prods:
-            product_category = cat
-            break
+    catalog = await aget_catalog()
+    product_category = catalog.product_category.get(product_name)
 
     product_buttons = []
     row = []
-    for nom in kategoriyalar.get(product_category, []):
-        if nom in mahsulotlar:
+    for nom in catalog.categories.get(product_category, ()):
+        if nom in catalog.products:
             row.append(InlineKeyboardButton(f"🔸 {nom}", callback_data=f"product:{nom}"))
             if len(row) == 2:
                 product_buttons.append(row)
@@ -1063,8 +776,9 @@ async def checkout(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Check minimum order value (50,000 som without delivery)
     total_products_price = Decimal('0')
+    products = (await aget_catalog()).products
     for product_name, qty in user_savat.items():
-        narx = mahsulotlar.get(product_name, {}).get("narx", Decimal('0'))
+        narx = products[product_name].narx if product_name in products else Decimal('0')
         total_products_price += narx * qty
 
     if total_products_price < Decimal('15000'):
@@ -1078,7 +792,7 @@ async def checkout(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Check service time
-    current_bot_settings = context.bot_data.get('bot_settings')
+    current_bot_settings = await aget_settings()
     if not current_bot_settings:
         await query.edit_message_text("❌ Бот созламалари юкланмади. Илтимос, кейинроқ уриниб кўринг.")
         return
@@ -1125,54 +839,12 @@ async def checkout(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Buyurtmani tasdiqlash va Django ga yuborish (ORM orqali)
 # ----------------------------------------------------
 
-@sync_to_async
-@transaction.atomic
-def _create_order_and_items_sync(telegram_user_id, full_name, phone, payment_method, location, address, products_total, delivery_cost, total_amount, order_items_data):
-    customer, created = Customer.objects.get_or_create(
-        telegram_id=telegram_user_id,
-        defaults={'full_name': full_name, 'phone_number': phone}
-    )
-    if not created:
-        customer.full_name = full_name
-        customer.phone_number = phone
-        customer.save()
-
-    order = Order.objects.create(
-        customer=customer,
-        telegram_user_id=telegram_user_id,
-        status='yangi',
-        payment_method=payment_method,
-        latitude=location.get('latitude'),
-        longitude=location.get('longitude'),
-        address=address,
-        products_total=products_total,
-        delivery_cost=delivery_cost,
-        total_amount=total_amount,
-    )
-
-    for item_data in order_items_data:
-        OrderItem.objects.create(
-            order=order,
-            product=item_data['product'],
-            quantity=item_data['quantity'],
-            price=item_data['price'],
-            total=item_data['quantity'] * item_data['price']
-        )
-
-    OrderStatusHistory.objects.create(
-        order=order,
-        old_status='',
-        new_status='yangi',
-        notes='Telegram bot orqali yaratildi'
-    )
-    return order
-
 async def final_confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    # Get bot settings from context.bot_data
-    current_bot_settings = context.bot_data.get('bot_settings')
+    # Sozlamalar jarayon keshidan (admin o'zgarishlari BOT_SETTINGS_PROBE_INTERVAL ichida ko'rinadi)
+    current_bot_settings = await aget_settings()
     if not current_bot_settings:
         await query.edit_message_text("❌ Бот созламалари юкланмади. Илтимос, кейинроқ уриниб кўринг.")
         return
@@ -1192,10 +864,11 @@ async def final_confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE
         context.user_data.pop('payment_method', None)
         return
 
-    # Agar masofa > maksimal radius bo'lsa, rad etamiz
+    # Manzil radius (yoki hududlar) dan tashqarida bo'lsa, rad etamiz
     if context.user_data.get('delivery_possible') is False:
+        area = delivery_area_text(current_bot_settings, await delivery_zones.aget_index())
         await query.edit_message_text(
-            f"😔 Узр, сизнинг ҳудудингизга етказиб бериш хизмати мавжуд эмас (максимал 10 км)."
+            f"😔 Узр, сизнинг манзилингиз {area} ташқарида, етказиб бериш хизмати мавжуд эмас.\n"
             "🍽 Меню орқали танишиб кўришингиз мумкин."
         )
         return
@@ -1217,56 +890,20 @@ async def final_confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     delivery_cost = context.user_data.get('delivery_cost', Decimal('0'))
-    total_products_price = Decimal('0')
-    order_items_data = []
-
-    for product_name, qty in user_savat.items():
-        product_obj = await sync_to_async(Product.objects.filter(name=product_name).first)()
-        if product_obj:
-            item_price = product_obj.price  # Keep as Decimal
-            total_products_price += item_price * qty
-            order_items_data.append({
-                'product': product_obj,
-                'quantity': qty,
-                'price': item_price,
-                'product_name': product_name, # Add product_name for easier text generation
-                'total': item_price * qty # Add total for easier text generation
-            })
-        else:
-            logger.warning(f"Mahsulot topilmadi: {product_name}")
-            await query.edit_message_text(f"❌ Буюртма юборишда хато: '{product_name}' маҳсулоти топилмади.")
-            return
-
-    total_amount = total_products_price + delivery_cost
 
     try:
-        order = await _create_order_and_items_sync(
-            telegram_user_id, full_name, phone, payment_method, location, address,
-            total_products_price, delivery_cost, total_amount, order_items_data
+        # Mahsulotlarni topish va buyurtmani yaratish: bitta thread hop, savat hajmidan qat'i nazar
+        order, order_items = await sync_to_async(create_order)(
+            telegram_user_id, full_name, phone, list(user_savat.items()),
+            payment_method=payment_method, location=location, address=address,
+            delivery_cost=delivery_cost,
         )
-        
+
         # Telegram xabarlarini yuborish va message_id'larni saqlash
-        chef_text = f"🍽 **Янги буюртма #{order.order_number}**\n\n"
-        chef_text += f"👨‍💼 Исм: {full_name}\n"
-        chef_text += f"📱 Телефон: {phone}\n"
-        chef_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-        if order.address:
-            chef_text += f"🏠 Манзил: {order.address}\n"
-        else:
-            chef_text += "📍 Манзил: Фақат локация\n"
-        chef_text += f"\n🍽 **Маҳсулотлар:**\n"
-        for item in order_items_data: # Iterate directly over the prepared list
-            chef_text += f"• {item['quantity']} дона {item['product_name']} - {item['total']:,} сўм\n"
-        chef_text += f"\n💰 Жами: {order.total_amount:,} сўм"
-
-        keyboard_chef = [
-            [
-                {'text': "✅ Тасдиқлаш", 'callback_data': f"chef_confirm:{order.id}"},
-                {'text': "❌ Бекор қилиш", 'callback_data': f"chef_cancel:{order.id}"}
-            ]
-        ]
+        chef_text, user_text = new_order_texts(order, order_items)
+        keyboard_chef = chef_keyboard(order, 'yangi')
         
-        chef_msg_response = send_telegram_message(
+        chef_msg_response = await asend_telegram_message(
             chat_id=settings.CHEF_CHAT_ID, 
             text=chef_text, 
             reply_markup={'inline_keyboard': keyboard_chef}
@@ -1275,31 +912,15 @@ async def final_confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE
             order.chef_message_id = chef_msg_response['result']['message_id']
         
         if order.latitude and order.longitude:
-            send_telegram_location(
+            await asend_telegram_location(
                 chat_id=settings.CHEF_CHAT_ID,
                 latitude=order.latitude,
                 longitude=order.longitude
             )
 
         # Foydalanuvchiga xabar
-        user_text = f"✅ **Буюртмангиз қабул қилинди!**\n\n"
-        user_text += f"📋 Буюртма ID: **{order.order_number}**\n"
-        user_text += f"👨‍💼 Исм: {full_name}\n"
-        user_text += f"📱 Телефон: {phone}\n"
-        user_text += f"💳 Тўлов усули: {order.get_payment_method_display()}\n"
-        if order.address:
-            user_text += f"🏠 Манзил: {order.address}\n"
-        else:
-            user_text += "📍 Манзил: Фақат локация\n"
-        if order.latitude and order.longitude:
-            user_text += f"📍 Локация: https://www.google.com/maps?q={order.latitude},{order.longitude}\n"
-        user_text += f"\n🍽 **Маҳсулотлар:**\n"
-        for item in order_items_data: # Iterate directly over the prepared list
-            user_text += f"• {item['quantity']} дона {item['product_name']} - {item['total']:,} сўм\n"
-        user_text += f"\n💰 Жами: {order.total_amount:,} сўм\n🆕 Статус: **Янги**"
-
         user_keyboard = [[{'text': "⬅️ Бош меню", 'callback_data': "main_menu"}]]
-        user_msg_response = send_telegram_message(
+        user_msg_response = await asend_telegram_message(
             chat_id=telegram_user_id,
             text=user_text,
             reply_markup={'inline_keyboard': user_keyboard}
@@ -1311,6 +932,10 @@ async def final_confirm_order(update: Update, context: ContextTypes.DEFAULT_TYPE
 
         await query.edit_message_text(f"✅ Буюртмангиз #{order.order_number} қабул қилинди!")
 
+    except ProductNotFound as e:
+        logger.warning(f"Mahsulot topilmadi: {e.name}")
+        await query.edit_message_text(f"❌ Буюртма юборишда хато: '{e.name}' маҳсулоти топилмади.")
+        return
     except Exception as e:
         logger.error(f"Buyurtma yaratishda xato: {e}", exc_info=True)
         await query.edit_message_text(f"❌ Буюртма юборишда хато: {str(e)}")
@@ -1338,30 +963,6 @@ async def cancel_order(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Oshpaz va Kuryer paneli callbacklari (ORM orqali)
 # ----------------------------------------------------
 
-@sync_to_async
-@transaction.atomic
-def _update_order_status_sync(order_id, new_status, old_status):
-    order = Order.objects.get(id=order_id)
-    order.status = new_status
-    
-    if new_status == 'tasdiqlangan':
-        order.confirmed_at = timezone.now()
-    elif new_status == 'tayor':
-        order.ready_at = timezone.now()
-    elif new_status == 'yetkazildi':
-        order.delivered_at = timezone.now()
-    
-    order.save()
-    
-    OrderStatusHistory.objects.create(
-        order=order,
-        old_status=old_status,
-        new_status=new_status,
-        changed_by=None, # Bot orqali o'zgargani uchun user None
-        notes=f'Telegram bot orqali yangilandi'
-    )
-    return order
-
 async def handle_chef_courier_status_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
@@ -1369,9 +970,8 @@ async def handle_chef_courier_status_update(update: Update, context: ContextType
     try:
         action, order_id = query.data.split(":")
         
-        # Fetch order to get old_status before passing to sync function
-        order_obj_for_status_check = await sync_to_async(Order.objects.get)(id=int(order_id))
-        old_status = order_obj_for_status_check.status
+        order = await sync_to_async(Order.objects.select_related('customer').get)(id=int(order_id))
+        old_status = order.status
 
         status_map = {
             "chef_confirm": "tasdiqlangan",
@@ -1387,21 +987,15 @@ async def handle_chef_courier_status_update(update: Update, context: ContextType
             await query.edit_message_text("❌ Номаълум ҳолат ўзгариши.")
             return
 
-        valid_transitions = {
-            'yangi': ['tasdiqlangan', 'bekor_qilingan'],
-            'tasdiqlangan': ['tayor', 'bekor_qilingan'],
-            'tayor': ['yolda', 'bekor_qilingan'],
-            'yolda': ['yetkazildi', 'bekor_qilingan'],
-        }
-
-        if new_status not in valid_transitions.get(old_status, []):
+        if new_status not in VALID_TRANSITIONS.get(old_status, []):
             await query.edit_message_text(f"Ҳолат {old_status} дан {new_status} га ўзгартиришга рухсат берилмаган.")
             return
 
-        # Call the new sync helper function
-        updated_order = await _update_order_status_sync(int(order_id), new_status, old_status)
-            
-        await _update_telegram_messages(updated_order, old_status, new_status) # Pass the updated order object
+        # Holat va xabarlar navbati bitta tranzaksiyada yoziladi, yuborishni dispatcher bajaradi
+        await sync_to_async(change_order_status)(order, new_status, notes='Telegram bot orqali yangilandi')
+        dispatcher = context.application.bot_data.get('outbox_dispatcher')
+        if dispatcher:
+            dispatcher.wake()
             
     except Order.DoesNotExist:
         await query.edit_message_text("❌ Буюртма топилмади.")
@@ -1469,15 +1063,44 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
             logger.error(f"Failed to send error message to user: {e}")
 
 async def post_init(application):
-    await load_data()
-    # Store bot_settings in application.bot_data for easy access in handlers
-    application.bot_data['bot_settings'] = bot_settings # Use the global bot_settings loaded by load_data
+    await aget_catalog()
+    await aget_settings()
+
+    # Telegram xabarlari navbatini bot jarayonining o'zida yuborish (alohida: manage.py run_outbox_dispatcher)
+    if settings.OUTBOX_DISPATCH_IN_BOT:
+        dispatcher = OutboxDispatcher()
+        application.bot_data['outbox_dispatcher'] = dispatcher
+        application.bot_data['outbox_task'] = asyncio.create_task(dispatcher.run_forever())
+    if settings.BROADCAST_IN_BOT:
+        worker = BroadcastWorker()
+        application.bot_data['broadcast_worker'] = worker
+        application.bot_data['broadcast_task'] = asyncio.create_task(worker.run_forever())
+
+async def post_shutdown(application):
+    dispatcher = application.bot_data.get('outbox_dispatcher')
+    if dispatcher:
+        dispatcher.stop()
+        await application.bot_data['outbox_task']
+    worker = application.bot_data.get('broadcast_worker')
+    if worker:
+        worker.stop()
+        await application.bot_data['broadcast_task']
+    await aclose_client()
 
 # ----------------------------------------------------
 # Botni ishga tushirish
 # ----------------------------------------------------
-def main():
-    application = ApplicationBuilder().token(settings.TELEGRAM_BOT_TOKEN).post_init(post_init).build()
+def build_application():
+    application = (
+        ApplicationBuilder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .base_url(settings.TELEGRAM_API_BASE_URL)
+        .concurrent_updates(settings.TELEGRAM_CONCURRENT_UPDATES)
+        .persistence(DjangoPersistence())  # savat va buyurtma bosqichlari qayta ishga tushishda saqlanadi
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Asosiy komandalar
     application.add_handler(CommandHandler("start", start))
@@ -1522,14 +1145,45 @@ def main():
     )
 
     application.add_error_handler(error_handler)
-    
+    return application
+
+# Handlerlar faqat xabarlar va inline tugmalarni qayta ishlaydi; boshqa turlarni Telegram yubormaydi
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+def webhook_secret():
+    """setWebhook secret_token: sozlanmagan bo'lsa bot tokenidan doimiy qiymat hosil qilinadi"""
+    return settings.TELEGRAM_WEBHOOK_SECRET or hashlib.sha256(settings.TELEGRAM_BOT_TOKEN.encode()).hexdigest()
+
+def main(mode=None):
+    mode = mode or settings.TELEGRAM_BOT_MODE
+    application = build_application()
+
     print("🤖 Бот ишга тушмоқда...")
     print(f"Bot Token: {settings.TELEGRAM_BOT_TOKEN[:5]}...") # Print partial token for security
     print(f"Chef Chat ID: {settings.CHEF_CHAT_ID}")
     print(f"Admin Chat ID: {settings.ADMIN_CHAT_ID}")
     
-    # Call load_data as an async function before starting polling
-    application.run_polling()
+    # Menyu va sozlamalar post_init da yuklanadi
+    if mode == 'webhook':
+        if not settings.TELEGRAM_WEBHOOK_URL:
+            raise ImproperlyConfigured("Webhook rejimi uchun TELEGRAM_WEBHOOK_URL ni sozlang")
+        webhook_url = f"{settings.TELEGRAM_WEBHOOK_URL.rstrip('/')}/{settings.TELEGRAM_WEBHOOK_PATH}"
+        print(f"Webhook: {webhook_url} -> {settings.TELEGRAM_WEBHOOK_LISTEN}:{settings.TELEGRAM_WEBHOOK_PORT}")
+        # Telegram so'rovlari X-Telegram-Bot-Api-Secret-Token sarlavhasi bilan tekshiriladi,
+        # qabul qilingan updatelar application.update_queue orqali handlerlarga beriladi
+        application.run_webhook(
+            listen=settings.TELEGRAM_WEBHOOK_LISTEN,
+            port=settings.TELEGRAM_WEBHOOK_PORT,
+            url_path=settings.TELEGRAM_WEBHOOK_PATH,
+            webhook_url=webhook_url,
+            secret_token=webhook_secret(),
+            max_connections=settings.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=ALLOWED_UPDATES,
+        )
+    else:
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Telegram botni ishga tushirish")
+    parser.add_argument('--mode', choices=['polling', 'webhook'], help="Standart: TELEGRAM_BOT_MODE")
+    main(parser.parse_args().mode)